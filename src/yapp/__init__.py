@@ -2,13 +2,14 @@
 yapp — Yet Another Python (data) Pipeline
 """
 from ._version import version
-from .core import InputAdapter, Inputs, Job, Monitor, OutputAdapter, Pipeline
+from .core import InputAdapter, Inputs, Job, Monitor, OutputAdapter, Pipeline, PipelineOptions
 
 __all__ = [
     "core",
     "adapters",
     "cli",
     "Pipeline",
+    "PipelineOptions",
     "Job",
     "Inputs",
     "InputAdapter",
@@ -0,0 +1,89 @@
+"""
+Process-wide registry of SQLAlchemy engines, shared by SQL adapters
+
+Adapters connecting to the same database share a single engine and so a single connection pool,
+which is thread safe and can be used by parallel jobs.
+"""
+
+import logging
+import threading
+
+import sqlalchemy as sa
+
+# database URL -> engine
+ENGINES = {}
+# database URL -> arguments used to create its engine
+_engines_kwargs = {}
+_lock = threading.Lock()
+
+
+def _key(url):
+    if isinstance(url, sa.engine.URL):
+        return url.render_as_string(hide_password=False)
+    return str(url)
+
+
+def get_engine(conn, **engine_kwargs):
+    """
+    Returns the shared engine for conn, None if conn is a single connection
+
+    Engines are created on first use with engine_kwargs (like pool_size and max_overflow),
+    later calls for the same URL return the same engine.
+
+    Args:
+        conn (str | sqlalchemy.engine.URL | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection):
+            database URL, engine or connection
+        **engine_kwargs:
+            passed to `create_engine`
+    """
+    if isinstance(conn, sa.engine.Engine):
+        return conn
+    if not isinstance(conn, (str, sa.engine.URL)):
+        return None
+    key = _key(conn)
+    engine_kwargs = {name: value for name, value in engine_kwargs.items() if value is not None}
+    with _lock:
+        if key not in ENGINES:
+            ENGINES[key] = sa.create_engine(conn, **engine_kwargs)
+            _engines_kwargs[key] = engine_kwargs
+            logging.debug("Created engine for %s", ENGINES[key].url)
+        elif engine_kwargs and engine_kwargs != _engines_kwargs[key]:
+            logging.warning(
+                "Engine for %s already created with %s, ignoring %s",
+                ENGINES[key].url,
+                _engines_kwargs[key],
+                engine_kwargs,
+            )
+        return ENGINES[key]
+
+
+def pool_stats():
+    """
+    Returns connection pools statistics for every engine in the registry, by URL
+
+    Statistics are the pool size, connections checked in (idle) and out (in use) and the overflow,
+    for pools that keep track of them.
+    """
+    stats = {}
+    with _lock:
+        engines = list(ENGINES.values())
+    for engine in engines:
+        pool_stat = {}
+        for name in ("size", "checkedin", "checkedout", "overflow"):
+            method = getattr(engine.pool, name, None)
+            if callable(method):
+                pool_stat[name] = method()
+        stats[engine.url.render_as_string(hide_password=True)] = pool_stat
+    return stats
+
+
+def dispose_engines():
+    """
+    Closes all connections and removes every engine from the registry
+    """
+    with _lock:
+        engines = list(ENGINES.values())
+        ENGINES.clear()
+        _engines_kwargs.clear()
+    for engine in engines:
+        engine.dispose()
@@ -1,8 +1,39 @@
-from os.path import join
+import glob
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import uuid
+from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from os.path import exists, isdir, isfile, join, relpath
 
 import pandas as pd
 
-from yapp import InputAdapter
+from yapp import InputAdapter, OutputAdapter
+from yapp.core.store import ArtifactStore, FeatherSerializer, ParquetSerializer
+
+
+# suffixes of compressed files, inferred by read_csv
+COMPRESSIONS = (".gz", ".bz2", ".zip", ".xz", ".zst", ".tar")
+
+
+def _strip_compression(name):
+    for suffix in COMPRESSIONS:
+        if name.endswith(suffix):
+            return name[: -len(suffix)]
+    return name
+
+
+def _is_csv(name):
+    return _strip_compression(name).endswith(".csv")
+
+
+def _read_csv(path, kwargs):
+    """Reads a CSV file in a pool worker"""
+    return pd.read_csv(path, **kwargs)
 
 
 class CsvInput(InputAdapter):
@@ -10,13 +41,473 @@ class CsvInput(InputAdapter):
     CSV Input adapter
 
     An input adapter for CSV files, input is read into a pandas DataFrame
+    or, if chunksize is set, into an iterator over DataFrames of chunksize rows
+
+    Inputs can be globs (like "2026-10-*.csv") or directories, matching files are read in parallel
+    and concatenated. Partition columns can be added with values taken from their paths.
+
+    With sidecar, every file is converted once to a columnar file in the sidecar directory, that
+    is read in its place until the CSV file (or the read_csv arguments) change.
+
+    Files are always read with the same read_csv arguments, whether they are matched by a glob or
+    not, so that inputs get the same dtypes: the faster pyarrow engine is used only if chosen
+    with `engine="pyarrow"`.
     """
 
-    def __init__(self, directory, **other_kwargs):
+    def __init__(
+        self,
+        directory,
+        *,
+        chunksize=None,
+        sidecar=None,
+        sidecar_max_size=None,
+        sidecar_format="feather",
+        partitioning=None,
+        workers=None,
+        executor="thread",
+        **other_kwargs,
+    ):  # pylint: disable=too-many-arguments
+        """__init__.
+
+        Args:
+            directory (str):
+                directory containing the files
+            chunksize (int | None):
+                read inputs in chunks of chunksize rows, sidecars are not used if set
+            sidecar (str | None):
+                directory where sidecars are stored, disabled if None
+            sidecar_max_size (int | str | None):
+                maximum total size of sidecars, least recently used ones are evicted
+            sidecar_format (str):
+                format of the sidecars, "feather" (memory mapped) or "parquet" (smaller)
+            partitioning (str | list | None):
+                partition columns added to inputs read from many files: "hive" for column=value
+                directories or names of the columns taking values from the last path
+                components, the file name without extensions included
+            workers (int | None):
+                maximum number of files read at the same time
+            executor (str):
+                "thread" or "process", pool used to read many files
+            **other_kwargs:
+                passed to read_csv
+        """
         self.directory = directory
+        self.chunksize = chunksize
         self.other_kwargs = other_kwargs
+        if executor not in ("thread", "process"):
+            raise ValueError(f'Invalid executor {executor}, expected "thread" or "process"')
+        self.partitioning = partitioning
+        self.workers = workers
+        self.executor = executor
+        self.sidecars = None
+        if sidecar is not None:
+            serializers = {"feather": FeatherSerializer, "parquet": ParquetSerializer}
+            if sidecar_format not in serializers:
+                raise ValueError(
+                    f"Invalid sidecar format {sidecar_format}, expected one of {list(serializers)}"
+                )
+            self.sidecars = ArtifactStore(
+                sidecar,
+                max_size=sidecar_max_size,
+                serializers=[serializers[sidecar_format]()],
+            )
+
+    def sidecar_key(self, path):
+        """
+        Returns the key of the sidecar for the CSV file at path, as "<path>:<arguments>:<version>"
+
+        Arguments is a hash of the read_csv arguments, version changes with the file size and
+        modification time.
+        """
+        stat = os.stat(path)
+        arguments = json.dumps(self.other_kwargs, sort_keys=True, default=repr)
+        version = f"{stat.st_size}-{stat.st_mtime_ns}"
+        return f"{os.path.abspath(path)}:{hashlib.sha256(arguments.encode()).hexdigest()}:{version}"
+
+    def read_sidecar(self, path):
+        """
+        Returns the content of the CSV file at path from its sidecar, None if missing
+        """
+        data = self.sidecars.get(self.sidecar_key(path))
+        if data is not None:
+            logging.debug('Using sidecar for "%s"', path)
+        return data
+
+    def write_sidecar(self, path, data):
+        """
+        Stores data read from the CSV file at path as its sidecar
+        """
+        key = self.sidecar_key(path)
+        # sidecars of previous versions of the file, read with the same arguments
+        prefix = key.rsplit(":", 1)[0] + ":"
+        for stale_key in self.sidecars.keys():
+            if stale_key.startswith(prefix):
+                self.sidecars.delete(stale_key)
+        try:
+            self.sidecars.put(key, data)
+        except TypeError as error:
+            logging.warning('Cannot create sidecar for "%s": %s', path, error)
+
+    def paths(self, name):
+        """
+        Returns the paths of the files for input name, a file, a glob or a directory
+        """
+        path = join(self.directory, name)
+        if glob.has_magic(name):
+            return sorted(file for file in glob.glob(path, recursive=True) if isfile(file))
+        if isdir(path):
+            files = glob.glob(join(path, "**", "*"), recursive=True)
+            return sorted(file for file in files if isfile(file) and _is_csv(file))
+        if not exists(path) and not _is_csv(name):
+            path += ".csv"
+        return [path]
+
+    def partition_values(self, path):
+        """
+        Returns partition columns values for the file at path
+        """
+        components = relpath(path, self.directory).split(os.sep)
+        components[-1] = _strip_compression(components[-1]).removesuffix(".csv")
+        if self.partitioning == "hive":
+            return dict(
+                component.split("=", 1) for component in components[:-1] if "=" in component
+            )
+        if self.partitioning:
+            return dict(zip(self.partitioning, components[-len(self.partitioning) :]))
+        return {}
+
+    def read(self, paths):
+        """
+        Reads the CSV files at paths in parallel, returns a DataFrame for each one
+        """
+        frames = [None] * len(paths)
+        if self.sidecars is not None:
+            frames = [self.read_sidecar(path) for path in paths]
+        missing = [index for index, frame in enumerate(frames) if frame is None]
+        if not missing:
+            return frames
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        workers = min(self.workers or os.cpu_count() or 1, len(missing))
+        logging.debug("Reading %s files with %s %s workers", len(missing), workers, self.executor)
+        with pool_class(workers) as pool:
+            results = pool.map(
+                _read_csv, [paths[index] for index in missing], itertools.repeat(self.other_kwargs)
+            )
+            for index, data in zip(missing, results):
+                frames[index] = data
+                if self.sidecars is not None:
+                    self.write_sidecar(paths[index], data)
+        return frames
 
     def get(self, filename: str):
-        if not filename.endswith(".csv"):
-            filename += ".csv"
-        return pd.read_csv(join(self.directory, filename), **self.other_kwargs)
+        paths = self.paths(filename)
+        if not paths:
+            raise FileNotFoundError(f'No files matching "{filename}" in {self.directory}')
+        if not glob.has_magic(filename) and not isdir(join(self.directory, filename)):
+            return self.read_file(paths[0])
+        if self.chunksize:
+            # chunks from each file, one after the other
+            return itertools.chain.from_iterable(
+                (
+                    chunk.assign(**self.partition_values(path))
+                    for chunk in pd.read_csv(path, chunksize=self.chunksize, **self.other_kwargs)
+                )
+                for path in paths
+            )
+        frames = [
+            frame.assign(**self.partition_values(path))
+            for path, frame in zip(paths, self.read(paths))
+        ]
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def read_file(self, path):
+        """
+        Reads a single CSV file, from its sidecar if enabled
+        """
+        if self.sidecars is None or self.chunksize:
+            return pd.read_csv(path, chunksize=self.chunksize, **self.other_kwargs)
+        data = self.read_sidecar(path)
+        if data is None:
+            data = pd.read_csv(path, **self.other_kwargs)
+            self.write_sidecar(path, data)
+        return data
+
+
+def _arrow_operators():
+    return {
+        "=": lambda field, value: field == value,
+        "==": lambda field, value: field == value,
+        "!=": lambda field, value: field != value,
+        "<": lambda field, value: field < value,
+        "<=": lambda field, value: field <= value,
+        ">": lambda field, value: field > value,
+        ">=": lambda field, value: field >= value,
+        "in": lambda field, value: field.isin(list(value)),
+        "not in": lambda field, value: ~field.isin(list(value)),
+    }
+
+
+def make_expression(filter):  # pylint: disable=redefined-builtin
+    """
+    Returns a pyarrow expression matching rows where every column satisfies its condition, None if
+    filter is empty
+
+    Conditions are the same accepted by SqlInput: a value to compare for equality, a list of
+    accepted values, None or a dict mapping operators (like "<" or "in") to values.
+
+    Args:
+        filter (dict | None):
+            mapping from columns to conditions
+    """
+    import pyarrow.compute as pc  # pylint: disable=import-outside-toplevel
+
+    operators = _arrow_operators()
+    expression = None
+    for column, condition in (filter or {}).items():
+        field = pc.field(column)
+        if isinstance(condition, dict):
+            try:
+                conditions = [operators[op](field, value) for op, value in condition.items()]
+            except KeyError as error:
+                raise ValueError(f"Invalid filter operator {error}") from None
+        elif isinstance(condition, (list, tuple, set)):
+            conditions = [field.isin(list(condition))]
+        elif condition is None:
+            conditions = [field.is_null()]
+        else:
+            conditions = [field == condition]
+        for condition_expression in conditions:
+            expression = (
+                condition_expression if expression is None else expression & condition_expression
+            )
+    return expression
+
+
+class ArrowFileInput(InputAdapter):
+    """
+    Base input adapter for files in Arrow-compatible columnar formats
+
+    Inputs are single files or directories of files (like the ones written with partition columns
+    or in chunks), read into a pandas DataFrame or, if chunksize is set, into an iterator over
+    DataFrames of at most chunksize rows.
+    Only the requested columns and the rows matching filter are read.
+    """
+
+    format = None
+    extension = None
+
+    def __init__(self, directory, chunksize=None, memory_map=True, partitioning="hive"):
+        """__init__.
+
+        Args:
+            directory (str):
+                directory containing the files
+            chunksize (int | None):
+                read inputs in chunks of at most chunksize rows
+            memory_map (bool):
+                memory map files instead of reading them
+            partitioning (str | list | None):
+                how partition columns are encoded in directory names, "hive" for column=value
+        """
+        self.directory = directory
+        self.chunksize = chunksize
+        self.memory_map = memory_map
+        self.partitioning = partitioning
+
+    def path(self, name):
+        """
+        Returns the path of the file or directory for input name
+        """
+        path = join(self.directory, name)
+        if name.endswith(self.extension) or isdir(path) or exists(path):
+            return path
+        return path + self.extension
+
+    def dataset(self, name):
+        """
+        Returns the pyarrow dataset for input name
+        """
+        import pyarrow.dataset as ds  # pylint: disable=import-outside-toplevel
+        from pyarrow.fs import LocalFileSystem  # pylint: disable=import-outside-toplevel
+
+        return ds.dataset(
+            self.path(name),
+            format=self.format,
+            partitioning=self.partitioning,
+            filesystem=LocalFileSystem(use_mmap=self.memory_map),
+        )
+
+    def get(self, name, columns=None, filter=None):  # pylint: disable=redefined-builtin
+        dataset = self.dataset(name)
+        expression = make_expression(filter)
+        if self.chunksize:
+            batches = dataset.to_batches(
+                columns=columns, filter=expression, batch_size=self.chunksize
+            )
+            return (batch.to_pandas() for batch in batches if batch.num_rows)
+        return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+
+class ArrowFileOutput(OutputAdapter):
+    """
+    Base output adapter for files in Arrow-compatible columnar formats
+
+    Every output is written to a single file or, with partition_cols, to a directory with a
+    subdirectory for each value of the partition columns. Chunks are written to a directory, one
+    file for each chunk.
+    Outputs are first written to a temporary path and then moved in place, so that readers never
+    see partial outputs.
+    """
+
+    format = None
+    extension = None
+    default_compression = None
+
+    def __init__(self, directory, compression=None, partition_cols=None):
+        """__init__.
+
+        Args:
+            directory (str):
+                directory to write files to, created if missing
+            compression (str | None):
+                compression codec, the format default if None
+            partition_cols (list | None):
+                columns used to partition outputs in subdirectories
+        """
+        self.directory = directory
+        self.compression = compression
+        self.partition_cols = partition_cols
+        os.makedirs(directory, exist_ok=True)
+
+    @property
+    def codec(self):
+        """
+        Compression codec used for writes
+        """
+        return self.compression or self.default_compression
+
+    @abstractmethod
+    def write_file(self, table, path):
+        """
+        Writes the Arrow table to a single file at path
+        """
+
+    def write_dataset(self, table, path, basename_template):
+        """
+        Writes the Arrow table to files in path, partitioned by partition_cols
+        """
+        import pyarrow.dataset as ds  # pylint: disable=import-outside-toplevel
+
+        file_format = {"parquet": ds.ParquetFileFormat, "feather": ds.IpcFileFormat}[self.format]()
+        compression = self.codec
+        if self.format == "feather" and compression == "uncompressed":
+            compression = None
+        ds.write_dataset(
+            table,
+            path,
+            format=file_format,
+            file_options=file_format.make_write_options(compression=compression),
+            partitioning=self.partition_cols,
+            partitioning_flavor="hive" if self.partition_cols else None,
+            basename_template=basename_template,
+            existing_data_behavior="overwrite_or_ignore",
+        )
+
+    @staticmethod
+    def _remove(path):
+        if isdir(path):
+            shutil.rmtree(path)
+        elif exists(path):
+            os.remove(path)
+
+    def save(self, key, data):
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        # indexes other than the default one are written as columns and restored when read
+        table = pa.Table.from_pandas(data, preserve_index=None)
+        path = join(self.directory, key if self.partition_cols else key + self.extension)
+        temp_path = f"{path}.{uuid.uuid4().hex[:8]}.tmp"
+        if self.partition_cols:
+            self.write_dataset(table, temp_path, "part-{i}" + self.extension)
+        else:
+            self.write_file(table, temp_path)
+        # the other layout, if an output with the same key was written before
+        self._remove(join(self.directory, key + self.extension))
+        self._remove(join(self.directory, key))
+        os.replace(temp_path, path)
+
+    def save_chunk(self, key, chunk, index):
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        path = join(self.directory, key)
+        if index == 0:
+            self._remove(path)
+            self._remove(path + self.extension)
+        table = pa.Table.from_pandas(chunk, preserve_index=None)
+        basename = f"part-{index:05d}"
+        if self.partition_cols:
+            self.write_dataset(table, path, basename + "-{i}" + self.extension)
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.write_file(table, join(path, basename + self.extension))
+
+
+class ParquetInput(ArrowFileInput):
+    """
+    Parquet input adapter
+
+    An input adapter for Parquet files or directories of Parquet files, row groups not matching
+    filter are skipped using their statistics
+    """
+
+    format = "parquet"
+    extension = ".parquet"
+
+
+class ParquetOutput(ArrowFileOutput):
+    """
+    Parquet output adapter
+
+    An output adapter writing DataFrames to Parquet files, compressed with snappy by default
+    """
+
+    format = "parquet"
+    extension = ".parquet"
+    default_compression = "snappy"
+
+    def write_file(self, table, path):
+        import pyarrow.parquet as pq  # pylint: disable=import-outside-toplevel
+
+        pq.write_table(table, path, compression=self.codec)
+
+
+class FeatherInput(ArrowFileInput):
+    """
+    Feather input adapter
+
+    An input adapter for Feather (Arrow IPC) files or directories of Feather files. Memory mapped
+    uncompressed files are read without copying them
+    """
+
+    format = "feather"
+    extension = ".feather"
+
+
+class FeatherOutput(ArrowFileOutput):
+    """
+    Feather output adapter
+
+    An output adapter writing DataFrames to Feather (Arrow IPC) files, compressed with lz4 by
+    default. Use compression "uncompressed" for files that are memory mapped without copies
+    """
+
+    format = "feather"
+    extension = ".feather"
+    default_compression = "lz4"
+
+    def write_file(self, table, path):
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+
+        feather.write_feather(table, path, compression=self.codec)
@@ -1,11 +1,11 @@
-import sys
+"""
+Input adapters for every pandas read_* function, like read_csv or read_json
 
-import pandas as pd
+Adapters are created when first requested, so that pandas is imported only when used.
+"""
 
 from yapp.core import InputAdapter
 
-module = sys.modules[__name__]
-
 
 class FunctionWrapperInputAdapter(InputAdapter):
     """
@@ -20,9 +20,20 @@ class FunctionWrapperInputAdapter(InputAdapter):
         return self.__class__.fn(name, *self.args, **self.kwargs)  # type: ignore
 
 
-for fn_name in [a for a in dir(pd) if a.startswith("read_")]:
-    fn = pd.__getattribute__(fn_name)  # type: ignore
+def __getattr__(name):
+    if not name.startswith("read_"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    import pandas as pd  # pylint: disable=import-outside-toplevel
+
+    fn = getattr(pd, name, None)
+    if fn is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    adapter = type(name, (FunctionWrapperInputAdapter,), {"fn": fn})
+    globals()[name] = adapter
+    return adapter
+
 
-    Adapter = type(fn_name, (FunctionWrapperInputAdapter,), {"fn": fn})
+def __dir__():
+    import pandas as pd  # pylint: disable=import-outside-toplevel
 
-    setattr(module, fn_name, Adapter)
+    return sorted(set(globals()) | {name for name in dir(pd) if name.startswith("read_")})
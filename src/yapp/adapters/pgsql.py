@@ -1,11 +1,14 @@
-from sqlalchemy import create_engine
+import io
 
+from sqlalchemy.engine import URL
+
+from .engines import get_engine
 from .sql import SqlInput, SqlOutput
 
 
-def make_pgsql_connection(username, password, host, port, database):
+def make_pgsql_url(username, password, host, port, database):
     """
-    Create PostgreSQL connection using SQLAlchemy `create_engine`
+    Create PostgreSQL database URL
 
     Args:
         username:
@@ -14,7 +17,85 @@ def make_pgsql_connection(username, password, host, port, database):
         port:
         database:
     """
-    return create_engine(f"postgresql://{username}:{password}@{host}:{port}/{database}")
+    return URL.create(
+        "postgresql",
+        username=username,
+        password=password,
+        host=host,
+        port=int(port) if port else None,
+        database=database,
+    )
+
+
+def make_pgsql_connection(username, password, host, port, database, **engine_kwargs):
+    """
+    Returns the shared SQLAlchemy engine for a PostgreSQL database (see yapp.adapters.engines)
+
+    Args:
+        username:
+        password:
+        host:
+        port:
+        database:
+        **engine_kwargs:
+            passed to `create_engine`, like pool_size
+    """
+    return get_engine(make_pgsql_url(username, password, host, port, database), **engine_kwargs)
+
+
+def copy_text(value):
+    """
+    Returns value formatted for `COPY` text format: NULL is written as \\N and backslashes in data
+    are escaped, so that empty strings and NULLs (or a "\\N" string) are never confused
+    """
+    if value is None:
+        return "\\N"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+def copy_insert(table, connection, keys, data_iter):
+    """
+    Inserts rows with `COPY ... FROM STDIN`, through an in-memory text buffer
+
+    To be used as method in `DataFrame.to_sql`, works with both psycopg2 and psycopg 3.
+
+    Args:
+        table (pandas.io.sql.SQLTable):
+            table to write to
+        connection (sqlalchemy.engine.Connection):
+            connection to use
+        keys (list):
+            columns names
+        data_iter (Iterable):
+            rows to write
+    """
+    buffer = io.StringIO()
+    for row in data_iter:
+        buffer.write("\t".join(copy_text(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+
+    preparer = connection.dialect.identifier_preparer
+    name = preparer.quote(table.name)
+    if table.schema:
+        name = f"{preparer.quote_schema(table.schema)}.{name}"
+    columns = ", ".join(preparer.quote(key) for key in keys)
+    sql = f"COPY {name} ({columns}) FROM STDIN WITH (FORMAT text, NULL '\\N')"
+
+    dbapi_connection = connection.connection
+    with dbapi_connection.cursor() as cursor:
+        if hasattr(cursor, "copy_expert"):
+            # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
 
 
 class PgSqlInput(SqlInput):
@@ -22,26 +103,37 @@ class PgSqlInput(SqlInput):
     Very simple PostgreSQL input adapter
     """
 
-    def __init__(
-        self,
-        *,
-        username,
-        password,
-        host,
-        port,
-        database,
-        schema=None,
-        where_clause=None,
-    ):
-        connection = make_pgsql_connection(username, password, host, port, database)
-        super().__init__(connection, schema=schema, where_clause=where_clause)
+    def __init__(self, *, username, password, host, port, database, **kwargs):
+        """__init__.
+
+        Args:
+            username, password, host, port, database:
+                connection parameters
+            **kwargs:
+                other SqlInput arguments, like schema, chunksize or partition_on
+        """
+        # allow as many connections as partitions read at the same time
+        if not kwargs.get("pool_size"):
+            kwargs["pool_size"] = kwargs.get("max_connections")
+        super().__init__(make_pgsql_url(username, password, host, port, database), **kwargs)
 
 
 class PgSqlOutput(SqlOutput):
     """
     Very simple PostgreSQL ouput adapter
+
+    Besides the SqlOutput methods, rows can be written with `COPY` using method "copy"
     """
 
-    def __init__(self, *, username, password, host, port, database, schema=None):
-        connection = make_pgsql_connection(username, password, host, port, database)
-        super().__init__(connection, schema=schema)
+    METHODS = {**SqlOutput.METHODS, "copy": copy_insert}
+
+    def __init__(self, *, username, password, host, port, database, **kwargs):
+        """__init__.
+
+        Args:
+            username, password, host, port, database:
+                connection parameters
+            **kwargs:
+                other SqlOutput arguments, like schema, method or staging
+        """
+        super().__init__(make_pgsql_url(username, password, host, port, database), **kwargs)
@@ -1,21 +1,127 @@
-import snowflake.connector
+import json
+import logging
+
+import pandas as pd
 
 from .sql import SqlInput
 
 
 class SnowflakeInput(SqlInput):
     """
-    Very simple PostgreSQL input adapter
+    Snowflake input adapter
+
+    Query results are fetched as Arrow batches: inputs are read into a pandas DataFrame or,
+    if chunksize is set, into an iterator over DataFrames, one for each batch (whose size is
+    decided by Snowflake).
+
+    With submit_async queries for all the inputs needed by a pipeline are submitted at once
+    before it runs, so that they are executed concurrently by Snowflake.
+    Reading tables in partitions (partition_on) is not supported.
     """
 
     def __init__(
-        self, *, username, password, account, database, schema=None, where_clause=None
-    ):
-        conn = snowflake.connector.connect(
-            user=username,
-            password=password,
-            account=account,
-            database=database,
-            schema=schema,
-        )
-        super().__init__(conn, schema=None, where_clause=where_clause)
+        self,
+        *,
+        username=None,
+        password=None,
+        account=None,
+        database=None,
+        schema=None,
+        where_clause=None,
+        chunksize=None,
+        submit_async=False,
+        connection=None,
+    ):  # pylint: disable=too-many-arguments
+        """__init__.
+
+        Args:
+            username, password, account, database, schema:
+                Snowflake connection parameters
+            where_clause (str | None):
+                condition added to every query
+            chunksize (int | None):
+                if set, inputs are iterators over batches
+            submit_async (bool):
+                submit queries asynchronously before the pipeline runs
+            connection (snowflake.connector.SnowflakeConnection | None):
+                existing connection, used instead of connecting with the parameters above
+        """
+        if connection is None:
+            import snowflake.connector  # pylint: disable=import-outside-toplevel
+
+            connection = snowflake.connector.connect(
+                user=username,
+                password=password,
+                account=account,
+                database=database,
+                schema=schema,
+            )
+        super().__init__(connection, schema=None, where_clause=where_clause, chunksize=chunksize)
+        self.submit_async = submit_async
+        # query -> id of the query submitted asynchronously
+        self.submitted = {}
+
+    @property
+    def engine(self):
+        # a single connector connection, not a SQLAlchemy engine
+        return None
+
+    @staticmethod
+    def _query_key(sql, params):
+        return sql + json.dumps(params, sort_keys=True, default=str)
+
+    @staticmethod
+    def _check_partition_on(partition_on):
+        if partition_on:
+            raise ValueError("partition_on is not supported by SnowflakeInput")
+
+    def submit(
+        self, table_name, columns=None, filter=None, partition_on=None
+    ):  # pylint: disable=redefined-builtin,arguments-differ
+        self._check_partition_on(partition_on)
+        if not self.submit_async:
+            return
+        sql, params = self.compile_query(self.build_query(table_name, columns, filter))
+        cursor = self.conn.cursor()
+        cursor.execute_async(sql, params)
+        logging.debug('Submitted query %s: "%s"', cursor.sfqid, sql)
+        self.submitted[self._query_key(sql, params)] = cursor.sfqid
+
+    def get(
+        self, table_name, columns=None, filter=None, partition_on=None
+    ):  # pylint: disable=redefined-builtin
+        self._check_partition_on(partition_on)
+        sql, params = self.compile_query(self.build_query(table_name, columns, filter))
+        cursor = self.conn.cursor()
+        query_id = self.submitted.pop(self._query_key(sql, params), None)
+        if query_id is not None:
+            logging.debug("Fetching results of query %s", query_id)
+            cursor.get_results_from_sfqid(query_id)
+        else:
+            logging.debug('Using query: "%s"', sql)
+            cursor.execute(sql, params)
+        if self.chunksize:
+            return self.fetch_batches(cursor)
+        return self.fetch_all(cursor)
+
+    @staticmethod
+    def fetch_batches(cursor):
+        """
+        Yields a DataFrame for each Arrow batch of the results of cursor
+        """
+        for batch in cursor.fetch_arrow_batches():
+            yield batch.to_pandas()
+
+    @staticmethod
+    def fetch_all(cursor):
+        """
+        Returns the results of cursor as a single DataFrame, concatenating Arrow batches
+        """
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+
+        batches = list(cursor.fetch_arrow_batches())
+        if not batches:
+            return pd.DataFrame(columns=[column[0] for column in cursor.description or []])
+        # batches are concatenated as Arrow tables, converting them to pandas once. Their schemas
+        # can differ (like a column of nulls only in a batch), they are unified
+        return pa.concat_tables(batches, promote_options="default").to_pandas()
@@ -1,28 +1,295 @@
+import itertools
 import logging
+import operator
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 import pandas as pd
+import sqlalchemy as sa
+from sqlalchemy.engine.default import DefaultDialect
 
 from yapp import InputAdapter, OutputAdapter
 
+from .engines import get_engine
+
+# operators usable in filters, as {column: {operator: value}}
+OPERATORS = {
+    "=": operator.eq,
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda column, value: column.in_(value),
+    "not in": lambda column, value: column.not_in(value),
+}
+
+
+def identifier(name):
+    """
+    Returns a table, schema or column name used as is in queries, never quoted, just like in
+    plain SQL: case-insensitive unless it is quoted in name itself
+    """
+    return sa.sql.quoted_name(name, quote=False)
+
+
+def make_condition(column, condition):
+    """
+    Returns a SQLAlchemy condition on column, values are bound as parameters
+
+    Args:
+        column (str):
+            column name
+        condition (Any):
+            a value to compare for equality, a list of accepted values or a dict mapping
+            operators (see OPERATORS) to values
+    """
+    column = sa.column(identifier(column))
+    if isinstance(condition, dict):
+        try:
+            return sa.and_(*[OPERATORS[op](column, value) for op, value in condition.items()])
+        except KeyError as error:
+            raise ValueError(f"Invalid filter operator {error}") from None
+    if isinstance(condition, (list, tuple, set)):
+        return column.in_(list(condition))
+    if condition is None:
+        return column.is_(None)
+    return column == condition
+
+
+def partition_conditions(column, lower, upper, num_partitions):
+    """
+    Returns conditions splitting the values of column in num_partitions ranges between lower and
+    upper, values outside them (and NULLs) are included in the first and last ranges
+
+    Args:
+        column (str):
+            numeric column to partition on
+        lower (int | float):
+            lower bound of the first range
+        upper (int | float):
+            upper bound of the last range
+        num_partitions (int):
+            number of ranges
+    """
+    column = sa.column(identifier(column))
+    integers = isinstance(lower, int) and isinstance(upper, int)
+    if integers:
+        num_partitions = min(num_partitions, upper - lower)
+    if upper <= lower or num_partitions <= 1:
+        return [sa.true()]
+    stride = (upper - lower) / num_partitions
+    bounds = [lower + stride * i for i in range(1, num_partitions)]
+    if integers:
+        bounds = [int(bound) for bound in bounds]
+    conditions = [sa.or_(column < bounds[0], column.is_(None))]
+    conditions += [sa.and_(column >= low, column < high) for low, high in zip(bounds, bounds[1:])]
+    conditions.append(column >= bounds[-1])
+    return conditions
+
 
 class SqlInput(InputAdapter):
     """
     SQL Input adapter
 
     An input adapter for SQL databases, input is read into a pandas DataFrame
+    or, if chunksize is set, into an iterator over DataFrames of chunksize rows
+
+    With partition_on tables are read concurrently in ranges of a numeric column, each one over its
+    own connection from the engine pool.
     """
 
-    def __init__(self, conn, schema=None, where_clause=None):
+    def __init__(
+        self,
+        conn,
+        schema=None,
+        where_clause=None,
+        *,
+        chunksize=None,
+        partition_on=None,
+        max_connections=None,
+        pool_size=None,
+        max_overflow=None,
+    ):  # pylint: disable=too-many-arguments
+        """__init__.
+
+        Args:
+            conn (str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection):
+                database URL, engine or connection. Engines for URLs are shared with other
+                adapters (see yapp.adapters.engines)
+            schema (str | None):
+                schema of the tables
+            where_clause (str | None):
+                condition added to every query
+            chunksize (int | None):
+                read inputs in chunks of chunksize rows
+            partition_on (dict | None):
+                default partitioning for reads, a dict with column, lower, upper and num_partitions
+            max_connections (int | None):
+                maximum number of partitions read at the same time, num_partitions if None
+            pool_size (int | None):
+                connection pool size, for engines created from URLs
+            max_overflow (int | None):
+                connections allowed over pool_size, for engines created from URLs
+        """
         self.conn = conn
         self.schema = schema
         self.where_clause = where_clause
+        self.chunksize = chunksize
+        self.partition_on = partition_on
+        self.max_connections = max_connections
+        self.engine_kwargs = {"pool_size": pool_size, "max_overflow": max_overflow}
+
+    @property
+    def engine(self):
+        """
+        Engine used for reads, None if the adapter was given a single connection
+        """
+        return get_engine(self.conn, **self.engine_kwargs)
 
-    def get(self, table_name):
+    @property
+    def connectable(self):
+        """
+        Engine or connection to read from
+        """
+        return self.engine or self.conn
+
+    @property
+    def paramstyle(self):
+        """
+        Parameters style of the DBAPI module of conn, used to compile queries for connections
+        not from SQLAlchemy
+        """
+        module = sys.modules.get(type(self.conn).__module__.split(".")[0])
+        return getattr(module, "paramstyle", "pyformat")
+
+    def compile_query(self, query):
+        """
+        Returns SQL and parameters for a DBAPI connection from a SQLAlchemy query
+        """
+        dialect = DefaultDialect(paramstyle=self.paramstyle)
+        compiled = query.compile(dialect=dialect, compile_kwargs={"render_postcompile": True})
+        if compiled.positiontup is not None:
+            return str(compiled), [compiled.params[name] for name in compiled.positiontup]
+        return str(compiled), compiled.params
+
+    def text_query(self, table_name):
+        """
+        Returns the plain SQL query selecting all of table_name
+        """
         schema = self.schema + "." if self.schema else ""
         where_clause = " where " + self.where_clause if self.where_clause else ""
-        query = f"select * from {schema}{table_name}{where_clause}"
+        return f"select * from {schema}{table_name}{where_clause}"
+
+    def build_query(self, table_name, columns=None, filter=None):  # pylint: disable=redefined-builtin
+        """
+        Returns the query selecting columns from table_name, with rows matching filter
+
+        Args:
+            table_name (str):
+                table to read, either table or schema.table
+            columns (list | None):
+                columns to read, all if None
+            filter (dict | None):
+                mapping from columns to conditions (see make_condition), combined with
+                where_clause
+        """
+        schema = self.schema
+        if "." in table_name:
+            schema, table_name = table_name.rsplit(".", 1)
+        table = sa.table(
+            identifier(table_name),
+            *[sa.column(identifier(name)) for name in columns or []],
+            schema=identifier(schema) if schema else None,
+        )
+        if columns:
+            query = sa.select(*table.c)
+        else:
+            query = sa.select(sa.text("*")).select_from(table)
+        for column, condition in (filter or {}).items():
+            query = query.where(make_condition(column, condition))
+        if self.where_clause:
+            query = query.where(sa.text(self.where_clause))
+        return query
+
+    def get(
+        self, table_name, columns=None, filter=None, partition_on=None
+    ):  # pylint: disable=redefined-builtin
+        partition_on = partition_on or self.partition_on
+        if partition_on:
+            query = self.build_query(table_name, columns, filter)
+            return self.read_partitioned(query, **partition_on)
+        if columns or filter:
+            query = self.build_query(table_name, columns, filter)
+        else:
+            query = self.text_query(table_name)
         logging.debug('Using query: "%s"', query)
-        return pd.read_sql(query, self.conn)
+        return self.read_sql(query, self.connectable, chunksize=self.chunksize)
+
+    def read_sql(self, query, connectable, chunksize=None):
+        """
+        Reads the results of query, SQLAlchemy queries are compiled for connections not from
+        SQLAlchemy
+
+        Args:
+            query (str | sqlalchemy.sql.Select):
+                query to run
+            connectable (sqlalchemy.engine.Engine | sqlalchemy.engine.Connection | Any):
+                engine or connection, either from SQLAlchemy or a DBAPI one
+            chunksize (int | None):
+                read results in chunks of chunksize rows
+        """
+        sqlalchemy = isinstance(connectable, (sa.engine.Engine, sa.engine.Connection))
+        if isinstance(query, str) or sqlalchemy:
+            return pd.read_sql(query, connectable, chunksize=chunksize)
+        sql, params = self.compile_query(query)
+        return pd.read_sql(sql, connectable, params=params, chunksize=chunksize)
+
+    def _read(self, query):
+        with self.engine.connect() as connection:
+            return pd.read_sql(query, connection)
+
+    def read_partitioned(self, query, column, lower, upper, num_partitions):
+        """
+        Reads the results of query in num_partitions ranges of column, concurrently
+
+        Args:
+            query (sqlalchemy.sql.Select):
+                query to split
+            column (str):
+                numeric column to partition on
+            lower (int | float):
+                lower bound of the first range
+            upper (int | float):
+                upper bound of the last range
+            num_partitions (int):
+                number of ranges
+        """
+        queries = [
+            query.where(condition)
+            for condition in partition_conditions(column, lower, upper, num_partitions)
+        ]
+        logging.debug('Using query: "%s" in %s partitions on %s', query, len(queries), column)
+        if self.chunksize:
+            # chunks from each partition, one after the other
+            return itertools.chain.from_iterable(
+                self.read_sql(query, self.connectable, chunksize=self.chunksize)
+                for query in queries
+            )
+        if self.engine is None:
+            logging.warning("Cannot read partitions concurrently from a single connection")
+            frames = [self.read_sql(query, self.conn) for query in queries]
+        else:
+            workers = min(self.max_connections or len(queries), len(queries))
+            with ThreadPoolExecutor(workers, thread_name_prefix="yapp-sql") as executor:
+                frames = list(executor.map(self._read, queries))
+        frames = [frame for frame in frames if not frame.empty] or frames[:1]
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
 
 
 class SqlOutput(OutputAdapter):
@@ -30,14 +297,123 @@ class SqlOutput(OutputAdapter):
     SQL output adapter
 
     Output adapter for SQL databases, a pandas DataFrame is written to a table
+
+    Every output is written in a single transaction. With staging, it's first written to a staging
+    table that then replaces the table.
     """
 
-    def __init__(self, conn, schema=None, extra_fields: dict = None):
+    # ways to insert rows, passed to DataFrame.to_sql as method
+    METHODS = {
+        # one INSERT statement run with executemany
+        "insert": None,
+        # INSERT statements with multiple rows
+        "multi": "multi",
+    }
+
+    def __init__(
+        self,
+        conn,
+        schema=None,
+        extra_fields: dict = None,
+        *,
+        method="insert",
+        chunksize=None,
+        staging=False,
+        pool_size=None,
+        max_overflow=None,
+    ):  # pylint: disable=too-many-arguments
+        """__init__.
+
+        Args:
+            conn (str | sqlalchemy.engine.Engine | sqlalchemy.engine.Connection):
+                database URL, engine or connection. Engines for URLs are shared with other
+                adapters (see yapp.adapters.engines)
+            schema (str | None):
+                schema of the tables
+            extra_fields (dict | None):
+                columns to add to every output, with their value
+            method (str):
+                how rows are inserted, one of METHODS
+            chunksize (int | None):
+                number of rows inserted at a time, all at once if None
+            staging (bool):
+                write to a staging table and swap it with the table, replacing its content
+            pool_size (int | None):
+                connection pool size, for engines created from URLs
+            max_overflow (int | None):
+                connections allowed over pool_size, for engines created from URLs
+        """
+        if method not in self.METHODS:
+            raise ValueError(f"Invalid method {method}, expected one of {list(self.METHODS)}")
         self.conn = conn
         self.schema = schema
         self.extra_fields = extra_fields if extra_fields else {}
+        self.method = method
+        self.chunksize = chunksize
+        self.staging = staging
+        self.engine_kwargs = {"pool_size": pool_size, "max_overflow": max_overflow}
+
+    @contextmanager
+    def transaction(self):
+        """
+        Context manager returning a connection inside a transaction
+        """
+        engine = get_engine(self.conn, **self.engine_kwargs)
+        if engine is not None:
+            with engine.begin() as connection:
+                yield connection
+        elif self.conn.in_transaction():
+            yield self.conn
+        else:
+            with self.conn.begin():
+                yield self.conn
+
+    def _quote(self, connection, table_name):
+        preparer = connection.dialect.identifier_preparer
+        if self.schema:
+            return f"{preparer.quote_schema(self.schema)}.{preparer.quote(table_name)}"
+        return preparer.quote(table_name)
+
+    def write(self, table_name, data, staging=False):
+        """
+        Writes data to table_name in a single transaction
+
+        Args:
+            table_name (str):
+                table to write to
+            data (pandas.DataFrame):
+                data to write, not modified
+            staging (bool):
+                write to a staging table and swap it with the table
+        """
+        if self.extra_fields:
+            data = data.assign(**self.extra_fields)
+        # unique names, indexes created with the staging table keep its name after the swap
+        target = f"{table_name}_staging_{uuid.uuid4().hex[:8]}" if staging else table_name
+        with self.transaction() as connection:
+            data.to_sql(
+                target,
+                connection,
+                schema=self.schema,
+                if_exists="replace" if staging else "append",
+                method=self.METHODS[self.method],
+                chunksize=self.chunksize,
+            )
+            if staging:
+                logging.debug('Replacing table "%s" with "%s"', table_name, target)
+                connection.execute(
+                    sa.text(f"drop table if exists {self._quote(connection, table_name)}")
+                )
+                connection.execute(
+                    sa.text(
+                        f"alter table {self._quote(connection, target)} "
+                        f"rename to {connection.dialect.identifier_preparer.quote(table_name)}"
+                    )
+                )
 
     def save(self, table_name, data):
-        for field, value in self.extra_fields.items():
-            data[field] = value
-        data.to_sql(table_name, self.conn, schema=self.schema, if_exists="append")
+        self.write(table_name, data, staging=self.staging)
+
+    def save_chunk(self, table_name, chunk, index):
+        # with staging the first chunk replaces the table, the following ones are appended
+        self.write(table_name, chunk, staging=self.staging and index == 0)
@@ -0,0 +1,35 @@
+from yapp import InputAdapter, OutputAdapter
+from yapp.core.store import ArtifactStore
+
+
+class StoreInput(InputAdapter):
+    """
+    Artifact store input adapter
+
+    An input adapter reading artifacts previously saved with StoreOutput
+    """
+
+    def __init__(self, path, **store_kwargs):
+        self.store = ArtifactStore(path, **store_kwargs)
+
+    def get(self, key):
+        return self.store[key]
+
+
+class StoreOutput(OutputAdapter):
+    """
+    Artifact store output adapter
+
+    An output adapter persisting jobs outputs to an ArtifactStore, so that they can be read back
+    efficiently with StoreInput
+    """
+
+    def __init__(self, path, max_size=None, max_age=None):
+        self.store = ArtifactStore(path, max_size=max_size, max_age=max_age)
+
+    def save(self, key, data):
+        self.store.put(key, data)
+
+    def save_chunk(self, key, chunk, index):
+        # every chunk is a separate artifact
+        self.store.put(f"{key}/{index}", chunk)
@@ -5,13 +5,139 @@ yapp cli parsing
 import argparse
 import inspect
 import logging
+import os
 import sys
 
 from yapp.cli.logs import setup_logging
 from yapp.cli.parsing import ConfigParser
+from yapp.cli.plans import user_cache_dir
 from yapp.core.errors import YappFatalError
 
 
+def export_metrics(pipeline, path):
+    """
+    Writes the metrics of the last run of pipeline to path, in Prometheus text format if path
+    ends with ".prom" (as expected by the node exporter textfile collector), as JSON Lines otherwise
+    """
+    if path.endswith(".prom"):
+        pipeline.metrics.to_prometheus(path, pipeline=pipeline.name)
+    else:
+        pipeline.metrics.to_jsonl(path)
+    logging.debug("Metrics written to %s", path)
+
+
+def add_run_arguments(parser):
+    """
+    Adds to parser the arguments overriding pipeline options or enabling metrics and profiling
+    """
+
+    parser.add_argument(
+        "-w",
+        "--workers",
+        nargs="?",
+        dest="workers",
+        type=int,
+        default=None,
+        help="Number of independent jobs to run concurrently, overrides pipelines.yml",
+    )
+
+    parser.add_argument(
+        "--no-cache",
+        action="store_const",
+        dest="no_cache",
+        const=True,
+        default=False,
+        help="Run every job, ignoring cached outputs",
+    )
+
+    parser.add_argument(
+        "--metrics",
+        nargs="?",
+        dest="metrics",
+        type=str,
+        default=None,
+        help="File to write jobs, hooks and adapters metrics to, "
+        "as a Prometheus textfile if it ends with .prom or as JSON Lines otherwise",
+    )
+
+    parser.add_argument(
+        "--trace",
+        nargs="?",
+        dest="trace",
+        type=str,
+        default=None,
+        help="File to write a Chrome trace of the run to, to be opened with Perfetto",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_const",
+        dest="profile",
+        const=True,
+        default=False,
+        help="Profile every job with cProfile, writing a .pstats file for each job",
+    )
+
+    parser.add_argument(
+        "--profile-memory",
+        action="store_const",
+        dest="profile_memory",
+        const=True,
+        default=False,
+        help="Same as --profile, also tracking allocations of each job with tracemalloc",
+    )
+
+    parser.add_argument(
+        "--profile-dir",
+        dest="profile_dir",
+        type=str,
+        default=None,
+        help="Directory to write profiles to, in a subdirectory for each run "
+        '(default "profiles", next to pipelines.yml)',
+    )
+
+    parser.add_argument(
+        "--sampling",
+        dest="sampling",
+        type=float,
+        default=None,
+        help="Run the sampling profiler, taking a sample every SAMPLING seconds",
+    )
+
+
+def pipeline_overrides(args):
+    """
+    Returns the pipeline options (see yapp.core.options.PipelineOptions) set by command line
+    arguments, overriding the ones from pipelines.yml
+    """
+    overrides = {}
+    if args.workers:
+        overrides["workers"] = args.workers
+    if args.no_cache:
+        overrides["cache"] = None
+    if args.profile_memory:
+        overrides["profile"] = "memory"
+    elif args.profile:
+        overrides["profile"] = True
+    if args.sampling:
+        overrides["sampling"] = args.sampling
+    if args.profile_dir:
+        overrides["profile_dir"] = os.path.abspath(args.profile_dir)
+    return overrides
+
+
+def export_reports(pipeline, metrics_path=None, trace_path=None):
+    """
+    Writes metrics (see export_metrics) and a Chrome trace of the last run of pipeline, if their
+    paths are given
+    """
+    if metrics_path:
+        export_metrics(pipeline, metrics_path)
+    if trace_path:
+        pipeline.metrics.to_chrome_trace(trace_path, pipeline=pipeline.name)
+        logging.debug("Trace written to %s", trace_path)
+
+
 def main():
     """
     yapp cli entrypoint
@@ -75,6 +201,17 @@ def main():
         help="Skip configuration validation, used for test purposes",
     )
 
+    parser.add_argument(
+        "--no-plan-cache",
+        action="store_const",
+        dest="no_plan_cache",
+        const=True,
+        default=False,
+        help="Parse pipelines.yml again, ignoring the cached compiled pipeline",
+    )
+
+    add_run_arguments(parser)
+
     parser.add_argument("pipeline", type=str, help="Pipeline name")
 
     args = parser.parse_args()
@@ -86,21 +223,31 @@ def main():
     )
 
     # prepare config parser
-    config_parser = ConfigParser(args.pipeline, path=args.path)
+    plan_cache = None if args.no_plan_cache else os.path.join(user_cache_dir(), "plans")
+    config_parser = ConfigParser(args.pipeline, path=args.path, plan_cache=plan_cache)
 
     # Read configuration and create a new pipeline
     try:
         pipeline = config_parser.parse(skip_validation=args.skip_validation)
+        pipeline.options.update(pipeline_overrides(args))
     except YappFatalError as error:
         error.log_and_exit()
     except Exception as error:  # pylint: disable=broad-except
         logging.exception(error)
         sys.exit(-1)
 
+    # the working directory is changed before running
+    metrics_path = os.path.abspath(args.metrics) if args.metrics else None
+    trace_path = os.path.abspath(args.trace) if args.trace else None
+
     # Run the pipeline
     try:
         config_parser.switch_workdir()
         pipeline()
+        # only if SQL adapters were used
+        if "yapp.adapters.engines" in sys.modules:
+            engines = sys.modules["yapp.adapters.engines"]
+            logging.debug("Connection pools statistics: %s", engines.pool_stats())
     except Exception as error:  # pylint: disable=broad-except
         logging.exception(error)
         logging.debug("pipeline.inputs: %s", pipeline.inputs.__repr__())
@@ -110,6 +257,8 @@ def main():
             args = inspect.getfullargspec(job.execute).args
             logging.debug("%s.execute arguments: %s", job, args[1:])
         sys.exit(-2)
+    finally:
+        export_reports(pipeline, metrics_path, trace_path)
 
 
 if __name__ == "__main__":
@@ -1,6 +1,7 @@
 import graphlib
 import importlib.util
 import inspect
+import json
 import logging
 import os
 import re
@@ -9,15 +10,13 @@ from copy import copy
 from collections import defaultdict
 from types import MethodType
 
-import yaml
-
-from yapp.cli.validation import validate
+from yapp.cli.plans import PlanCache, dump_env, load_env
+from yapp.cli.yaml_reader import yaml_read
 from yapp.core import Inputs, Job, Pipeline
+from yapp.core.input_cache import InputCache
 from yapp.core.errors import (
     ConfigurationError,
     ImportedCodeFailed,
-    MissingConfiguration,
-    MissingEnv,
     MissingPipeline,
 )
 
@@ -28,41 +27,85 @@ def camel_to_snake(name):
     return re.sub("([a-z0-9])([A-Z])", r"\1_\2", name).lower()
 
 
-def env_constructor(loader, node):
+def as_bool(value):
+    """Returns a boolean from a flag in pipelines.yml, where booleans are read as strings"""
+    if isinstance(value, str):
+        return value.lower() in ("true", "yes", "on", "1")
+    return bool(value)
+
+
+def as_profile(value):
+    """Returns the profile option of a step: "memory", True or False"""
+    if isinstance(value, str) and value.lower() == "memory":
+        return "memory"
+    return as_bool(value)
+
+
+def compile_steps(pipeline_name, step_list):
     """
-    Conctructor to automatically look up for env variables
+    Returns the steps of pipeline_name in topological order, each with the list of steps it runs
+    after
     """
+    dag = {}
+    compiled = {}
+    for step in step_list:
+        logging.debug('<steps> parsing "%s"', step)
+        # make strings just like the others
+        after = step.get("after", [])
+        if isinstance(after, str):
+            after = [after]
+
+        dag[step["run"]] = set(after)
+        compiled[step["run"]] = {
+            "run": step["run"],
+            "after": list(after),
+            "with": step.get("with", {}),
+            "executor": step.get("executor"),
+            "cache": as_bool(step.get("cache", True)),
+            "stream": step.get("stream"),
+            "columns": step.get("columns"),
+            "profile": as_profile(step.get("profile", False)),
+        }
+
+    logging.debug('Performing topological ordering on steps: "%s"', dag)
     try:
-        value = loader.construct_scalar(node)
-        return os.environ[value]
-    except KeyError as error:
-        raise MissingEnv(error.args[0]) from None
+        ordered_steps = graphlib.TopologicalSorter(dag).static_order()
+        ordered_steps = list(ordered_steps)
+    except graphlib.CycleError:
+        raise graphlib.CycleError(
+            f"Invalid pipeline definition {pipeline_name}: cycle in steps dependencies"
+        ) from None
+    logging.debug("Successfully ordered steps: %s", ordered_steps)
+    return [compiled[step] for step in ordered_steps]
 
 
-def do_nothing_constructor(self, node):
-    """
-    Constructor just returning the string for the node
-    """
-    return self.construct_scalar(node)
+# step fields set as attributes of their jobs
+JOB_ATTRIBUTES = ("executor", "cache", "stream", "columns", "profile")
+# plan fields passed as they are to pipelines as options
+OPTION_FIELDS = ("workers", "executor", "free_outputs", "keep", "chunksize", "sampling")
 
 
-def yaml_read(path):
+def pipeline_options(plan):
     """
-    Read YAML from path
+    Returns the options of a pipeline (see yapp.core.options.PipelineOptions) from a compiled
+    plan, except for the jobs outputs cache
     """
-    # use !env VARIABLENAME to refer env variables
-    yaml.add_constructor("!env", env_constructor)
+    options = {field: plan.get(field) for field in OPTION_FIELDS}
 
-    # Disable awful YAML 1.1 behaviour on booleans-lookalike
-    # If I write 'on' I want 'on', not boolean True
-    yaml.add_constructor("tag:yaml.org,2002:bool", do_nothing_constructor)
+    # either the number of jobs or a dict with jobs and workers
+    prefetch = plan["prefetch"]
+    if not isinstance(prefetch, dict):
+        prefetch = {"jobs": prefetch or 0}
+    options["prefetch"] = prefetch.get("jobs", 0)
+    options["prefetch_workers"] = prefetch.get("workers", 4)
 
-    try:
-        with open(path, "r", encoding="utf-8") as file:
-            parsed = yaml.full_load(file)
-        return parsed
-    except FileNotFoundError:
-        raise MissingConfiguration() from None
+    # either a flag or a dict with the memory limit
+    write_behind = plan["write_behind"]
+    if not isinstance(write_behind, dict):
+        write_behind = {"enabled": as_bool(write_behind)}
+    options["write_behind"] = write_behind.get("enabled", True)
+    options["write_behind_memory"] = write_behind.get("max_memory")
+    return options
 
 
 class ConfigParser:
@@ -79,11 +122,46 @@ class ConfigParser:
         "hooks",
         "monitor",
         "config",
+        "workers",
+        "executor",
+        "cache",
+        "free_outputs",
+        "keep",
+        "inputs_cache",
+        "prefetch",
+        "write_behind",
+        "chunksize",
+        "sampling",
+    }
+    # Single value fields, pipeline specific values override global ones
+    override_fields = {
+        "monitor",
+        "workers",
+        "executor",
+        "cache",
+        "free_outputs",
+        "inputs_cache",
+        "prefetch",
+        "write_behind",
+        "chunksize",
+        "sampling",
     }
     # Auxiliary fields, all lists
-    config_fields = valid_fields - {"steps", "config", "monitor"}
+    config_fields = valid_fields - {"steps", "config"} - override_fields
+
+    def __init__(self, pipeline_name, path="./", pipelines_file="pipelines.yml", plan_cache=None):
+        """__init__.
 
-    def __init__(self, pipeline_name, path="./", pipelines_file="pipelines.yml"):
+        Args:
+            pipeline_name (str):
+                name of the pipeline to parse
+            path (str):
+                path containing pipelines definitions
+            pipelines_file (str):
+                name of the pipelines definitions file
+            plan_cache (str | None):
+                directory where compiled plans are cached (see PlanCache), disabled if None
+        """
         self.pipeline_name = pipeline_name
         self.path = path
 
@@ -91,16 +169,55 @@ class ConfigParser:
         self.pipelines_file = os.path.join(path, pipelines_file)
 
         self.base_paths = [os.path.join(path, self.pipeline_name), path]
-
-    def load_module(self, module_name):
+        self.plans = PlanCache(plan_cache) if plan_cache is not None else None
+        # module name -> {"file": path} or {"module": name} it was loaded from, None if missing
+        self.modules = {}
+        # paths where modules were looked for before the ones they were found in, not existing
+        self.shadowing = set()
+        # directory -> names of the .py files in it, listed once
+        self._listings = {}
+        # path -> module executed from it, each file is executed only once
+        self._loaded = {}
+        self.module_hits = 0
+        self.module_misses = 0
+
+    @property
+    def module_stats(self):
         """
-        Loads a python module from a .py file or yapp modules
+        Modules cache statistics
+        """
+        return {
+            "hits": self.module_hits,
+            "misses": self.module_misses,
+            "modules": len(self._loaded),
+            "directories": len(self._listings),
+        }
+
+    def _has_file(self, path):
+        """
+        True if path is a .py file, directories are listed once and their content reused
+        """
+        directory, name = os.path.split(path)
+        if directory not in self._listings:
+            try:
+                with os.scandir(directory or ".") as entries:
+                    self._listings[directory] = {
+                        entry.name
+                        for entry in entries
+                        if entry.name.endswith(".py") and entry.is_file()
+                    }
+            except OSError:
+                self._listings[directory] = set()
+        return name in self._listings[directory]
+
+    def resolve_module(self, module_name):
+        """
+        Finds a python module in .py files or yapp modules, without loading it
+
+        Returns:
+            (dict | None) {"file": path} for .py files, {"module": name} for yapp modules or None
+            if the module cannot be found
         """
-        logging.debug(
-            'Requested module to load "%s" for pipeline "%s"',
-            module_name,
-            self.pipeline_name,
-        )
         # Remove eventual trailing ".py" and split at dots
         ref = re.sub(r"\.py$", "", module_name).split(".")
         # same but snake_case
@@ -111,42 +228,56 @@ class ConfigParser:
         paths += [
             os.path.join(*[base_path] + ref_snake) for base_path in self.base_paths
         ]
-        # try to load from all possible paths
         for path in paths:
             logging.debug("Trying path %s for module %s", path, module_name)
-            try:
-                # Module name may differ from the original name (camel_to_snake)
-                name = os.path.split(path)[-1]
-                spec = importlib.util.spec_from_file_location(name, path + ".py")
-            except FileNotFoundError:
-                continue
-
-            if not spec:
-                continue
+            if self._has_file(path + ".py"):
+                return {"file": os.path.abspath(path + ".py")}
+            self.shadowing.add(os.path.abspath(path + ".py"))
 
-            module = importlib.util.module_from_spec(spec)
+        # if didn't find it, try from yapp
+        try:
+            spec = importlib.util.find_spec(f"yapp.adapters.{module_name}")
+        except ModuleNotFoundError:
+            spec = None
+        if spec is not None:
+            return {"module": spec.name}
+        logging.debug("Cannot locate module %s at %s", module_name, paths)
+        return None
 
-            try:
-                spec.loader.exec_module(module)
-            except FileNotFoundError:
-                # always continue on FileNotFoundError
-                continue
-            except Exception as error:
-                raise ImportedCodeFailed(module, *error.args) from None
-
-            # if everything goes well stop here and don't try next possibilities
-            break
-        else:
-            # if didn't find it, try from yapp
-            # and if still cannot find it, raise an error
-            try:
-                return importlib.import_module(f"yapp.adapters.{module_name}")
-            except ModuleNotFoundError:
-                raise FileNotFoundError(
-                    f"Cannot locate module {module_name} at {paths}"
-                ) from None
+    def load_module(self, module_name):
+        """
+        Loads a python module from a .py file or yapp modules
+        """
+        logging.debug(
+            'Requested module to load "%s" for pipeline "%s"',
+            module_name,
+            self.pipeline_name,
+        )
+        if module_name not in self.modules:
+            self.modules[module_name] = self.resolve_module(module_name)
+        location = self.modules[module_name]
+        if location is None:
+            raise FileNotFoundError(f"Cannot locate module {module_name}")
+        if "module" in location:
+            return importlib.import_module(location["module"])
+
+        path = location["file"]
+        if path in self._loaded:
+            self.module_hits += 1
+            return self._loaded[path]
+        self.module_misses += 1
+
+        # Module name may differ from the original name (camel_to_snake)
+        name = os.path.splitext(os.path.basename(path))[0]
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as error:
+            raise ImportedCodeFailed(module, *error.args) from None
 
         logging.debug("Found module %s", module)
+        self._loaded[path] = module
         return module
 
     def build_new_job_class(
@@ -166,7 +297,18 @@ class ConfigParser:
         full_args = map(str, inspect.signature(inner_fn).parameters.values())
         inner_args = map("=".join, zip(args, args))
 
-        func = f"""def execute (self, {', '.join(full_args)}):
+        if inspect.iscoroutinefunction(inner_fn):
+            # coroutine functions get a coroutine execute, to be awaited by the "async" executor
+            func = f"""async def execute (self, {', '.join(full_args)}):
+                    return await inner_fn({','.join(inner_args)})
+                    """
+        elif inspect.isgeneratorfunction(inner_fn):
+            # generator functions get a generator execute, its output is streamed
+            func = f"""def execute (self, {', '.join(full_args)}):
+                    yield from inner_fn({','.join(inner_args)})
+                    """
+        else:
+            func = f"""def execute (self, {', '.join(full_args)}):
                     return inner_fn({','.join(inner_args)})
                     """
         # logging.debug('Function code: %s', func_body)
@@ -199,11 +341,22 @@ class ConfigParser:
 
         # assign parameters and assign job to return
         new_job_class.params = params
+        # functions can read config only taking it as argument
+        new_job_class.config_keys = None if "config" in args else []
         return new_job_class
 
-    def build_job(self, step, params):  # pylint: disable=no-self-use
+    def build_job(self, step, params, **attributes):  # pylint: disable=no-self-use
         """
         Create Job given pipeline and step name
+
+        Args:
+            step (str):
+                step name
+            params (dict):
+                job params
+            **attributes:
+                job attributes set from the step definition (executor, cache, stream, columns and
+                profile), only if set
         """
         logging.debug('Building job "%s" for pipeline "%s"', step, self.pipeline_name)
 
@@ -231,6 +384,14 @@ class ConfigParser:
         except AttributeError:
             job = self.build_new_job_class(step, module, func_name, params)
 
+        for name, value in attributes.items():
+            if name == "cache":
+                # a job can be excluded from caching by its step only
+                job.cache = job.cache and value
+            elif value:
+                setattr(job, name, value)
+        job.source = getattr(module, "__file__", None)
+
         # check for invalid kwargs
         arg_spec = inspect.getfullargspec(job.execute)
         if arg_spec.defaults:
@@ -245,51 +406,43 @@ class ConfigParser:
 
         return job
 
-    def build_pipeline(self, pipeline_cfg, inputs=None, outputs=None, hooks=None, monitor=None):
-        """
-        Creates pipeline from pipeline and config definition dicts
+    def build_pipeline(self, steps, inputs=None, outputs=None, hooks=None, monitor=None, **options):
         """
+        Creates pipeline from compiled steps (see compile_steps) and config definitions
 
-        params_mapping = {}
-
-        def make_dag(step_list):
-            """
-            Create DAG dictionary suitable for topological ordering from configuration parsing output
-            """
-            dag = {}
-            for step in step_list:
-                logging.debug('<steps> parsing "%s"', step)
-                # make strings just like the others
-                after = step.get("after", [])
-                if isinstance(after, str):
-                    after = [after]
-
-                dag[step["run"]] = set(after)
-                params_mapping[step["run"]] = step.get("with", {})
-            return dag
-
-        steps = make_dag(pipeline_cfg["steps"])
-        logging.debug('Performing topological ordering on steps: "%s"', steps)
-        try:
-            ordered_steps = graphlib.TopologicalSorter(steps).static_order()
-            ordered_steps = list(ordered_steps)
-        except graphlib.CycleError:
-            raise graphlib.CycleError(
-                f"Invalid pipeline definition {self.pipeline_name}: cycle in steps dependencies"
-            ) from None
-        logging.debug("Successfully ordered steps: %s", ordered_steps)
-
-        # First step should be None: that is there are no dependencies for first step
-        # assert ordered_steps[0] is None
+        Args:
+            **options:
+                pipeline options (see yapp.core.options.PipelineOptions)
+        """
 
         # for each step get the source and load it
-        jobs = [self.build_job(step, params_mapping[step]) for step in ordered_steps]
+        jobs = {
+            step["run"]: self.build_job(
+                step["run"],
+                step["with"],
+                **{attribute: step.get(attribute) for attribute in JOB_ATTRIBUTES},
+            )
+            for step in steps
+        }
+
+        # keep the DAG, so that independent jobs can be run concurrently
+        dependencies = {
+            jobs[step["run"]]: {jobs[dependency] for dependency in step["after"]}
+            for step in steps
+        }
 
         if not hooks:
             hooks = {}
 
         return Pipeline(
-            jobs, name=self.pipeline_name, inputs=inputs, outputs=outputs, monitor=monitor, **hooks
+            list(jobs.values()),
+            name=self.pipeline_name,
+            inputs=inputs,
+            outputs=outputs,
+            monitor=monitor,
+            dependencies=dependencies,
+            options=options,
+            **hooks,
         )
 
     def create_adapter(self, adapter_name: str, params: dict):
@@ -309,10 +462,8 @@ class ConfigParser:
 
         # instantiate adapter and return it
         logging.debug(params)
-        try:
-            args = params.pop("+args")
-        except KeyError:
-            args = []
+        params = dict(params)
+        args = params.pop("+args", [])
         return adapter_class(*args, **params)
 
     def make_input(self, single_input: dict):
@@ -323,11 +474,15 @@ class ConfigParser:
         expose_list = single_input.get("expose", [])
 
         input_adapter = self.create_adapter(adapter_name, params)
+        if "memoize" in single_input:
+            input_adapter.memoize = single_input["memoize"]
+        if "prefetch_limit" in single_input:
+            input_adapter.prefetch_limit = single_input["prefetch_limit"]
 
         logging.debug("Created input adapter %s", input_adapter)
         return input_adapter, expose_list
 
-    def build_inputs(self, cfg_inputs, config=None):
+    def build_inputs(self, cfg_inputs, config=None, cache_size=None):
         """
         Sets up inputs from `inputs` and `expose` fields in YAML files
         """
@@ -341,14 +496,20 @@ class ConfigParser:
             sources.add(adapter)
             exposed[adapter.__class__.__name__] = exposed_list
 
-        inputs = Inputs(sources=sources, config=config)
+        cache = InputCache(cache_size) if cache_size is not None else InputCache()
+        inputs = Inputs(sources=sources, config=config, cache=cache)
 
         for name, expose_dict in exposed.items():
             for to_expose in expose_dict:
                 logging.debug(
                     "Exposing %s %s %s", name, to_expose["use"], to_expose["as"]
                 )
-                inputs.expose(name, to_expose["use"], to_expose["as"])
+                options = {
+                    key: to_expose[key]
+                    for key in ("columns", "filter", "partition_on")
+                    if key in to_expose
+                }
+                inputs.expose(name, to_expose["use"], to_expose["as"], **options)
 
         return inputs
 
@@ -421,6 +582,20 @@ Hooks can be one of {Pipeline.VALID_HOOKS}"""
             return monitor(**cfg_monitor['with'])
         return None
 
+    def build_cache(self, cfg_cache):
+        """
+        Sets up jobs outputs cache from `cache` field in YAML files
+        """
+        if not cfg_cache:
+            return None
+        if isinstance(cfg_cache, str):
+            cfg_cache = {"path": cfg_cache}
+        cfg_cache = dict(cfg_cache)
+        cfg_cache["path"] = os.path.join(self.path, cfg_cache.get("path", ".yapp_cache"))
+        from yapp.core.cache import StepCache  # pylint: disable=import-outside-toplevel
+
+        return StepCache(**cfg_cache)
+
     def do_validation(self, pipelines_yaml: dict):
         """
         Performs validation on a dict read from a pipelines.yml file
@@ -432,6 +607,9 @@ Hooks can be one of {Pipeline.VALID_HOOKS}"""
         Args:
             pipelines_yaml (dict): pipelines_yaml
         """
+        # cerberus is imported only when validating
+        from yapp.cli.validation import validate  # pylint: disable=import-outside-toplevel
+
         config_errors = validate(pipelines_yaml)
 
         if config_errors:
@@ -445,9 +623,12 @@ Hooks can be one of {Pipeline.VALID_HOOKS}"""
         else:
             logging.debug("Configuration OK")
 
-    def parse(self, skip_validation=False):
+    def compile(self, skip_validation=False):
         """
-        Reads and parses pipelines.yml, creates a pipeline object
+        Reads pipelines.yml and compiles the pipeline definitions in a plan
+
+        The plan is a JSON serializable dict with the pipeline definitions merged with the global
+        ones and its steps in topological order, from which the pipeline is built.
         """
 
         # Read yaml configuration and validate it
@@ -466,7 +647,7 @@ Hooks can be one of {Pipeline.VALID_HOOKS}"""
         global_config = {}  # used for `config` tag
         try:
             cfg = pipelines_yaml.pop("+all")
-            global_config = cfg.pop("config")
+            global_config = cfg.pop("config", {})
         except KeyError:
             logging.debug("'+all' not found: no global configuration defined.")
             cfg = {}
@@ -495,20 +676,76 @@ Hooks can be one of {Pipeline.VALID_HOOKS}"""
         pipeline_config = pipeline_cfg.get("config", {})
         global_config.update(pipeline_config)
 
-        cfg_monitor = cfg.get("monitor")
-        cfg_monitor = pipeline_cfg.get("monitor", cfg_monitor)
-
-        # Building objects
-        inputs = self.build_inputs(cfg["inputs"], global_config)
-        outputs = self.build_outputs(cfg["outputs"])
-        hooks = self.build_hooks(cfg["hooks"])
-        monitor = self.build_monitor(cfg_monitor)
+        plan = {
+            "pipeline": self.pipeline_name,
+            "validated": not skip_validation,
+            "steps": compile_steps(self.pipeline_name, pipeline_cfg["steps"]),
+            "config": global_config,
+            "keep": cfg["keep"],
+        }
+        for field in ("inputs", "outputs", "hooks"):
+            plan[field] = cfg[field]
+        defaults = {
+            "workers": 1,
+            "executor": "thread",
+            "free_outputs": False,
+            "write_behind": False,
+        }
+        for field in ConfigParser.override_fields:
+            plan[field] = pipeline_cfg.get(field, cfg.get(field, defaults.get(field)))
+        plan["free_outputs"] = as_bool(plan["free_outputs"])
+        return plan
+
+    def build(self, plan):
+        """
+        Creates a pipeline object from a compiled plan
+        """
+        inputs = self.build_inputs(plan["inputs"], plan["config"], plan["inputs_cache"])
+        outputs = self.build_outputs(plan["outputs"])
+        hooks = self.build_hooks(plan["hooks"])
+        monitor = self.build_monitor(plan["monitor"])
         pipeline = self.build_pipeline(
-            pipeline_cfg, inputs=inputs, outputs=outputs, hooks=hooks, monitor=monitor
+            plan["steps"],
+            inputs=inputs,
+            outputs=outputs,
+            hooks=hooks,
+            monitor=monitor,
+            cache=self.build_cache(plan["cache"]),
+            **pipeline_options(plan),
         )
+        logging.debug("Modules cache statistics: %s", self.module_stats)
 
         return pipeline
 
+    def parse(self, skip_validation=False):
+        """
+        Reads and parses pipelines.yml, creates a pipeline object
+
+        With plan_cache, the compiled plan is reused until pipelines.yml or any file the pipeline
+        modules are loaded from change (see PlanCache).
+        """
+        if self.plans is None:
+            return self.build(self.compile(skip_validation))
+
+        cached = self.plans.load(self.pipelines_file, self.pipeline_name, skip_validation)
+        if cached is not None:
+            plan, modules = cached
+            self.modules.update(modules)
+            return self.build(plan)
+
+        plan = self.compile(skip_validation)
+        try:
+            # the pipeline is built from the same plan that is going to be cached
+            plan = json.loads(json.dumps(dump_env(plan)))
+        except (TypeError, ValueError) as error:
+            logging.debug("Cannot cache compiled plan for %s: %s", self.pipeline_name, error)
+            return self.build(plan)
+        pipeline = self.build(load_env(plan))
+        self.plans.save(
+            self.pipelines_file, self.pipeline_name, plan, self.modules, sorted(self.shadowing)
+        )
+        return pipeline
+
     def switch_workdir(self, workdir=None):
         """
         Switches to the pipeline workdir that jobs and hooks expect
@@ -0,0 +1,165 @@
+"""
+Compiled pipelines cache
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+
+from yapp import __version__
+from yapp.cli.yaml_reader import EnvVar
+from yapp.core.errors import MissingConfiguration, MissingEnv
+
+
+def dump_env(value):
+    """
+    Returns value with values of environment variables replaced by {"+env": name}
+    """
+    if isinstance(value, EnvVar):
+        return {"+env": value.name}
+    if isinstance(value, dict):
+        return {key: dump_env(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [dump_env(item) for item in value]
+    return value
+
+
+def load_env(value):
+    """
+    Returns value with {"+env": name} replaced by the current value of the environment variable
+    """
+    if isinstance(value, dict):
+        if list(value) == ["+env"]:
+            try:
+                return EnvVar(os.environ[value["+env"]], value["+env"])
+            except KeyError:
+                raise MissingEnv(value["+env"]) from None
+        return {key: load_env(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [load_env(item) for item in value]
+    return value
+
+
+def user_cache_dir():
+    """
+    Returns the directory where yapp caches data of the current user
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "yapp")
+
+
+def is_stale(cached):
+    """
+    Returns True if a module file used by a cached plan changed, or if a file was added where a
+    module would be found first
+    """
+    for path, mtime in cached["files"].items():
+        try:
+            if os.stat(path).st_mtime_ns != mtime:
+                return True
+        except OSError:
+            return True
+    return any(os.path.isfile(path) for path in cached["shadowing"])
+
+
+class PlanCache:
+    """
+    Cache of compiled pipelines plans
+
+    A plan is stored along with the modules used by the pipeline and where they were found, and is
+    reused until pipelines.yml, the yapp version or any of those files change, or until a file is
+    added where a module would be found first (shadowing the one used by the plan).
+    """
+
+    def __init__(self, directory=None):
+        """__init__.
+
+        Args:
+            directory (str | None):
+                directory where plans are stored, by default `plans` in the user cache directory
+        """
+        self.directory = directory or os.path.join(user_cache_dir(), "plans")
+
+    def __repr__(self):
+        return f"<yapp plan cache {self.directory}>"
+
+    def path(self, pipelines_file, pipeline_name):
+        """
+        Returns the path of the cached plan for a pipeline, plans of every project are stored in
+        the same directory
+        """
+        name = f"{os.path.abspath(pipelines_file)}\0{pipeline_name}".encode()
+        return os.path.join(self.directory, f"{hashlib.sha256(name).hexdigest()[:16]}.json")
+
+    @staticmethod
+    def key(pipelines_file, pipeline_name):
+        """
+        Returns the hash of pipelines.yml, the pipeline name and yapp version
+        """
+        try:
+            with open(pipelines_file, "rb") as file:
+                content = file.read()
+        except FileNotFoundError:
+            raise MissingConfiguration() from None
+        key = hashlib.sha256(content)
+        key.update(f"{pipeline_name}:{__version__}".encode())
+        return key.hexdigest()
+
+    def load(self, pipelines_file, pipeline_name, skip_validation=False):
+        """
+        Returns the cached plan and the modules it uses, None if missing or stale
+        """
+        try:
+            with open(self.path(pipelines_file, pipeline_name), "r", encoding="utf-8") as file:
+                cached = json.load(file)
+        except (OSError, ValueError) as error:
+            logging.debug("No compiled plan for %s: %s", pipeline_name, error)
+            return None
+        if cached.get("key") != self.key(pipelines_file, pipeline_name) or is_stale(cached):
+            logging.debug("Compiled plan for %s is stale", pipeline_name)
+            return None
+        if not (cached["plan"]["validated"] or skip_validation):
+            return None
+        logging.debug("Using compiled plan for %s", pipeline_name)
+        return load_env(cached["plan"]), cached["modules"]
+
+    def save(self, pipelines_file, pipeline_name, plan, modules, shadowing):
+        """
+        Writes a compiled plan
+
+        Args:
+            pipelines_file (str):
+                path of pipelines.yml
+            pipeline_name (str):
+                name of the pipeline
+            plan (dict):
+                compiled plan, with environment variables replaced (see dump_env)
+            modules (dict):
+                module name -> {"file": path} or {"module": name} it was loaded from
+            shadowing (list):
+                paths where modules would have been found first, missing when compiling
+        """
+        files = {}
+        for location in modules.values():
+            if location and "file" in location:
+                files[location["file"]] = os.stat(location["file"]).st_mtime_ns
+        cached = {
+            "key": self.key(pipelines_file, pipeline_name),
+            "plan": plan,
+            "modules": modules,
+            "files": files,
+            "shadowing": shadowing,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        path = self.path(pipelines_file, pipeline_name)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(cached, file)
+        os.replace(temp_path, path)
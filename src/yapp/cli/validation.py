@@ -37,9 +37,47 @@ def check_code_reference(field, value, error):
         error(field, f'"{value}" is not a valid reference string')
 
 
+def check_flag(field, value, error):
+    """
+    Check if a value can be used as a boolean flag
+    """
+    # YAML booleans are read as strings (see yapp.cli.yaml_reader.yaml_read)
+    if not isinstance(value, bool) and str(value).lower() not in (
+        "true",
+        "false",
+        "yes",
+        "no",
+        "on",
+        "off",
+        "1",
+        "0",
+    ):
+        error(field, f'"{value}" is not a valid boolean flag')
+
+
+def check_profile(field, value, error):
+    """
+    Check if a value can be used as a step profile option, either a boolean flag or "memory"
+    """
+    if str(value).lower() != "memory":
+        check_flag(field, value, error)
+
+
 input_expose_schema = {
     "use": {"required": True, "type": "string"},
     "as": {"required": True, "type": ["string", "list"]},
+    "columns": {"required": False, "type": "list", "schema": {"type": "string"}},
+    "filter": {"required": False, "type": "dict"},
+    "partition_on": {
+        "required": False,
+        "type": "dict",
+        "schema": {
+            "column": {"required": True, "type": "string"},
+            "lower": {"required": True, "type": "number"},
+            "upper": {"required": True, "type": "number"},
+            "num_partitions": {"required": True, "type": "integer", "min": 1},
+        },
+    },
 }
 
 schema_registry.add("expose", input_expose_schema.copy())
@@ -62,6 +100,14 @@ schema_registry.add(
             },
         },
         "name": {"required": False, "type": "string"},
+        "memoize": {
+            "required": False,
+            "anyof": [
+                {"type": "string", "allowed": ["run", "none"]},
+                {"type": "number", "min": 0},
+            ],
+        },
+        "prefetch_limit": {"required": False, "type": "integer", "min": 1},
     },
 )
 
@@ -95,6 +141,20 @@ schema_registry.add(
         "with": {"required": False, "type": "dict"},
         "inputs": {"required": False, "type": "dict", "schema": "step_expose"},
         "name": {"required": False, "type": "string"},
+        "executor": {
+            "required": False,
+            "type": "string",
+            # "async" is valid only as a pipeline default
+            "allowed": [e for e in Pipeline.VALID_EXECUTORS if e != "async"],
+        },
+        "cache": {"required": False, "check_with": check_flag},
+        "stream": {"required": False, "type": "string"},
+        "profile": {"required": False, "check_with": check_profile},
+        "columns": {
+            "required": False,
+            "type": "dict",
+            "valuesrules": {"type": "list", "schema": {"type": "string"}},
+        },
     },
 )
 
@@ -140,6 +200,53 @@ pipeline_schema = {
         "required": False,
         "type": "dict",
     },
+    "workers": {
+        "required": False,
+        "type": "integer",
+        "min": 1,
+    },
+    "executor": {
+        "required": False,
+        "type": "string",
+        "allowed": Pipeline.VALID_EXECUTORS,
+    },
+    "cache": {
+        "required": False,
+        "type": ["string", "dict"],
+        "schema": {
+            "path": {"required": False, "type": "string"},
+            "max_size": {"required": False, "type": ["string", "integer"]},
+            "max_age": {"required": False, "type": "number"},
+        },
+    },
+    "free_outputs": {"required": False, "check_with": check_flag},
+    "inputs_cache": {"required": False, "type": ["string", "integer"]},
+    "prefetch": {
+        "required": False,
+        "type": ["integer", "dict"],
+        "min": 0,
+        "schema": {
+            "jobs": {"required": False, "type": "integer", "min": 0},
+            "workers": {"required": False, "type": "integer", "min": 1},
+        },
+    },
+    "write_behind": {
+        "required": False,
+        "anyof": [
+            {"check_with": check_flag},
+            {
+                "type": "dict",
+                "schema": {"max_memory": {"required": False, "type": ["string", "integer"]}},
+            },
+        ],
+    },
+    "chunksize": {"required": False, "type": "integer", "min": 1},
+    "sampling": {"required": False, "type": "number", "min": 0.001},
+    "keep": {
+        "required": False,
+        "type": "list",
+        "schema": {"type": "string"},
+    },
     "monitor": {
         "required": False,
         "allow_unknown": False,
@@ -0,0 +1,70 @@
+"""
+pipelines.yml reading
+"""
+
+import functools
+import os
+
+from yapp.core.errors import MissingConfiguration, MissingEnv
+
+
+class EnvVar(str):
+    """
+    Value of an environment variable read with !env, keeping the variable name so that the value
+    is never written to compiled plans
+    """
+
+    def __new__(cls, value, name=None):
+        env_var = super().__new__(cls, value)
+        env_var.name = name
+        return env_var
+
+
+def env_constructor(loader, node):
+    """
+    Conctructor to automatically look up for env variables
+    """
+    try:
+        value = loader.construct_scalar(node)
+        return EnvVar(os.environ[value], value)
+    except KeyError as error:
+        raise MissingEnv(error.args[0]) from None
+
+
+def do_nothing_constructor(self, node):
+    """
+    Constructor just returning the string for the node
+    """
+    return self.construct_scalar(node)
+
+
+@functools.lru_cache(maxsize=None)
+def yaml_loader():
+    """
+    Returns the YAML loader class, using libyaml if available, with yapp constructors
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    loader = getattr(yaml, "CFullLoader", yaml.FullLoader)
+
+    # use !env VARIABLENAME to refer env variables
+    yaml.add_constructor("!env", env_constructor, Loader=loader)
+
+    # Disable awful YAML 1.1 behaviour on booleans-lookalike
+    # If I write 'on' I want 'on', not boolean True
+    yaml.add_constructor("tag:yaml.org,2002:bool", do_nothing_constructor, Loader=loader)
+    return loader
+
+
+def yaml_read(path):
+    """
+    Read YAML from path
+    """
+    import yaml  # pylint: disable=import-outside-toplevel
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            parsed = yaml.load(file, Loader=yaml_loader())
+        return parsed
+    except FileNotFoundError:
+        raise MissingConfiguration() from None
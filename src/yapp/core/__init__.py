@@ -7,6 +7,7 @@ from .input_adapter import InputAdapter
 from .inputs import Inputs
 from .job import Job
 from .monitor import Monitor
+from .options import PipelineOptions
 from .output_adapter import OutputAdapter
 from .pipeline import Pipeline
 
@@ -14,6 +15,7 @@ __all__ = [
     "AttrDict",
     "Job",
     "Pipeline",
+    "PipelineOptions",
     "Inputs",
     "OutputAdapter",
     "InputAdapter",
@@ -0,0 +1,195 @@
+import asyncio
+import graphlib
+import inspect
+import logging
+
+from .job import get_job_args
+
+
+async def _await(awaitable):
+    return await awaitable
+
+
+def run_sync(func, *args, **kwargs):
+    """Calls func, if it returns an awaitable runs it to completion in a new event loop"""
+    out = func(*args, **kwargs)
+    if inspect.isawaitable(out):
+        out = asyncio.run(_await(out))
+    return out
+
+
+async def run_async(func, *args, **kwargs):
+    """Awaits func if it is a coroutine function, otherwise runs it in a separate thread
+
+    If func is not a coroutine function but returns an awaitable, that is awaited too.
+    """
+    if inspect.iscoroutinefunction(func):
+        return await func(*args, **kwargs)
+    out = await asyncio.to_thread(func, *args, **kwargs)
+    if inspect.isawaitable(out):
+        out = await out
+    return out
+
+
+def output_method(results, chunk):
+    """Returns the OutputAdapter method saving an output and its extra arguments"""
+    if chunk is not None:
+        return "_save_chunk", (chunk,)
+    return ("_save_result" if results else "_save"), ()
+
+
+class AsyncExecutorMixin:
+    """
+    Pipeline methods running jobs as concurrent tasks on an event loop, used by the "async"
+    executor
+    """
+
+    async def run_hook_async(self, hook_name):
+        """Same as `run_hook` but awaits coroutine hooks, used with the "async" executor
+
+        Args:
+            hook_name (str):
+                name of the hook to run ("on_pipeline_start", "on_job_start", etc.)
+        """
+        hooks = getattr(self, hook_name)
+        async with self._sync.async_lock:
+            for hook in hooks:
+                await self.timed_async(f"{hook_name} hook", hook.__name__, run_async, hook, self)
+
+    async def timed_async(self, typename, name, func, *args, _update_object=None, **kwargs):
+        """Same as `timed` but for coroutine functions
+
+        Returns:
+            (Any) The output of provided function
+        """
+        with self._timing(typename, name, _update_object):
+            return await func(*args, **kwargs)
+
+    async def _run_job_async(self, job):
+        """Execution of a single job with the "async" executor
+
+        Coroutine jobs are awaited, other ones are run in a separate thread (or process).
+        """
+
+        args = get_job_args(job)
+        logging.debug("Required inputs for %s: %s", job.name, args)
+
+        await self.run_hook_async("job_start")
+
+        try:
+            streamed = inspect.isgeneratorfunction(job.execute)
+            # load all inputs concurrently and call execute with them
+            job_inputs = await asyncio.gather(
+                *[run_async(self.inputs.__getitem__, i) for i in args]
+            )
+            cache_key, last_output = await asyncio.to_thread(
+                self._cache_lookup, job, args, job_inputs
+            )
+            cached = last_output is not None
+            if streamed:
+                last_output = self._stream_output(job, job_inputs)
+            elif not cached:
+                profiled = job.profile or self.options.profiling.profile
+                if profiled and inspect.iscoroutinefunction(job.execute):
+                    logging.warning("Coroutine job %s is not profiled", job.name)
+                    profiled = False
+                if job.executor == "process" or profiled:
+                    execute = self._sampled(job, self._execute)
+                    last_output = await asyncio.to_thread(execute, job, job_inputs)
+                else:
+                    execute = self._sampled(job, job.execute)
+                    last_output = await run_async(execute, *job_inputs, **job.params)
+                last_output = self._job_output(job, last_output)
+                if cache_key:
+                    cache = self.options.caching.cache
+                    await asyncio.to_thread(cache.save, cache_key, last_output)
+
+            await self.run_hook_async("job_finish")
+
+            # save output (already done if cached or streamed) and merge into inputs for next steps
+            if not cached and not streamed:
+                for key, value in last_output.items():
+                    await self.save_output_async(key, value)
+            self._merge_output(job, args, last_output)
+
+        except Exception as error:
+            self._job_failed(job, error)
+            await self.run_hook_async("job_fail")
+            raise error
+
+    async def save_output_async(self, name, data, results=False, chunk=None):
+        """Same as `save_output` but awaits coroutine output adapters
+
+        Args:
+            name (str):
+                name to pass to the output adapters when saving the data
+            data (Any):
+                data to save
+            chunk (int | None):
+                index of the chunk, if data is a chunk of a stream
+        """
+
+        method, args = output_method(results, chunk)
+        if self._state.writers is not None:
+            # may wait for pending writes, if over their memory limit
+            await asyncio.to_thread(self._state.writers.submit, method, name, data, *args)
+            return
+        for output, lock in zip(self.outputs, self._sync.async_output_locks):
+            async with lock:
+                with self.metrics.measure("output", f"{output.name}.{name}"):
+                    await run_async(getattr(output, method), name, data, *args)
+            logging.debug("saved %s output to %s", name, output)
+
+    async def _run_job_class_async(self, job_class, limit):
+        """Instantiates and runs a single job in the current task"""
+        self._prefetch(job_class)
+        logging.debug('Instantiating new job from "%s"', job_class)
+        job_obj = job_class(self)
+        self._sync.current_job.set(job_obj)
+        async with limit:
+            await self.timed_async(
+                "job", job_obj.name, self._run_job_async, job_obj, _update_object=job_obj
+            )
+
+    async def _run_async(self):
+        """Runs all Pipeline's jobs as concurrent tasks on the running event loop
+
+        Jobs are started as soon as all their dependencies are completed, as in `_run_parallel`.
+        """
+        self._sync.async_lock = asyncio.Lock()
+        self._sync.async_output_locks = [asyncio.Lock() for _ in self.outputs]
+        self._sync.loop = asyncio.get_running_loop()
+        # workers is used to limit concurrent jobs only if explicitly specified
+        workers = self.options.execution.workers
+        limit = asyncio.Semaphore(workers if workers > 1 else len(self.dependencies) or 1)
+
+        await self.run_hook_async("pipeline_start")
+
+        sorter = graphlib.TopologicalSorter(self.dependencies)
+        sorter.prepare()
+        running = {}
+        error = None
+        while sorter.is_active():
+            if error is None:
+                for job_class in sorter.get_ready():
+                    task = asyncio.create_task(self._run_job_class_async(job_class, limit))
+                    running[task] = job_class
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                job_class = running.pop(task)
+                if task.exception() is not None:
+                    error = error or task.exception()
+                else:
+                    sorter.done(job_class)
+        if error is not None:
+            raise error
+
+        await asyncio.to_thread(self.flush_outputs)
+        await self.run_hook_async("pipeline_finish")
+
+        for output_name in self.save_results:
+            data = await run_async(self.inputs.__getitem__, output_name)
+            await self.save_output_async(output_name, data, results=True)
+        await asyncio.to_thread(self.flush_outputs)
@@ -0,0 +1,132 @@
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+
+from .store import ArtifactStore
+
+
+def fingerprint(value):
+    """
+    Returns a sha256 hex digest of any picklable value
+
+    Large buffers (NumPy arrays, pandas DataFrames blocks, etc.) are hashed directly instead of
+    being copied into the pickle stream.
+    """
+    digest = hashlib.sha256()
+
+    def hash_buffer(buffer):
+        digest.update(buffer.raw())
+        # falsy return value: buffer is kept out-of-band
+
+    data = pickle.dumps(value, protocol=5, buffer_callback=hash_buffer)
+    digest.update(data)
+    return digest.hexdigest()
+
+
+class StepCache:
+    """
+    Content addressed cache for jobs outputs
+
+    Outputs are stored on disk using a key combining fingerprints of:
+     - the job source (the module it was loaded from)
+     - job params
+     - pipeline configuration, only the keys listed in `config_keys` if the job declares them
+     - the inputs the job consumes
+
+    If any of those changes, the job is run again.
+    Outputs are kept in an ArtifactStore, whose size can be limited.
+    """
+
+    def __init__(self, path=".yapp_cache", max_size=None, max_age=None):
+        """__init__.
+
+        Args:
+            path (str):
+                Directory where outputs are stored
+            max_size (int | str | None):
+                Maximum total size of the cache, see ArtifactStore
+            max_age (float | None):
+                Maximum age of cached outputs in seconds, see ArtifactStore
+        """
+        self.path = path
+        self.store = ArtifactStore(path, max_size=max_size, max_age=max_age)
+        # fingerprints of source files, by path and modification time
+        self.sources = {}
+
+    def __repr__(self):
+        return f"<yapp step cache {self.path}>"
+
+    def source_fingerprint(self, job):
+        """
+        Returns a fingerprint of the source code of a job
+        """
+        if job.source:
+            stat = os.stat(job.source)
+            cache_key = (job.source, stat.st_mtime_ns, stat.st_size)
+            if cache_key not in self.sources:
+                with open(job.source, "rb") as file:
+                    self.sources[cache_key] = hashlib.sha256(file.read()).hexdigest()
+            return self.sources[cache_key]
+
+        try:
+            return fingerprint(inspect.getsource(type(job)))
+        except (OSError, TypeError):
+            logging.debug("Cannot find source for %s, using its name", job.name)
+            return fingerprint(type(job).__qualname__)
+
+    def key(self, job, job_inputs, config):
+        """
+        Computes the cache key for a job
+
+        Args:
+            job (Job):
+                job to compute the key for
+            job_inputs (dict):
+                mapping from input names to values consumed by the job
+            config (dict):
+                pipeline configuration
+
+        Raises:
+            pickle.PicklingError, TypeError, AttributeError:
+                if any of the inputs cannot be fingerprinted
+        """
+        if job.config_keys is not None:
+            config = {name: config.get(name) for name in job.config_keys}
+            # same for jobs taking config as argument
+            if "config" in job_inputs:
+                job_inputs = {**job_inputs, "config": config}
+        parts = {
+            "job": job.name,
+            "source": self.source_fingerprint(job),
+            "params": json.dumps(job.params, sort_keys=True, default=repr),
+            "config": json.dumps(config, sort_keys=True, default=repr),
+            "inputs": {name: fingerprint(value) for name, value in job_inputs.items()},
+        }
+        return fingerprint(json.dumps(parts, sort_keys=True))
+
+    def load(self, key):
+        """
+        Returns cached outputs for key, None if missing (or partially evicted)
+        """
+        names = self.store.get(key)
+        if names is None:
+            return None
+        outputs = {}
+        for name in names:
+            try:
+                outputs[name] = self.store[f"{key}/{name}"]
+            except KeyError:
+                return None
+        return outputs
+
+    def save(self, key, outputs):
+        """
+        Stores outputs for key
+        """
+        for name, value in outputs.items():
+            self.store.put(f"{key}/{name}", value)
+        # list of outputs names, stored last so that it's never found without its outputs
+        self.store.put(key, list(outputs))
@@ -9,12 +9,30 @@ class InputAdapter(ABC):
     An input adapter represents a type of input from a specific source
     """
 
+    # memoization policy for loaded inputs: "none" (default) loads them every time they are
+    # requested, "run" caches them for the whole run, a number is their time to live in seconds
+    memoize = "none"
+
+    # maximum number of inputs loaded concurrently from the adapter when prefetching,
+    # unlimited if None
+    prefetch_limit = None
+
+    # number of rows per chunk for adapters able to read inputs in chunks, if None inputs are
+    # read at once
+    chunksize = None
+
     @abstractmethod
     def get(self, key):
         """
         Returns the requested input
         """
 
+    def submit(self, key, **options):
+        """
+        Called before a pipeline runs for each input needed by its jobs, with the same arguments
+        later passed to get. Override it to start loading inputs in background
+        """
+
     def __getattr__(self, key):
         logging.debug('Loading input from %s: "%s"', self.__class__.__name__, key)
         return self.get(key)
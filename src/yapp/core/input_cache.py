@@ -0,0 +1,139 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from .sizes import approx_size, parse_size
+
+
+class InputCache:
+    """
+    Memoization cache for inputs loaded from input adapters
+
+    Entries are evicted in least recently used order once the cache memory usage grows over
+    max_memory. Entries can also have a time to live.
+    """
+
+    # default maximum memory used by cached inputs
+    DEFAULT_MAX_MEMORY = "1GB"
+
+    def __init__(self, max_memory=DEFAULT_MAX_MEMORY):
+        """__init__.
+
+        Args:
+            max_memory (int | str | None):
+                Maximum memory used by cached inputs, in bytes or as a string like "2GB".
+                Unbounded if None
+        """
+        self.max_memory = parse_size(max_memory)
+        # key -> (value, size, expires_at)
+        self.entries = OrderedDict()
+        self.memory = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.RLock()
+        # used to load each key only once, even when requested concurrently
+        self._key_locks = {}
+
+    def __repr__(self):
+        return f"<yapp input cache {len(self.entries)} entries {self.memory} bytes>"
+
+    def __contains__(self, key):
+        return self.lookup(key, count=False)[0]
+
+    @property
+    def stats(self):
+        """
+        Cache statistics
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self.entries),
+                "memory": self.memory,
+            }
+
+    def key_lock(self, key):
+        """
+        Returns a lock to be held while loading key
+        """
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def lookup(self, key, count=True):
+        """
+        Looks up key in cache
+
+        Returns:
+            (tuple) (True, value) if found, (False, None) otherwise
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[2] is not None and entry[2] < time.monotonic():
+                logging.debug("Cached input %s expired", key)
+                self.discard(key)
+                entry = None
+            if entry is None:
+                if count:
+                    self.misses += 1
+                return False, None
+            self.entries.move_to_end(key)
+            if count:
+                self.hits += 1
+            return True, entry[0]
+
+    def put(self, key, value, ttl=None):
+        """
+        Adds value to cache, evicting least recently used entries if needed
+
+        Args:
+            key (hashable):
+                cache key
+            value (Any):
+                value to cache
+            ttl (float | None):
+                seconds after which the entry expires, never if None
+        """
+        size = approx_size(value)
+        if self.max_memory is not None and size > self.max_memory:
+            logging.debug("Input %s too big to be cached (%s bytes)", key, size)
+            return
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        with self._lock:
+            self.discard(key)
+            self.entries[key] = (value, size, expires_at)
+            self.memory += size
+            while self.max_memory is not None and self.memory > self.max_memory:
+                evicted_key, (_, evicted_size, _) = self.entries.popitem(last=False)
+                logging.debug("Evicting cached input %s", evicted_key)
+                self.memory -= evicted_size
+                self.evictions += 1
+
+    def replace(self, key, old, new, ttl=None):
+        """
+        Replaces the cached value of key with new, only if it is still old
+        """
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] is old:
+                self.put(key, new, ttl)
+
+    def discard(self, key):
+        """
+        Removes key from cache, if present
+        """
+        with self._lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.memory -= entry[1]
+
+    def clear(self):
+        """
+        Removes all entries
+        """
+        with self._lock:
+            self.entries.clear()
+            self.memory = 0
@@ -1,6 +1,43 @@
+import asyncio
+import concurrent.futures
+import inspect
+import json
 import logging
+import threading
+from collections.abc import Iterator
 
 from .attr_dict import AttrDict
+from .input_cache import InputCache
+from .sizes import approx_size
+
+
+class SharedAwaitable:
+    """
+    Awaitable that can be awaited many times, even concurrently and from different event loops,
+    awaiting the wrapped awaitable only once
+    """
+
+    def __init__(self, awaitable):
+        self.awaitable = awaitable
+        self._future = concurrent.futures.Future()
+        self._started = False
+        self._lock = threading.Lock()
+
+    def __await__(self):
+        return self._wait().__await__()
+
+    async def _wait(self):
+        with self._lock:
+            first, self._started = not self._started, True
+        if not first:
+            return await asyncio.wrap_future(self._future)
+        try:
+            value = await self.awaitable
+        except BaseException as error:
+            self._future.set_exception(error)
+            raise
+        self._future.set_result(value)
+        return value
 
 
 class Inputs(dict):
@@ -8,11 +45,19 @@ class Inputs(dict):
     Inputs implementation (just dict with some utility methods)
     """
 
-    def __init__(self, *args, sources=None, config=None, **kwargs):
+    def __init__(self, *args, sources=None, config=None, cache=None, **kwargs):
         super().__init__(*args, **kwargs)
         self.exposed = {}  # mapping name to source
+        self.options = {}  # mapping name to options passed to the adapter get, like columns
         self.sources = {}
         self.config = AttrDict(config)
+        # memoization of inputs loaded from adapters
+        self.cache = cache if cache is not None else InputCache()
+        # cache key -> future of an input being prefetched from an adapter not memoizing inputs,
+        # taken by the first load of the input
+        self.prefetched = {}
+        # metrics of the pipeline using the inputs, records adapters calls
+        self.metrics = None
         if not sources:
             return
         for source in sources:
@@ -30,8 +75,7 @@ class Inputs(dict):
             logging.debug('Using input "%s"', key)
             # if it's an exposed resource from an adapter return it
             if key in self.exposed:
-                source, name = self.exposed[key]
-                return self.sources[source][name]
+                return self.load(*self.exposed[key], **self.options.get(key, {}))
             return super().__getitem__(key)
         except KeyError as error:
             # allow accessing config from jobs
@@ -43,6 +87,114 @@ class Inputs(dict):
             logging.debug('%s Trying to load missing input "%s"', self.__repr__(), key)
             raise KeyError(f'Trying to load missing input "{key}"') from error
 
+    @staticmethod
+    def cache_key(source, name, options=None):
+        """
+        Returns the memoization cache key for an input loaded from an adapter with options
+        """
+        if not options:
+            return (source, name)
+        return (source, name, json.dumps(options, sort_keys=True, default=str))
+
+    def fetch(self, source, name, **options):
+        """
+        Loads an input from an adapter, without memoization
+
+        Args:
+            source (str):
+                name of the adapter
+            name (str):
+                name of the input inside the adapter
+            **options:
+                passed to the adapter get, like columns or filter for SqlInput
+        """
+        adapter = self.sources[source]
+
+        def get():
+            if self.metrics is None:
+                return read()
+            if inspect.iscoroutinefunction(adapter.get):
+                return get_async()
+            with self.metrics.measure("input", f"{source}.{name}") as record:
+                value = read()
+                record["output_size"] = approx_size(value, deep=False)
+            return value
+
+        async def get_async():
+            with self.metrics.measure("input", f"{source}.{name}") as record:
+                value = await read()
+                record["output_size"] = approx_size(value, deep=False)
+            return value
+
+        def read():
+            if options:
+                logging.debug('Loading input from %s: "%s" %s', source, name, options)
+                return adapter.get(name, **options)
+            return adapter[name]
+
+        return get()
+
+    def load(self, source, name, **options):
+        """
+        Loads an input from an adapter, memoizing it according to the adapter policy
+
+        Args:
+            source (str):
+                name of the adapter
+            name (str):
+                name of the input inside the adapter
+            **options:
+                passed to the adapter get, like columns or filter for SqlInput
+        """
+        cache_key = self.cache_key(source, name, options)
+        future = self.prefetched.pop(cache_key, None)
+        if future is not None:
+            try:
+                logging.debug('Using prefetched input "%s" from "%s"', name, source)
+                return future.result()
+            except Exception:  # pylint: disable=broad-except
+                # loaded again, failing with a proper error
+                pass
+
+        policy = getattr(self.sources[source], "memoize", "none")
+        if policy == "none":
+            return self.fetch(source, name, **options)
+        ttl = None if policy == "run" else float(policy)
+
+        with self.cache.key_lock(cache_key):
+            found, value = self.cache.lookup(cache_key)
+            if found:
+                logging.debug('Using cached input "%s" from "%s"', name, source)
+                return value
+            value = self.fetch(source, name, **options)
+            if inspect.isawaitable(value):
+                # cached while being awaited, so that concurrent loads await the same one
+                shared = SharedAwaitable(self._memoize_awaitable(cache_key, value, ttl))
+                self.cache.put(cache_key, shared, ttl)
+                return shared
+            # iterators (like chunked readers) cannot be reused
+            if not isinstance(value, Iterator):
+                self.cache.put(cache_key, value, ttl)
+            return value
+
+    async def _memoize_awaitable(self, cache_key, awaitable, ttl):
+        try:
+            value = await awaitable
+        except BaseException:
+            self.cache.discard(cache_key)
+            raise
+        found, cached = self.cache.lookup(cache_key, count=False)
+        if found and isinstance(cached, SharedAwaitable):
+            self.cache.replace(cache_key, cached, value, ttl)
+        return value
+
+    def forget(self, key):
+        """
+        Removes an exposed input from the memoization cache, it will be loaded again if requested
+        """
+        if key in self.exposed:
+            self.cache.discard(self.cache_key(*self.exposed[key], self.options.get(key)))
+
     def __setitem__(self, key, value):
         if key in self.exposed:
             raise ValueError("Cannot assign to exposed input from adapter")
@@ -52,6 +204,7 @@ class Inputs(dict):
         if isinstance(other, Inputs):
             self.sources.update(other.sources)
             self.exposed.update(other.exposed)
+            self.options.update(other.options)
         super().update(other, **kwargs)
 
     def __or__(self, _):
@@ -64,11 +217,24 @@ class Inputs(dict):
         self.sources[name] = adapter
         logging.info('Registered new input source: "%s"', name)
 
-    def expose(self, source, internal_name, name):
+    def expose(self, source, internal_name, name, **options):
         """
         Expose input attribute using another name
+
+        Args:
+            source (str):
+                name of the adapter
+            internal_name (str):
+                name of the input inside the adapter
+            name (str):
+                name used by jobs
+            **options:
+                passed to the adapter get when loading the input, like columns or filter for
+                SqlInput
         """
         # add an empty value instead of overriding all special methods like __len__, __contains__
         self[name] = None
         self.exposed[name] = (source, internal_name)
+        if options:
+            self.options[name] = options
         logging.info('Exposed "%s" from "%s" as "%s"', internal_name, source, name)
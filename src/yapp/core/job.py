@@ -1,3 +1,4 @@
+import inspect
 from abc import ABC, abstractmethod
 from typing import final
 
@@ -10,6 +11,22 @@ class Job(ABC):
     started_at = None
     finished_at = None
     params = {}
+    # where to run the job ("thread" or "process"), if None the pipeline default is used
+    executor = None
+    # path of the file the job was loaded from, if any
+    source = None
+    # whether job outputs can be cached, used only if the pipeline has a cache
+    cache = True
+    # top-level config keys read by the job, only their values are part of its cache key. If None
+    # the whole config is, as the job may read any of it
+    config_keys = None
+    # name of the stream of chunks yielded by generator jobs, if None the job name is used
+    stream = None
+    # columns used from each input, as {input name: [column, ...]}, inputs from adapters
+    # supporting it (like SqlInput) are read projected to the columns used by all their consumers
+    columns = None
+    # profile execute with cProfile (see yapp.core.profiling), also tracking allocations if "memory"
+    profile = False
 
     @final
     def __init__(self, pipeline):
@@ -46,3 +63,11 @@ class Job(ABC):
         Shortcut for self.pipeline.config
         """
         return self.pipeline.config
+
+
+def get_job_args(job):
+    """Returns the names of the inputs required by a job, that is `execute` positional arguments"""
+    arg_spec = inspect.getfullargspec(job.execute)
+    if arg_spec.defaults:
+        return arg_spec.args[1 : -len(arg_spec.defaults)]
+    return arg_spec.args[1:]
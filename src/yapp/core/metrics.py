@@ -0,0 +1,272 @@
+import asyncio
+import contextvars
+import gc
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# garbage collections completed since the first Metrics object was created, their total time and
+# when the running one started
+_gc_stats = {"collections": 0, "pause": 0.0, "started_at": None}
+
+
+def _gc_callback(phase, info):  # pylint: disable=unused-argument
+    if phase == "start":
+        _gc_stats["started_at"] = time.perf_counter()
+    elif _gc_stats["started_at"] is not None:
+        _gc_stats["collections"] += 1
+        _gc_stats["pause"] += time.perf_counter() - _gc_stats["started_at"]
+        _gc_stats["started_at"] = None
+
+
+def _current_task():
+    try:
+        return asyncio.current_task()
+    except RuntimeError:
+        # no event loop running in this thread
+        return None
+
+
+def _prometheus_labels(**values):
+    """Returns values as Prometheus labels, escaping them"""
+    escaped = {
+        key: str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        for key, value in values.items()
+    }
+    return ",".join(f'{key}="{value}"' for key, value in escaped.items())
+
+
+def peak_rss():
+    """
+    Returns the peak resident set size of the process, in bytes, None if not available
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Metrics:
+    """
+    Structured metrics for a pipeline run
+
+    A record is kept for every measured call (jobs, hooks, inputs loaded from adapters and outputs
+    saved to them) with its wall time, CPU time of the whole process, increase of the process peak
+    RSS, garbage collections completed during the call and their total pause.
+    Records can be exported as JSON Lines, as a Prometheus textfile or as a Chrome trace.
+    """
+
+    # record fields exported to Prometheus, aggregated by kind and name
+    PROMETHEUS = {
+        "wall_time": ("wall_seconds", "Wall time", sum),
+        "cpu_time": ("cpu_seconds", "Process CPU time", sum),
+        "peak_rss_delta": ("peak_rss_delta_bytes", "Increase of the process peak RSS", max),
+        "gc_collections": ("gc_collections", "Garbage collections", sum),
+        "gc_pause": ("gc_pause_seconds", "Garbage collections pause", sum),
+        "output_size": ("output_bytes", "Approximate size of outputs", sum),
+    }
+
+    def __init__(self):
+        self.records = []
+        self._lock = threading.Lock()
+        # start times are taken with perf_counter (like wall times) and converted to UNIX
+        # timestamps adding this offset, so that they are consistent for the whole run
+        self._time_offset = time.time() - time.perf_counter()
+        # record of the innermost call being measured, in the current thread or task
+        self._current = contextvars.ContextVar("yapp_metrics_record", default=None)
+        with self._lock:
+            if _gc_callback not in gc.callbacks:
+                gc.callbacks.append(_gc_callback)
+
+    def __repr__(self):
+        return f"<yapp metrics {len(self.records)} records>"
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self.records))
+
+    def clear(self):
+        """
+        Removes all records, when a new run starts
+        """
+        with self._lock:
+            self.records = []
+            self._time_offset = time.time() - time.perf_counter()
+
+    def filter(self, kind=None, name=None):
+        """
+        Returns records matching kind and name
+        """
+        return [
+            record
+            for record in self
+            if (kind is None or record["kind"] == kind) and (name is None or record["name"] == name)
+        ]
+
+    @contextmanager
+    def measure(self, kind, name, **fields):
+        """
+        Context manager measuring a call, its record is added once completed
+
+        Args:
+            kind (str):
+                kind of call, like "job", "hook", "input" or "output"
+            name (str):
+                name of what is called
+            **fields:
+                added to the record
+        """
+        record = {"kind": kind, "name": name, **fields}
+        token = self._current.set(record)
+        gc_collections, gc_pause = _gc_stats["collections"], _gc_stats["pause"]
+        rss = peak_rss()
+        start, cpu_start = time.perf_counter(), time.process_time()
+        record["started_at"] = self._time_offset + start
+        try:
+            yield record
+            record["status"] = "ok"
+        except BaseException:
+            record["status"] = "failed"
+            raise
+        finally:
+            record["wall_time"] = time.perf_counter() - start
+            record["cpu_time"] = time.process_time() - cpu_start
+            record["peak_rss_delta"] = None if rss is None else peak_rss() - rss
+            record["gc_collections"] = _gc_stats["collections"] - gc_collections
+            record["gc_pause"] = _gc_stats["pause"] - gc_pause
+            record["thread"] = threading.current_thread().name
+            task = _current_task()
+            if task is not None:
+                record["task"] = task.get_name()
+            self._current.reset(token)
+            with self._lock:
+                self.records.append(record)
+
+    def update(self, **fields):
+        """
+        Adds fields to the record of the innermost call being measured, if any
+        """
+        record = self._current.get()
+        if record is not None:
+            record.update(fields)
+
+    def to_jsonl(self, file):
+        """
+        Writes records to file as JSON Lines, one record per line
+
+        Args:
+            file (str | TextIO):
+                path or text file
+        """
+        if isinstance(file, str):
+            with open(file, "w", encoding="utf-8") as opened:
+                self.to_jsonl(opened)
+            return
+        for record in self:
+            file.write(json.dumps(record, default=str) + "\n")
+
+    def to_prometheus(self, file, pipeline=""):
+        """
+        Writes metrics in the Prometheus text format, to be collected by the node exporter
+        textfile collector
+
+        Records with the same kind and name are aggregated: times and sizes are summed, peak RSS
+        increases are the maximum ones.
+
+        Args:
+            file (str | TextIO):
+                path or text file
+            pipeline (str):
+                pipeline name, added as label
+        """
+        if isinstance(file, str):
+            # written aside and moved in place, so that the collector never reads a partial file
+            temp_file = f"{file}.{os.getpid()}.tmp"
+            with open(temp_file, "w", encoding="utf-8") as opened:
+                self.to_prometheus(opened, pipeline)
+            os.replace(temp_file, file)
+            return
+        groups = {}
+        for record in self:
+            groups.setdefault((record["kind"], record["name"]), []).append(record)
+        groups = {
+            _prometheus_labels(pipeline=pipeline, kind=kind, name=name): records
+            for (kind, name), records in groups.items()
+        }
+
+        file.write("# HELP yapp_calls Number of calls\n# TYPE yapp_calls gauge\n")
+        for labels, records in groups.items():
+            file.write(f"yapp_calls{{{labels}}} {len(records)}\n")
+        for field, (metric, description, aggregate) in Metrics.PROMETHEUS.items():
+            file.write(f"# HELP yapp_{metric} {description}\n# TYPE yapp_{metric} gauge\n")
+            for labels, records in groups.items():
+                values = [record[field] for record in records if record.get(field) is not None]
+                if values:
+                    file.write(f"yapp_{metric}{{{labels}}} {aggregate(values)}\n")
+
+    def to_chrome_trace(self, file, pipeline=""):
+        """
+        Writes records as a Chrome trace (JSON trace event format), that can be opened with
+        Perfetto or chrome://tracing
+
+        Every call is a span on the track of the thread (or asyncio task) it was run in, nested
+        calls are shown inside the calls they were made from.
+
+        Args:
+            file (str | TextIO):
+                path or text file
+            pipeline (str):
+                pipeline name, used as process name
+        """
+        if isinstance(file, str):
+            with open(file, "w", encoding="utf-8") as opened:
+                self.to_chrome_trace(opened, pipeline)
+            return
+        records = sorted(self, key=lambda record: record["started_at"])
+        start = records[0]["started_at"] if records else 0
+        pid = os.getpid()
+        tracks = {}
+        events = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"yapp {pipeline}"}}
+        ]
+        for record in records:
+            track = record["thread"]
+            if "task" in record:
+                track += f" {record['task']}"
+            if track not in tracks:
+                tracks[track] = len(tracks) + 1
+                events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": pid,
+                        "tid": tracks[track],
+                        "args": {"name": track},
+                    }
+                )
+            fields = ("kind", "name", "started_at", "wall_time", "thread", "task")
+            events.append(
+                {
+                    "name": record["name"],
+                    "cat": record["kind"],
+                    "ph": "X",
+                    "ts": (record["started_at"] - start) * 1e6,
+                    "dur": record["wall_time"] * 1e6,
+                    "pid": pid,
+                    "tid": tracks[track],
+                    "args": {key: value for key, value in record.items() if key not in fields},
+                }
+            )
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file, default=str)
@@ -0,0 +1,140 @@
+"""
+Pipeline options, grouped by what they control
+"""
+
+from dataclasses import dataclass, field, fields, replace
+from typing import TYPE_CHECKING, Mapping, Sequence, Union
+
+if TYPE_CHECKING:
+    from .cache import StepCache
+
+
+@dataclass
+class ExecutionOptions:
+    """How jobs are run
+
+    Attributes:
+        workers (int):
+            Maximum number of jobs to run at the same time, when greater than 1 independent jobs
+            are run in parallel on a thread pool following the pipeline dependencies.
+            With the "async" executor jobs are run as concurrent tasks, workers is used to limit
+            them only if greater than 1
+        executor (str):
+            Default executor for jobs not specifying one, one of Pipeline.VALID_EXECUTORS
+        prefetch (int):
+            Number of upcoming jobs whose inputs from adapters are loaded in background while the
+            current ones run, 0 disables prefetching
+        prefetch_workers (int):
+            Number of background threads used to prefetch inputs
+        chunksize (int | None):
+            Number of rows per chunk for input adapters able to read inputs in chunks, if set
+            inputs from them are iterators over chunks
+        chunk_buffer (int):
+            Maximum number of chunks yielded by a generator job and not yet consumed by the
+            following job
+    """
+
+    workers: int = 1
+    executor: str = "thread"
+    prefetch: int = 0
+    prefetch_workers: int = 4
+    chunksize: Union[int, None] = None
+    chunk_buffer: int = 2
+
+
+@dataclass
+class CacheOptions:
+    """Which jobs outputs are reused between runs or kept in memory
+
+    Attributes:
+        cache (StepCache | None):
+            Cache for jobs outputs, jobs whose source, params and inputs did not change since a
+            previous run are skipped and their outputs loaded from it
+        free_outputs (bool):
+            Remove jobs outputs from inputs as soon as no following job needs them
+        keep (list):
+            Outputs never to be removed when free_outputs is True
+    """
+
+    cache: Union["StepCache", None] = None
+    free_outputs: bool = False
+    keep: Sequence[str] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.keep = [self.keep] if isinstance(self.keep, str) else list(self.keep or [])
+
+
+@dataclass
+class OutputOptions:
+    """How outputs are saved
+
+    Attributes:
+        write_behind (bool):
+            Save outputs from a background thread for each output adapter, instead of waiting
+            for them to be written before running the next jobs
+        write_behind_memory (int | str | None):
+            Maximum memory used by outputs waiting to be written to each output adapter, jobs
+            saving new outputs wait once it's exceeded. Unbounded if None
+    """
+
+    write_behind: bool = False
+    write_behind_memory: Union[int, str, None] = None
+
+
+@dataclass
+class ProfilingOptions:
+    """Which jobs are profiled
+
+    Attributes:
+        profile (bool | str):
+            Profile every job with cProfile, also tracking allocations if "memory".
+            Jobs can be profiled individually setting their `profile` attribute
+        profile_dir (str):
+            Directory where profiles are written, in a subdirectory for each run
+        sampling (float | None):
+            Seconds between samples of the sampling profiler, writing collapsed stacks of each
+            job to profile_dir. Disabled if None
+    """
+
+    profile: Union[bool, str] = False
+    profile_dir: str = "profiles"
+    sampling: Union[float, None] = None
+
+
+@dataclass
+class PipelineOptions:
+    """All the options of a pipeline
+
+    Options can also be set from a flat mapping of their names to values, like
+    `PipelineOptions.from_dict({"workers": 4, "free_outputs": True})`.
+    """
+
+    execution: ExecutionOptions = field(default_factory=ExecutionOptions)
+    caching: CacheOptions = field(default_factory=CacheOptions)
+    output: OutputOptions = field(default_factory=OutputOptions)
+    profiling: ProfilingOptions = field(default_factory=ProfilingOptions)
+
+    @classmethod
+    def from_dict(cls, options: Mapping):
+        """Returns options with the values in a flat mapping (see `update`), defaults otherwise"""
+        new_options = cls()
+        new_options.update(options)
+        return new_options
+
+    def update(self, options: Mapping):
+        """Sets options from a flat mapping of their names (like "workers") to values
+
+        Raises:
+            ValueError:
+                if a name is not the name of any option
+        """
+        changes = {}
+        for name, value in options.items():
+            for group in fields(self):
+                if name in {option.name for option in fields(getattr(self, group.name))}:
+                    changes.setdefault(group.name, {})[name] = value
+                    break
+            else:
+                raise ValueError(f'Invalid pipeline option "{name}"')
+        for group, values in changes.items():
+            setattr(self, group, replace(getattr(self, group), **values))
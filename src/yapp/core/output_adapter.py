@@ -45,6 +45,22 @@ class OutputAdapter(ABC):
         """
         self.save(key, data)
 
+    def save_chunk(self, key, chunk, _index):
+        """
+        Save a chunk of data yielded by a generator Job here
+        Leave it as it is to save every chunk with save, which should then append it to the
+        previous ones
+
+        Args:
+            key (str):
+                Name of the generator Job
+            chunk (Any):
+                Chunk of data
+            _index (int):
+                Position of the chunk in the stream, starting from 0
+        """
+        self.save(key, chunk)
+
     def _save(self, key, data):
         if data is None:
             logging.debug('Empty output to %s for job "%s"', self.name, key)
@@ -53,6 +69,10 @@ class OutputAdapter(ABC):
         logging.debug('Saving output to %s: "%s"', self.name, key)
         return self.save(key, data)
 
+    def _save_chunk(self, key, chunk, index):
+        logging.debug('Saving chunk %s to %s: "%s"', index, self.name, key)
+        return self.save_chunk(key, chunk, index)
+
     def _save_result(self, key, data):
         logging.debug('Saving final output to %s: "%s"', self.name, key)
         return self.save_result(key, data)
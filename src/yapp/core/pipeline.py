@@ -1,12 +1,28 @@
+import asyncio
+import graphlib
 import inspect
 import logging
-from datetime import datetime
-from typing import Sequence, Set, Union
-
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from typing import Mapping, Sequence, Set, Union
+
+from .async_executor import AsyncExecutorMixin, output_method, run_sync
+from .input_adapter import InputAdapter
 from .inputs import Inputs
-from .job import Job
+from .job import Job, get_job_args
+from .metrics import Metrics
 from .monitor import Monitor
+from .options import PipelineOptions
 from .output_adapter import OutputAdapter
+from .prefetch import Prefetcher
+from .profiling import Profiler, SamplingProfiler
+from .run_state import Concurrency, RunState
+from .sizes import approx_size
+from .stream import ChunkStream
+from .write_behind import WriteBehind
 
 
 def enforce_list(value):
@@ -18,7 +34,7 @@ def enforce_list(value):
     return value if isinstance(value, list) else [value]
 
 
-class Pipeline:
+class Pipeline(AsyncExecutorMixin):
     """yapp Pipeline object
 
     Pipeline implementation.
@@ -29,8 +45,12 @@ class Pipeline:
             Loglevel to use for pipeline and jobs completed execution status messages
         VALID_HOOKS (list):
             list of valid hooks that can be used in a pipeline
-        __nested_timed_calls (int):
-            level of nested calls to `timed`, used to enhance logging
+        VALID_EXECUTORS (list):
+            list of valid executors for jobs: "thread" runs a job in the pipeline threads,
+            "process" runs it in a worker process and "async" (valid only as pipeline default) runs
+            the whole pipeline on an asyncio event loop
+        options (PipelineOptions):
+            execution, caching, output and profiling options
     """
 
     OK_LOGLEVEL = logging.INFO
@@ -43,11 +63,11 @@ class Pipeline:
         "job_fail",
     ]
 
+    VALID_EXECUTORS = ["thread", "process", "async"]
+
     started_at = None
     finished_at = None
 
-    __nested_timed_calls = 0
-
     def __init__(
         self,
         job_list: Sequence[type[Job]],
@@ -60,6 +80,9 @@ class Pipeline:
             None,
         ] = None,
         monitor: Union[Monitor, None] = None,
+        *,
+        dependencies: Union[Mapping[type[Job], Set[type[Job]]], None] = None,
+        options: Union[PipelineOptions, Mapping, None] = None,
         **hooks,
     ):
         """__init__.
@@ -80,6 +103,14 @@ class Pipeline:
             monitor:
                 Monitor for the pipeline
 
+            dependencies:
+                Mapping from each Job class to the set of Job classes it depends on.
+                If not specified every job depends on the previous one in job_list
+
+            options:
+                Execution, caching, output and profiling options (see PipelineOptions), or a
+                mapping of their names to values like `{"workers": 4}`
+
             **hooks:
                 Hooks to attach to the pipeline
         """
@@ -95,9 +126,25 @@ class Pipeline:
             self.name,
             " -> ".join([job.__name__ for job in self.job_list]),
         )
+        if dependencies is None:
+            # keep job_list order
+            dependencies = {
+                job: {previous} if previous else set()
+                for previous, job in zip([None, *job_list], job_list)
+            }
+        self.dependencies = dependencies
+        if not isinstance(options, PipelineOptions):
+            options = PipelineOptions.from_dict(options or {})
+        if options.execution.executor not in Pipeline.VALID_EXECUTORS:
+            raise ValueError(f"Invalid executor {options.execution.executor}")
+        self.options = options
+        # records for jobs, hooks and adapters calls of the last run
+        self.metrics = Metrics()
+        # state of the current (or last) run
+        self._state = RunState()
 
         # inputs and outputs
-        self.inputs = inputs if inputs else Inputs()
+        self.inputs = inputs if inputs is not None else Inputs()
         self.outputs = enforce_list(outputs)
         self.save_results = []
         self.monitor = monitor if monitor else Monitor()
@@ -123,8 +170,26 @@ class Pipeline:
                 logging.debug("Adding %s from monitor: %s", hook_name, monitor)
             setattr(self, hook_name, new_hooks)
 
-        # current job if any
-        self.current_job = None
+        self._sync = Concurrency(self.name, self.outputs)
+
+    @property
+    def current_job(self):
+        """Job running in the current thread (or task), if any"""
+        return self._sync.current_job.get()
+
+    @current_job.setter
+    def current_job(self, job):
+        self._sync.current_job.set(job)
+
+    @property
+    def profiler(self):
+        """Profiler of the last run, if any job was profiled"""
+        return self._state.profiler
+
+    @property
+    def sampler(self):
+        """Sampling profiler of the last run, if enabled"""
+        return self._state.sampler
 
     @property
     def config(self):
@@ -155,8 +220,48 @@ class Pipeline:
                 name of the hook to run ("on_pipeline_start", "on_job_start", etc.)
         """
         hooks = getattr(self, hook_name)
-        for hook in hooks:
-            self.timed(f"{hook_name} hook", hook.__name__, hook, self)
+        with self._sync.lock:
+            for hook in hooks:
+                self.timed(f"{hook_name} hook", hook.__name__, run_sync, hook, self)
+
+    @contextmanager
+    def _timing(self, typename, name, update_object=None):
+        """Context manager logging times for `timed` and `timed_async`, and recording metrics"""
+        # Increase nesting level (level of nested calls to `timed`, used to enhance logging)
+        nesting = self._sync.nesting.get() + 1
+        token = self._sync.nesting.set(nesting)
+        # TODO find some better idea for this
+        # prefix = ">" if nesting < 3 else ""
+        if typename == "pipeline":
+            prefix = ">>"
+        elif nesting < 3:
+            prefix = ">"
+        else:
+            prefix = ""
+        if typename.endswith(" hook"):
+            kind, fields = "hook", {"event": typename[: -len(" hook")]}
+        else:
+            kind, fields = typename, {}
+
+        try:
+            logging.info("%s Starting %s %s", prefix, typename, name)
+            if update_object:
+                update_object.started_at = datetime.now()
+            with self.metrics.measure(kind, name, **fields) as record:
+                yield
+            if update_object:
+                update_object.finished_at = datetime.now()
+            logging.log(
+                Pipeline.OK_LOGLEVEL,
+                "%s Completed %s %s (elapsed: %s)",
+                prefix,
+                typename,
+                name,
+                timedelta(seconds=record["wall_time"]),
+            )
+        finally:
+            # Decrease nesting level
+            self._sync.nesting.reset(token)
 
     def timed(self, typename, name, func, *args, _update_object=None, **kwargs):
         """Runs a timed execution of a function, logging times
@@ -176,97 +281,214 @@ class Pipeline:
         Returns:
             (Any) The output of provided function
         """
-        # Increase nesting level
-        self.__nested_timed_calls += 1
-        # TODO find some better idea for this
-        # prefix = ">" if self.__nested_timed_calls < 3 else ""
-        if typename == "pipeline":
-            prefix = ">>"
-        elif self.__nested_timed_calls < 3:
-            prefix = ">"
+        with self._timing(typename, name, _update_object):
+            return func(*args, **kwargs)
+
+    def _job_output(self, job, last_output):  # pylint: disable=no-self-use
+        """Logs a job output and returns it as a dict, suitable to be merged into inputs"""
+        logging.debug("%s run successfully", job.name)
+        logging.debug(
+            "%s returned %s",
+            job.name,
+            list(last_output.keys()) if isinstance(last_output, dict) else last_output,
+        )
+
+        if isinstance(last_output, dict):
+            logging.debug(
+                "saving last_output: %s len %s",
+                type(last_output),
+                len(last_output) if last_output is not None else "None",
+            )
         else:
-            prefix = ""
+            if last_output is None:
+                logging.warning("> %s returned None", job.name)
+            # use job name as key
+            last_output = {job.name: last_output}
+        self.metrics.update(
+            output_size=sum(approx_size(value, deep=False) for value in last_output.values())
+        )
+        return last_output
 
-        logging.info("%s Starting %s %s", prefix, typename, name)
-        start = datetime.now()
-        if _update_object:
-            _update_object.started_at = start
-        out = func(*args, **kwargs)
-        end = datetime.now()
-        logging.log(
-            Pipeline.OK_LOGLEVEL,
-            "%s Completed %s %s (elapsed: %s)",
-            prefix,
-            typename,
+    def _cache_lookup(self, job, args, job_inputs):
+        """Returns the cache key for a job and its cached outputs, if any"""
+        cache = self.options.caching.cache
+        if cache is None or not job.cache or inspect.isgeneratorfunction(job.execute):
+            return None, None
+        try:
+            key = cache.key(job, dict(zip(args, job_inputs)), self.config)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            logging.debug("Cannot cache outputs for %s: %s", job.name, error)
+            return None, None
+        cached = cache.load(key)
+        if cached is not None:
+            logging.info("> Using cached outputs for %s", job.name)
+        return key, cached
+
+    def _find_consumers(self):
+        """Returns a mapping from each input name to the set of jobs consuming it"""
+        consumers = {}
+        for job_class in self.job_list:
+            for name in get_job_args(job_class):
+                consumers.setdefault(name, set()).add(job_class)
+        return consumers
+
+    def _project_inputs(self):
+        """Restricts inputs from adapters supporting it to the columns declared by their consumers
+
+        An input is projected only if it's exposed without explicit columns and every job consuming
+        it declares the columns it uses.
+        """
+        for name, jobs in self._find_consumers().items():
+            options = self.inputs.options.get(name, {})
+            if name not in self.inputs.exposed or "columns" in options:
+                continue
+            adapter = self.inputs.sources[self.inputs.exposed[name][0]]
+            if not isinstance(adapter, InputAdapter):
+                continue
+            if "columns" not in inspect.signature(adapter.get).parameters:
+                continue
+            declared = [(job.columns or {}).get(name) for job in self.job_list if job in jobs]
+            if any(columns is None for columns in declared):
+                continue
+            columns = list(dict.fromkeys(column for used in declared for column in used))
+            logging.debug('Reading only columns %s for "%s"', columns, name)
+            self.inputs.options[name] = {**options, "columns": columns}
+
+    def _submit_inputs(self):
+        """Lets input adapters start loading the inputs needed by jobs, if not memoized already"""
+        for name in self._find_consumers():
+            if name not in self.inputs.exposed:
+                continue
+            source, internal_name = self.inputs.exposed[name]
+            adapter = self.inputs.sources[source]
+            options = self.inputs.options.get(name, {})
+            if not isinstance(adapter, InputAdapter):
+                continue
+            if self.inputs.cache_key(source, internal_name, options) in self.inputs.cache:
+                continue
+            adapter.submit(internal_name, **options)
+
+    def _free_outputs(self, job, args, last_output):
+        """Removes from inputs jobs outputs no longer needed by any job still to be run
+
+        Called after a job completes, checks both its inputs and its outputs.
+        Outputs in keep or save_results are never removed. Inputs exposed from adapters are only
+        removed from the inputs memoization cache.
+        """
+        state = self._state
+        with self._sync.lock:
+            state.completed.add(type(job))
+            state.produced.update(last_output)
+            for name in [*args, *last_output]:
+                if name in self.options.caching.keep or name in self.save_results:
+                    continue
+                if name not in self.inputs or state.consumers.get(name, set()) - state.completed:
+                    continue
+                if name in self.inputs.exposed:
+                    self.inputs.forget(name)
+                elif name in state.produced:
+                    logging.debug('Freeing "%s", no following job needs it', name)
+                    del self.inputs[name]
+
+    def _stream_output(self, job, job_inputs):
+        """Runs a generator job, wrapping the chunks it yields in a stream saved and consumed in
+        background
+
+        Streams are named after the job (like other outputs not returned in a dict) unless the job
+        specifies a name in `stream`.
+        """
+        name = job.stream or job.name
+        consumers = self._find_consumers().get(name, set())
+        if len(consumers) > 1:
+            raise ValueError(f'Output of {job.name} is a stream, it can be used by one job only')
+        stream = ChunkStream(
             name,
-            end - start,
+            job.execute(*job_inputs, **job.params),
+            save=self.save_chunk,
+            consumed=bool(consumers),
+            buffer=self.options.execution.chunk_buffer,
         )
-        if _update_object:
-            _update_object.finished_at = start
+        with self._sync.lock:
+            self._state.streams.append(stream)
+        return {name: stream}
 
-        # Decrease nesting level
-        self.__nested_timed_calls -= 1
-        return out
+    def _merge_output(self, job, args, last_output):
+        """Merges a job output into inputs for next steps, freeing the ones no longer needed"""
+        try:
+            with self._sync.lock:
+                self.inputs.update(last_output)
+        except (TypeError, ValueError):
+            logging.warning("> Cannot merge output to inputs for job %s", job.name)
+        logging.info("Done saving %s outputs", job.name)
+        if self.options.caching.free_outputs:
+            self._free_outputs(job, args, last_output)
+
+    def _job_failed(self, job, error):
+        """Keeps track of a job failure"""
+        self.error = error
+        logging.error("Job %s failed", job.name)
+        # Not sure yet if keeping the exception call also here
+        # logging.exception('Job failed')
+
+    def _execute(self, job, job_inputs):
+        """Calls job.execute (in a worker process with the "process" executor), profiling it if
+        enabled"""
+        process = (job.executor or self.options.execution.executor) == "process"
+        profile = job.profile or self.options.profiling.profile
+        if profile and self._state.profiler is not None:
+            run = self._state.profiler.run_in_process if process else self._state.profiler.run
+            memory = profile == "memory"
+            return run(job.name, memory, run_sync, job.execute, *job_inputs, **job.params)
+        if process:
+            # multiprocessing is imported only when needed
+            from .process import run_in_process  # pylint: disable=import-outside-toplevel
+
+            return run_in_process(run_sync, job.execute, *job_inputs, **job.params)
+        return run_sync(job.execute, *job_inputs, **job.params)
+
+    def _sampled(self, job, func):
+        """Returns func, attributing samples of the thread running it to job if sampling"""
+        if self._state.sampler is None or inspect.iscoroutinefunction(func):
+            return func
+        return self._state.sampler.tagged(job.name, func)
 
     def _run_job(self, job):
         """Execution of a single job"""
 
-        # Get arguments used in the execute function
-        arg_spec = inspect.getfullargspec(job.execute)
-        if arg_spec.defaults:
-            args = arg_spec.args[1 : -len(arg_spec.defaults)]
-        else:
-            args = arg_spec.args[1:]
+        args = get_job_args(job)
         logging.debug("Required inputs for %s: %s", job.name, args)
 
         self.run_hook("job_start")
 
         try:
             # call execute with right inputs
-            last_output = job.execute(*[self.inputs[i] for i in args], **job.params)
-            logging.debug("%s run successfully", job.name)
-            logging.debug(
-                "%s returned %s",
-                job.name,
-                list(last_output.keys())
-                if isinstance(last_output, dict)
-                else last_output,
-            )
+            job_inputs = [run_sync(self.inputs.__getitem__, i) for i in args]
+            cache_key, last_output = self._cache_lookup(job, args, job_inputs)
+            cached = last_output is not None
+            streamed = inspect.isgeneratorfunction(job.execute)
+            if streamed:
+                # generators are always run in a thread, chunks are produced while next jobs run
+                last_output = self._stream_output(job, job_inputs)
+            elif not cached:
+                last_output = self._execute(job, job_inputs)
+                last_output = self._job_output(job, last_output)
+                if cache_key:
+                    self.options.caching.cache.save(cache_key, last_output)
 
             self.run_hook("job_finish")
 
-            # save output and merge into inputs for next steps
-            if isinstance(last_output, dict):
-                logging.debug(
-                    "saving last_output: %s len %s",
-                    type(last_output),
-                    len(last_output) if last_output is not None else "None",
-                )
-                for key in last_output:
-                    self.save_output(key, last_output[key])
-            else:
-                if last_output is None:
-                    logging.warning("> %s returned None", job.name)
-                # save using job name
-                self.save_output(job.name, last_output)
-                # replace last_output with dict to merge into inputs
-                last_output = {job.name: last_output}
-            # merge into inputs
-            try:
-                self.inputs.update(last_output)
-            except (TypeError, ValueError):
-                logging.warning("> Cannot merge output to inputs for job %s", job.name)
-            logging.info("Done saving %s outputs", job.name)
+            # save output (already done if cached or streamed) and merge into inputs for next steps
+            if not cached and not streamed:
+                for key, value in last_output.items():
+                    self.save_output(key, value)
+            self._merge_output(job, args, last_output)
 
         except Exception as error:
-            self.error = error
-            logging.error("Job %s failed", job.name)
-            # Not sure yet if keeping the exception call also here
-            # logging.exception('Job failed')
+            self._job_failed(job, error)
             self.run_hook("job_fail")
             raise error
 
-    def save_output(self, name, data, results=False):
+    def save_output(self, name, data, results=False, chunk=None):
         """Save data to each output adapter
 
         Args:
@@ -274,43 +496,124 @@ class Pipeline:
                 name to pass to the output adapters when saving the data
             data (Any):
                 data to save
+            chunk (int | None):
+                index of the chunk, if data is a chunk of a stream
         """
 
-        method = "_save" if not results else "_save_result"
-        for output in self.outputs:
-            getattr(output, method)(name, data)
+        method, args = output_method(results, chunk)
+        if self._state.writers is not None:
+            self._state.writers.submit(method, name, data, *args)
+            return
+        for output, lock in zip(self.outputs, self._sync.output_locks):
+            with lock, self.metrics.measure("output", f"{output.name}.{name}"):
+                run_sync(getattr(output, method), name, data, *args)
             logging.debug("saved %s output to %s", name, output)
 
+    def save_chunk(self, name, chunk, index):
+        """Save a chunk of a stream to each output adapter, called from the stream thread"""
+        if self._sync.loop is not None:
+            # with the "async" executor adapters are used from the pipeline event loop
+            asyncio.run_coroutine_threadsafe(
+                self.save_output_async(name, chunk, chunk=index), self._sync.loop
+            ).result()
+        else:
+            self.save_output(name, chunk, chunk=index)
+
+    def flush_outputs(self):
+        """Waits for streams and outputs still being saved in background
+
+        Raises the first error occurred.
+        """
+        with self._sync.lock:
+            streams, self._state.streams = self._state.streams, []
+        error = None
+        # consumers of streams are created after them
+        for stream in reversed(streams):
+            try:
+                stream.wait()
+            except Exception as stream_error:  # pylint: disable=broad-except
+                error = error or stream_error
+        if self._state.writers is not None:
+            self._state.writers.flush()
+        if error is not None:
+            raise error
+
+    def _prefetch(self, job_class):
+        """Starts loading inputs for job_class and the next jobs not started yet"""
+        state = self._state
+        if state.prefetcher is None:
+            return
+        with self._sync.lock:
+            state.started.add(job_class)
+            upcoming = [job for job in self.job_list if job not in state.started]
+        jobs = [job_class, *upcoming[: self.options.execution.prefetch]]
+        state.prefetcher.prefetch(name for job in jobs for name in get_job_args(job))
+
+    def _run_job_class(self, job_class):
+        """Instantiates and runs a single job in the current thread"""
+        self._prefetch(job_class)
+        logging.debug('Instantiating new job from "%s"', job_class)
+        job_obj = job_class(self)
+        self._sync.current_job.set(job_obj)
+        run_job = self._sampled(job_obj, self._run_job)
+        self.timed("job", job_obj.name, run_job, job_obj, _update_object=job_obj)
+
+    def _run_parallel(self):
+        """Runs jobs on a thread pool as soon as all their dependencies are completed
+
+        After a job fails no new job is started, the ones already running are waited for and then
+        the error is raised.
+        """
+        sorter = graphlib.TopologicalSorter(self.dependencies)
+        sorter.prepare()
+        running = {}
+        error = None
+        with ThreadPoolExecutor(
+            max_workers=self.options.execution.workers, thread_name_prefix=f"yapp-{self.name}"
+        ) as executor:
+            while sorter.is_active():
+                if error is None:
+                    for job_class in sorter.get_ready():
+                        future = executor.submit(self._run_job_class, job_class)
+                        running[future] = job_class
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_class = running.pop(future)
+                    if future.exception() is not None:
+                        error = error or future.exception()
+                    else:
+                        sorter.done(job_class)
+        if error is not None:
+            raise error
+
     def _run(self):
         """Runs all Pipeline's jobs"""
+        if self.options.execution.executor == "async":
+            asyncio.run(self._run_async())
+            return
+
         self.run_hook("pipeline_start")
 
-        for job_class in self.job_list:
-            logging.debug('Instantiating new job from "%s"', job_class)
-            job_obj = job_class(self)
-            self.current_job = job_obj
-            self.timed(
-                "job", job_obj.name, self._run_job, job_obj, _update_object=job_obj
-            )
+        if self.options.execution.workers > 1:
+            logging.debug("Running %s with %s workers", self.name, self.options.execution.workers)
+            self._run_parallel()
+        else:
+            for job_class in self.job_list:
+                self._run_job_class(job_class)
 
+        self.flush_outputs()
         self.run_hook("pipeline_finish")
 
         # should this be done here or before the hook?
         for output_name in self.save_results:
-            self.save_output(output_name, self.inputs[output_name], results=True)
-
-    def __call__(
-        self,
-        save_results: Union[Sequence[str], None] = None,
-    ):
-        """Pipeline entrypoint
-
-        Sets up inputs, outputs and config (if specified) and runs the pipeline
-        """
-        # Override inputs or outputs if specified
-        if save_results:
-            self.save_results = enforce_list(save_results)
+            data = run_sync(self.inputs.__getitem__, output_name)
+            self.save_output(output_name, data, results=True)
+        self.flush_outputs()
 
+    def _check_adapters(self):
+        """Instantiates outputs given as classes, checks inputs and outputs types"""
         if not isinstance(self.inputs, Inputs):
             raise ValueError(f"{self.inputs} is not an Inputs object")
 
@@ -326,4 +629,76 @@ class Pipeline:
         if not self.outputs:
             logging.warning("> Missing outputs for pipeline %s", self.name)
 
-        self.timed("pipeline", self.name, self._run, _update_object=self)
+    def _start_run(self):
+        """Sets up the state of a new run, starting prefetching, background writers and profilers
+        if enabled"""
+        options = self.options
+        self.metrics.clear()
+        self.inputs.metrics = self.metrics
+        self._sync.reset(self.outputs)
+        self._state = state = RunState()
+        if options.caching.free_outputs:
+            state.consumers = self._find_consumers()
+
+        self._project_inputs()
+        self._submit_inputs()
+
+        if options.execution.chunksize:
+            for adapter in self.inputs.sources.values():
+                if isinstance(adapter, InputAdapter) and adapter.chunksize is None:
+                    adapter.chunksize = options.execution.chunksize
+
+        if options.execution.prefetch:
+            state.prefetcher = Prefetcher(self.inputs, workers=options.execution.prefetch_workers)
+        if options.output.write_behind:
+            state.writers = WriteBehind(
+                self.outputs, max_memory=options.output.write_behind_memory, metrics=self.metrics
+            )
+        run_dir = os.path.join(
+            options.profiling.profile_dir, f"{self.name}-{datetime.now():%Y%m%d-%H%M%S}"
+        )
+        if options.profiling.profile or any(job.profile for job in self.job_list):
+            state.profiler = Profiler(run_dir)
+        if options.profiling.sampling:
+            state.sampler = SamplingProfiler(run_dir, interval=options.profiling.sampling)
+            state.sampler.start()
+
+    def _finish_run(self):
+        """Stops what `_start_run` started, also after a failure"""
+        state = self._state
+        if state.prefetcher is not None:
+            state.prefetcher.shutdown()
+            state.prefetcher = None
+        # left after a failure
+        for stream in state.streams:
+            stream.close()
+        state.streams = []
+        self._sync.loop = None
+        if state.writers is not None:
+            # after a failure, writes still pending are completed anyway
+            state.writers.close()
+            state.writers = None
+        if state.profiler is not None:
+            state.profiler.log_summary()
+        if state.sampler is not None:
+            state.sampler.stop()
+
+    def __call__(
+        self,
+        save_results: Union[Sequence[str], None] = None,
+    ):
+        """Pipeline entrypoint
+
+        Sets up inputs, outputs and config (if specified) and runs the pipeline
+        """
+        # Override inputs or outputs if specified
+        if save_results:
+            self.save_results = enforce_list(save_results)
+
+        self._check_adapters()
+        self._start_run()
+        try:
+            self.timed("pipeline", self.name, self._run, _update_object=self)
+        finally:
+            self._finish_run()
+        logging.debug("Inputs cache statistics: %s", self.inputs.cache.stats)
@@ -0,0 +1,103 @@
+import inspect
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Prefetcher:
+    """
+    Loads inputs exposed from adapters on a background thread pool, before jobs request them
+
+    Inputs from adapters memoizing them are stored in the inputs memoization cache (see
+    InputCache), other ones are kept until the first load of each input takes them (see
+    `Inputs.prefetched`).
+    The number of concurrent loads from a single adapter is limited by its `prefetch_limit`.
+    """
+
+    def __init__(self, inputs, workers=4):
+        """__init__.
+
+        Args:
+            inputs (Inputs):
+                Inputs to prefetch
+            workers (int):
+                Number of background threads
+        """
+        self.inputs = inputs
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="yapp-prefetch")
+        self.futures = {}
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, source):
+        with self._lock:
+            if source not in self._semaphores:
+                limit = getattr(self.inputs.sources[source], "prefetch_limit", None)
+                self._semaphores[source] = threading.BoundedSemaphore(limit) if limit else None
+            return self._semaphores[source]
+
+    def _prefetchable(self, name):
+        if name not in self.inputs.exposed:
+            return False
+        source, internal_name = self.inputs.exposed[name]
+        adapter = self.inputs.sources[source]
+        # chunked readers are iterators, never memoized
+        if getattr(adapter, "chunksize", None):
+            return False
+        # async adapters are awaited by the pipeline on its own event loop
+        if inspect.iscoroutinefunction(getattr(type(adapter), "get", None)):
+            return False
+        options = self.inputs.options.get(name)
+        cache_key = self.inputs.cache_key(source, internal_name, options)
+        return cache_key not in self.inputs.cache and cache_key not in self.inputs.prefetched
+
+    def prefetch(self, names):
+        """
+        Starts loading inputs in background, if not already loaded or being loaded
+
+        Args:
+            names (Iterable[str]):
+                names of the inputs to load, the ones not exposed from adapters are ignored
+        """
+        for name in names:
+            with self._lock:
+                if name in self.futures and not self.futures[name].done():
+                    continue
+            if not self._prefetchable(name):
+                continue
+            logging.debug('Prefetching input "%s"', name)
+            future = self.executor.submit(self._load, name)
+            with self._lock:
+                self.futures[name] = future
+            source, internal_name = self.inputs.exposed[name]
+            if getattr(self.inputs.sources[source], "memoize", "none") == "none":
+                options = self.inputs.options.get(name)
+                cache_key = self.inputs.cache_key(source, internal_name, options)
+                self.inputs.prefetched[cache_key] = future
+
+    def _load(self, name):
+        source, internal_name = self.inputs.exposed[name]
+        options = self.inputs.options.get(name, {})
+        semaphore = self._semaphore(source)
+        memoized = getattr(self.inputs.sources[source], "memoize", "none") != "none"
+        # not memoized inputs are returned, and taken from the future
+        load = self.inputs.load if memoized else self.inputs.fetch
+        try:
+            if semaphore:
+                with semaphore:
+                    return load(source, internal_name, **options)
+            return load(source, internal_name, **options)
+        except Exception as error:  # pylint: disable=broad-except
+            logging.debug('Prefetching input "%s" failed: %s', name, error)
+            # the job requesting it will try again and fail with a proper error
+            raise
+
+    def shutdown(self):
+        """
+        Cancels pending loads and waits for running ones
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.executor.shutdown(wait=True)
+        # prefetched inputs never requested
+        self.inputs.prefetched.clear()
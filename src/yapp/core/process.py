@@ -0,0 +1,160 @@
+import logging
+import mmap
+import multiprocessing
+import os
+import pickle
+import sys
+from multiprocessing import resource_tracker, shared_memory
+
+# where POSIX shared memory blocks are mounted on Linux
+SHM_DIR = "/dev/shm"
+
+
+class SharedPayload:
+    """
+    Pickle protocol 5 payload whose out-of-band buffers are kept in shared memory
+
+    Only the in-band pickle stream and the name of the shared memory block are pickled along with
+    the object itself, so that it can be cheaply sent to another process.
+    Large buffers (NumPy arrays, pandas DataFrames blocks, etc.) are never copied into the pickle,
+    and are not copied when loading either: the loaded object uses the shared memory block
+    directly, which stays mapped until the object is garbage collected.
+
+    The shared memory block is owned by the payload, not by the process creating it: it must be
+    released either by loading the payload (only once) or by calling `release`.
+    Loading requires Linux, where shared memory blocks are mapped from /dev/shm.
+    """
+
+    def __init__(self, obj):
+        buffers = []
+        self.data = pickle.dumps(obj, protocol=5, buffer_callback=buffers.append)
+        raw_buffers = [buffer.raw() for buffer in buffers]
+        self.sizes = [raw.nbytes for raw in raw_buffers]
+        self.shm_name = None
+
+        if sum(self.sizes):
+            shm = shared_memory.SharedMemory(create=True, size=sum(self.sizes))
+            try:
+                offset = 0
+                for raw in raw_buffers:
+                    shm.buf[offset : offset + raw.nbytes] = raw
+                    offset += raw.nbytes
+            except BaseException:
+                shm.close()
+                shm.unlink()
+                raise
+            shm.close()
+            # not unlinked by the resource tracker when the creating process exits
+            if os.name == "posix":
+                resource_tracker.unregister(f"/{shm.name}", "shared_memory")
+            self.shm_name = shm.name
+
+    def load(self):
+        """
+        Rebuilds the original object and releases the shared memory block
+        """
+        if not self.shm_name:
+            return pickle.loads(self.data)
+
+        try:
+            with open(os.path.join(SHM_DIR, self.shm_name), "r+b") as file:
+                mapped = mmap.mmap(file.fileno(), sum(self.sizes))
+        finally:
+            # the mapping outlives the name
+            self.release()
+
+        view = memoryview(mapped)
+        buffers = []
+        offset = 0
+        for size in self.sizes:
+            buffers.append(view[offset : offset + size])
+            offset += size
+        return pickle.loads(self.data, buffers=buffers)
+
+    def release(self):
+        """
+        Releases the shared memory block without loading the payload
+        """
+        if not self.shm_name:
+            return
+        try:
+            os.unlink(os.path.join(SHM_DIR, self.shm_name))
+        except FileNotFoundError:
+            pass
+        self.shm_name = None
+
+
+def get_context():
+    """
+    Returns the multiprocessing context used for worker processes, None if not supported
+
+    Worker processes are forked: this way they inherit jobs and their inputs without copying them.
+    Forking is used only on Linux: macOS system libraries are not fork-safe (which is why spawn is
+    the default there) and Windows does not support it.
+
+    Only the thread forking is copied into the worker process: locks held by other threads at that
+    time (including those of logging handlers, connection pools and thread pools) stay locked in
+    the worker, so functions run in worker processes must not use objects shared with other threads.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+    return multiprocessing.get_context("fork")
+
+
+def _worker(connection, func, args, kwargs):
+    """
+    Worker process entrypoint, sends back the output of func as a SharedPayload
+    """
+    try:
+        result = ("ok", SharedPayload(func(*args, **kwargs)))
+    except Exception as error:  # pylint: disable=broad-except
+        result = ("error", error)
+
+    try:
+        connection.send(result)
+    except Exception as error:  # pylint: disable=broad-except
+        if result[0] == "ok":
+            result[1].release()
+        # exceptions are not always picklable
+        connection.send(("error", RuntimeError(repr(error))))
+    connection.close()
+
+
+def run_in_process(func, *args, **kwargs):
+    """
+    Runs func in a worker process and returns its output
+
+    Arguments are inherited by the forked worker process, output is sent back using a SharedPayload.
+    If worker processes are not supported on current platform func is run in current process.
+
+    Args:
+        func (callable):
+            function to run
+        *args:
+        **kwargs:
+
+    Returns:
+        (Any) The output of provided function
+    """
+    context = get_context()
+    if context is None:
+        logging.warning("> Worker processes not supported, running %s in current process", func)
+        return func(*args, **kwargs)
+
+    receiver, sender = context.Pipe(duplex=False)
+    process = context.Process(target=_worker, args=(sender, func, args, kwargs), daemon=True)
+    process.start()
+    sender.close()
+    logging.debug("Started worker process %s for %s", process.pid, func)
+
+    try:
+        status, value = receiver.recv()
+    except EOFError:
+        raise RuntimeError(f"Worker process {process.pid} exited unexpectedly") from None
+    finally:
+        receiver.close()
+        process.join()
+
+    if status == "error":
+        raise value
+    return value.load()
@@ -0,0 +1,313 @@
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+
+# frames kept for each traced allocation
+TRACEMALLOC_FRAMES = 10
+
+
+def profile_call(directory, name, memory, top, func, /, *args, **kwargs):
+    """
+    Calls func profiling it with cProfile, writing stats to `<directory>/<name>.pstats`
+
+    Args:
+        directory (str):
+            directory to write profiles to, created if missing
+        name (str):
+            name of the profiled call, used for file names
+        memory (bool):
+            also track allocations with tracemalloc, writing the top ones (by size) still
+            allocated when func returns to `<directory>/<name>.allocations.txt`
+        top (int):
+            number of allocations written
+        func (callable):
+            function to call
+        *args:
+        **kwargs:
+
+    Returns:
+        (Any) The output of func
+    """
+    os.makedirs(directory, exist_ok=True)
+    started_tracing = memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    before = tracemalloc.take_snapshot() if memory else None
+    profile = cProfile.Profile()
+    try:
+        profile.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            profile.dump_stats(os.path.join(directory, f"{name}.pstats"))
+            if memory:
+                write_allocations(
+                    os.path.join(directory, f"{name}.allocations.txt"), before, top
+                )
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+
+
+def write_allocations(path, before, top):
+    """
+    Writes the top allocations made since the `before` tracemalloc snapshot to path
+    """
+    # allocations made by tracemalloc and by this module are not interesting
+    filters = [
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+    ]
+    after = tracemalloc.take_snapshot().filter_traces(filters)
+    differences = after.compare_to(before.filter_traces(filters), "lineno")
+    with open(path, "w", encoding="utf-8") as file:
+        for difference in differences[:top]:
+            file.write(f"{difference}\n")
+
+
+class Profiler:
+    """
+    Deterministic profiler for jobs
+
+    Jobs are profiled with cProfile and, optionally, their allocations tracked with tracemalloc.
+    Stats are written to a `.pstats` file for each job (to be inspected with `pstats` or tools like
+    snakeviz) in directory, along with a report of the top allocations of each job.
+
+    Only one profiler can be active at a time, so jobs run in this process are profiled one at a
+    time even when the pipeline runs them concurrently.
+    """
+
+    def __init__(self, directory, top=20):
+        """__init__.
+
+        Args:
+            directory (str):
+                directory to write profiles to
+            top (int):
+                number of allocations written to the report of each job
+        """
+        self.directory = directory
+        self.top = top
+        # names of the profiled jobs, in completion order
+        self.jobs = []
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f"<yapp profiler {self.directory}>"
+
+    def run(self, name, memory, func, /, *args, **kwargs):
+        """
+        Calls func in this process, profiling it (see `profile_call`)
+        """
+        with self._lock:
+            try:
+                return profile_call(self.directory, name, memory, self.top, func, *args, **kwargs)
+            finally:
+                self.jobs.append(name)
+
+    def run_in_process(self, name, memory, func, /, *args, **kwargs):
+        """
+        Calls func in a worker process, profiling it there (see `profile_call`)
+        """
+        from .process import run_in_process  # pylint: disable=import-outside-toplevel
+
+        try:
+            return run_in_process(
+                profile_call, self.directory, name, memory, self.top, func, *args, **kwargs
+            )
+        finally:
+            with self._lock:
+                self.jobs.append(name)
+
+    def stats(self, name):
+        """
+        Returns the pstats.Stats of job name, None if it was not profiled
+        """
+        path = os.path.join(self.directory, f"{name}.pstats")
+        if not os.path.exists(path):
+            return None
+        return pstats.Stats(path)
+
+    def summary(self, limit=5):
+        """
+        Returns a table with the functions with the highest internal time of each profiled job
+        """
+        lines = [f"{'tottime':>10} {'cumtime':>10} {'calls':>9}  function"]
+        for name in self.jobs:
+            stats = self.stats(name)
+            if stats is None:
+                continue
+            lines.append(f"{name} ({stats.total_tt:.3f}s)")
+            hottest = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)
+            for function, (_, calls, tottime, cumtime, _) in hottest[:limit]:
+                function = pstats.func_std_string(function)
+                lines.append(f"{tottime:10.4f} {cumtime:10.4f} {calls:9d}  {function}")
+        return "\n".join(lines)
+
+    def log_summary(self, limit=5):
+        """
+        Logs the summary table and where profiles were written
+        """
+        if not self.jobs:
+            return
+        logging.info("Hottest functions by job:\n%s", self.summary(limit))
+        logging.info("Profiles written to %s", self.directory)
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for jobs, cheap enough to be always enabled
+
+    A background thread captures the stacks of all threads every `interval` seconds, samples from
+    threads running a job (see `tag`) are counted by job and stack, other threads are ignored.
+    Once stopped, a `<job>.folded` file is written for each job in directory, with a line for
+    each stack and the number of times it was sampled (the collapsed stacks format read by
+    flamegraph.pl, speedscope and other flame graph tools).
+
+    The time spent sampling is measured: when it exceeds `max_overhead` (as a fraction of the
+    elapsed time), the interval is increased to keep it under that.
+    """
+
+    def __init__(self, directory, interval=0.01, max_overhead=0.01):
+        """__init__.
+
+        Args:
+            directory (str):
+                directory to write collapsed stacks to
+            interval (float):
+                seconds between samples
+            max_overhead (float):
+                maximum fraction of time spent sampling
+        """
+        self.directory = directory
+        self.interval = interval
+        self.max_overhead = max_overhead
+        # job name -> Counter of stacks
+        self.stacks = {}
+        self.samples = 0
+        # seconds spent sampling and elapsed since started
+        self.overhead = 0.0
+        self.elapsed = 0.0
+        # thread id -> name of the job running in it
+        self._tags = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __repr__(self):
+        return f"<yapp sampling profiler {self.directory}>"
+
+    @contextmanager
+    def tag(self, name):
+        """
+        Context manager attributing samples of the current thread to job name
+        """
+        ident = threading.get_ident()
+        previous = self._tags.get(ident)
+        self._tags[ident] = name
+        try:
+            yield
+        finally:
+            if previous is None:
+                self._tags.pop(ident, None)
+            else:
+                self._tags[ident] = previous
+
+    def tagged(self, name, func):
+        """
+        Returns func, attributing samples of the thread running it to job name
+        """
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.tag(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def start(self):
+        """
+        Starts sampling in a background thread
+        """
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._sample_loop, name="yapp-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops sampling and writes collapsed stacks
+        """
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.write()
+        logging.info(
+            "Sampled %s stacks in %.3fs, overhead %.4fs (%.2f%%), written to %s",
+            self.samples,
+            self.elapsed,
+            self.overhead,
+            100 * self.overhead / self.elapsed if self.elapsed else 0,
+            self.directory,
+        )
+
+    @staticmethod
+    def frame_name(frame):
+        """
+        Returns the name of a frame in collapsed stacks
+        """
+        code = frame.f_code
+        return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+    def sample(self):
+        """
+        Captures the stacks of threads running jobs
+        """
+        if not self._tags:
+            return
+        frames = sys._current_frames()  # pylint: disable=protected-access
+        for ident, name in list(self._tags.items()):
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self.frame_name(frame))
+                frame = frame.f_back
+            self.stacks.setdefault(name, Counter())[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def _sample_loop(self):
+        started_at = time.perf_counter()
+        interval = self.interval
+        while not self._stop.wait(interval):
+            sample_start = time.perf_counter()
+            self.sample()
+            now = time.perf_counter()
+            self.overhead += now - sample_start
+            self.elapsed = now - started_at
+            # back off if sampling takes too much of the elapsed time
+            interval = max(self.interval, self.overhead / self.max_overhead - self.elapsed)
+        self.elapsed = time.perf_counter() - started_at
+
+    def write(self):
+        """
+        Writes a `<job>.folded` file with the collapsed stacks of each job
+        """
+        if not self.stacks:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        for name, stacks in self.stacks.items():
+            path = os.path.join(self.directory, f"{name}.folded")
+            with open(path, "w", encoding="utf-8") as file:
+                for stack, count in stacks.most_common():
+                    file.write(f"{stack} {count}\n")
@@ -0,0 +1,82 @@
+"""
+State of pipelines runs
+"""
+
+import contextvars
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Union
+
+
+@dataclass
+class RunState:
+    """State of a single pipeline run, replaced at the start of each run
+
+    Attributes:
+        consumers (dict):
+            jobs consuming each input, used by free_outputs
+        completed (set):
+            jobs completed, used by free_outputs
+        produced (set):
+            names of the outputs produced by jobs, used by free_outputs
+        started (set):
+            jobs started, used by prefetch
+        prefetcher (Prefetcher | None):
+            loads inputs of upcoming jobs, if prefetch is enabled
+        writers (WriteBehind | None):
+            saves outputs in background, if write_behind is enabled
+        streams (list):
+            streams from generator jobs, waited for before the pipeline completes
+        profiler (Profiler | None):
+            profiler of the run, if any job is profiled
+        sampler (SamplingProfiler | None):
+            sampling profiler of the run, if enabled
+    """
+
+    consumers: dict = field(default_factory=dict)
+    completed: set = field(default_factory=set)
+    produced: set = field(default_factory=set)
+    started: set = field(default_factory=set)
+    prefetcher: Any = None
+    writers: Any = None
+    streams: list = field(default_factory=list)
+    profiler: Any = None
+    sampler: Any = None
+
+
+class Concurrency:
+    """
+    Locks and context variables used by the jobs of a pipeline running at the same time
+    """
+
+    def __init__(self, name, outputs):
+        """__init__.
+
+        Args:
+            name (str):
+                pipeline name
+            outputs (list):
+                output adapters of the pipeline
+        """
+        # per-thread (and per-task) state: current job and timed calls nesting level
+        self.current_job = contextvars.ContextVar(f"{name}_current_job", default=None)
+        self.nesting = contextvars.ContextVar(f"{name}_nested_timed_calls", default=0)
+        # used to serialize hooks and pipeline state updates between concurrent jobs
+        self.lock = threading.RLock()
+        # one for each output adapter, so that each adapter saves one output at a time
+        self.output_locks = [threading.Lock() for _ in outputs]
+        # event loop running the pipeline with the "async" executor, and the same locks as above
+        # created on it
+        self.loop: Union[Any, None] = None
+        self.async_lock = None
+        self.async_output_locks = []
+
+    def __repr__(self):
+        return f"<yapp concurrency {self.current_job.name}>"
+
+    def reset(self, outputs):
+        """Creates new output locks for outputs, used at the start of each run"""
+        self.output_locks = [threading.Lock() for _ in outputs]
+        self.loop = None
+        self.async_lock = None
+        self.async_output_locks = []
@@ -0,0 +1,61 @@
+import re
+import sys
+
+UNITS = {
+    "": 1,
+    "B": 1,
+    "KB": 1024,
+    "MB": 1024**2,
+    "GB": 1024**3,
+    "TB": 1024**4,
+}
+
+
+def parse_size(size):
+    """
+    Returns a size in bytes from an int or a human readable string, like "512MB" or "2 GB"
+
+    Args:
+        size (int | str | None):
+            size to parse, None is returned unchanged
+    """
+    if size is None or isinstance(size, int):
+        return size
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([KMGT]?B?)\s*", str(size).upper())
+    if not match:
+        raise ValueError(f"Invalid size {size}")
+    number, unit = match.groups()
+    return int(float(number) * UNITS[unit])
+
+
+def approx_size(obj, deep=True):
+    """
+    Returns the approximate memory size of obj, in bytes
+
+    pandas objects and arrays (anything with `memory_usage` or `nbytes`) are measured exactly,
+    containers are measured one level deep.
+
+    Args:
+        obj (Any):
+            object to measure
+        deep (bool):
+            measure the Python objects in pandas object columns (like strings), which takes time
+            proportional to their number. Otherwise only the references to them are counted.
+    """
+    memory_usage = getattr(obj, "memory_usage", None)
+    if callable(memory_usage):
+        try:
+            usage = memory_usage(deep=deep)
+            return int(usage.sum()) if hasattr(usage, "sum") else int(usage)
+        except TypeError:
+            pass
+    nbytes = getattr(obj, "nbytes", None)
+    if isinstance(nbytes, int):
+        return nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            sys.getsizeof(key) + sys.getsizeof(value) for key, value in obj.items()
+        )
+    if isinstance(obj, (list, tuple, set)):
+        return sys.getsizeof(obj) + sum(sys.getsizeof(item) for item in obj)
+    return sys.getsizeof(obj)
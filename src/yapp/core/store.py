@@ -0,0 +1,357 @@
+import hashlib
+import importlib.util
+import logging
+import os
+import pickle
+import sqlite3
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from .sizes import parse_size
+
+
+class Serializer(ABC):
+    """
+    Abstract Serializer
+
+    A serializer writes and reads values of specific types to and from files
+    """
+
+    name = ""
+    extension = ""
+
+    @abstractmethod
+    def accepts(self, value):
+        """
+        True if the serializer can be used for value
+        """
+
+    @abstractmethod
+    def dump(self, value, path):
+        """
+        Writes value to path
+        """
+
+    @abstractmethod
+    def load(self, path):
+        """
+        Reads value from path
+        """
+
+
+class ParquetSerializer(Serializer):
+    """
+    Serializer for pandas DataFrames, using Apache Parquet (requires pyarrow)
+    """
+
+    name = "parquet"
+    extension = ".parquet"
+
+    available = importlib.util.find_spec("pyarrow") is not None
+
+    def accepts(self, value):
+        cls = type(value)
+        return (
+            self.available
+            and cls.__name__ == "DataFrame"
+            and cls.__module__.startswith("pandas")
+        )
+
+    def dump(self, value, path):
+        value.to_parquet(path)
+
+    def load(self, path):
+        import pandas as pd  # pylint: disable=import-outside-toplevel
+
+        return pd.read_parquet(path)
+
+
+class FeatherSerializer(ParquetSerializer):
+    """
+    Serializer for pandas DataFrames, using uncompressed Feather files that are memory mapped when
+    loaded (requires pyarrow)
+    """
+
+    name = "feather"
+    extension = ".feather"
+
+    def dump(self, value, path):
+        import pyarrow as pa  # pylint: disable=import-outside-toplevel
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+
+        feather.write_feather(pa.Table.from_pandas(value), path, compression="uncompressed")
+
+    def load(self, path):
+        from pyarrow import feather  # pylint: disable=import-outside-toplevel
+
+        return feather.read_table(path, memory_map=True).to_pandas()
+
+
+class NpySerializer(Serializer):
+    """
+    Serializer for NumPy arrays, using .npy files
+    """
+
+    name = "npy"
+    extension = ".npy"
+
+    def accepts(self, value):
+        cls = type(value)
+        return (
+            cls.__name__ == "ndarray"
+            and cls.__module__ == "numpy"
+            and not value.dtype.hasobject
+        )
+
+    def dump(self, value, path):
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        np.save(path, value, allow_pickle=False)
+
+    def load(self, path):
+        import numpy as np  # pylint: disable=import-outside-toplevel
+
+        return np.load(path, allow_pickle=False)
+
+
+class PickleSerializer(Serializer):
+    """
+    Fallback serializer for any picklable value
+    """
+
+    name = "pickle"
+    extension = ".pkl"
+
+    def accepts(self, value):
+        return True
+
+    def dump(self, value, path):
+        with open(path, "wb") as file:
+            pickle.dump(value, file, protocol=5)
+
+    def load(self, path):
+        with open(path, "rb") as file:
+            return pickle.load(file)
+
+
+class ArtifactStore:
+    """
+    Persistent artifact store
+
+    Values are written to files in a directory (local or a shared mount), using the first serializer
+    accepting them, and indexed in a SQLite database in the same directory.
+    The store total size can be limited: least recently used artifacts are evicted when it grows
+    over max_size, artifacts older than max_age are evicted too.
+    """
+
+    INDEX = "index.sqlite"
+
+    def __init__(self, path, max_size=None, max_age=None, serializers=None):
+        """__init__.
+
+        Args:
+            path (str):
+                Directory where artifacts are stored
+            max_size (int | str | None):
+                Maximum total size of the artifacts, in bytes or as a string like "10GB"
+            max_age (float | None):
+                Maximum age of the artifacts, in seconds
+            serializers (list | None):
+                Serializers to use, in order of preference.
+                Defaults to Parquet for DataFrames, .npy for NumPy arrays and pickle for anything else
+        """
+        self.path = path
+        self.max_size = parse_size(max_size)
+        self.max_age = max_age
+        if serializers is None:
+            serializers = [ParquetSerializer(), NpySerializer(), PickleSerializer()]
+        self.serializers = {serializer.name: serializer for serializer in serializers}
+
+        os.makedirs(path, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(path, ArtifactStore.INDEX),
+            timeout=30,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._db.execute(
+            """create table if not exists artifacts (
+                key text primary key,
+                file text not null,
+                serializer text not null,
+                size integer not null,
+                created_at real not null,
+                accessed_at real not null
+            )"""
+        )
+
+    def __repr__(self):
+        return f"<yapp artifact store {self.path}>"
+
+    def __contains__(self, key):
+        with self._lock:
+            row = self._db.execute("select 1 from artifacts where key = ?", (key,))
+            return row.fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("select count(*) from artifacts").fetchone()[0]
+
+    def __getitem__(self, key):
+        with self._lock:
+            row = self._db.execute(
+                "select file, serializer from artifacts where key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+            self._db.execute(
+                "update artifacts set accessed_at = ? where key = ?", (time.time(), key)
+            )
+        file, serializer = row
+        logging.debug('Loading artifact "%s" from %s', key, file)
+        try:
+            return self.serializers[serializer].load(os.path.join(self.path, file))
+        except FileNotFoundError:
+            # removed by another process sharing the store
+            self.delete(key)
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        self.put(key, value)
+
+    def __delitem__(self, key):
+        if not self.delete(key):
+            raise KeyError(key)
+
+    def get(self, key, default=None):
+        """
+        Returns artifact for key, default if missing
+        """
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def keys(self):
+        """
+        Returns the keys of all stored artifacts
+        """
+        with self._lock:
+            return [row[0] for row in self._db.execute("select key from artifacts")]
+
+    @property
+    def size(self):
+        """
+        Total size of stored artifacts, in bytes
+        """
+        with self._lock:
+            return self._db.execute("select coalesce(sum(size), 0) from artifacts").fetchone()[0]
+
+    def _dump(self, key, value):
+        """Writes value to a new file with the first suitable serializer"""
+        name = hashlib.sha256(key.encode()).hexdigest()
+        for serializer in self.serializers.values():
+            if not serializer.accepts(value):
+                continue
+            fd, tmp_file = tempfile.mkstemp(dir=self.path, suffix=serializer.extension)
+            os.close(fd)
+            try:
+                serializer.dump(value, tmp_file)
+            except Exception as error:  # pylint: disable=broad-except
+                logging.debug('Cannot use %s for "%s": %s', serializer.name, key, error)
+                os.remove(tmp_file)
+                continue
+            file = name + serializer.extension
+            os.replace(tmp_file, os.path.join(self.path, file))
+            return file, serializer.name
+        raise TypeError(f'No serializer available for "{key}" ({type(value)})')
+
+    def put(self, key, value):
+        """
+        Stores value as key, replacing any previous artifact with the same key
+        """
+        old_file = None
+        with self._lock:
+            row = self._db.execute("select file from artifacts where key = ?", (key,)).fetchone()
+            if row:
+                old_file = row[0]
+
+        file, serializer = self._dump(key, value)
+        size = os.path.getsize(os.path.join(self.path, file))
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "insert or replace into artifacts values (?, ?, ?, ?, ?, ?)",
+                (key, file, serializer, size, now, now),
+            )
+        logging.debug('Stored artifact "%s" (%s bytes, %s)', key, size, serializer)
+
+        if old_file and old_file != file:
+            self._remove_file(old_file)
+        self.evict(keep=key)
+
+    def delete(self, key):
+        """
+        Removes artifact for key, returns False if missing
+        """
+        with self._lock:
+            row = self._db.execute("select file from artifacts where key = ?", (key,)).fetchone()
+            if row is None:
+                return False
+            self._db.execute("delete from artifacts where key = ?", (key,))
+        self._remove_file(row[0])
+        return True
+
+    def _remove_file(self, file):
+        try:
+            os.remove(os.path.join(self.path, file))
+        except FileNotFoundError:
+            pass
+
+    def evict(self, keep=None):
+        """
+        Evicts artifacts older than max_age and least recently used ones over max_size
+
+        Args:
+            keep (str | None):
+                key of an artifact that must not be evicted
+
+        Returns:
+            (list) keys of evicted artifacts
+        """
+        evicted = []
+        if self.max_age is not None:
+            with self._lock:
+                rows = self._db.execute(
+                    "select key from artifacts where created_at < ? and key is not ?",
+                    (time.time() - self.max_age, keep),
+                ).fetchall()
+            evicted += self._evict([row[0] for row in rows])
+
+        if self.max_size is not None:
+            with self._lock:
+                total = self._db.execute(
+                    "select coalesce(sum(size), 0) from artifacts"
+                ).fetchone()[0]
+                rows = self._db.execute(
+                    "select key, size from artifacts where key is not ? order by accessed_at",
+                    (keep,),
+                ).fetchall()
+            to_evict = []
+            for key, size in rows:
+                if total <= self.max_size:
+                    break
+                to_evict.append(key)
+                total -= size
+            evicted += self._evict(to_evict)
+
+        return evicted
+
+    def _evict(self, keys):
+        for key in keys:
+            logging.debug('Evicting artifact "%s" from %s', key, self.path)
+            self.delete(key)
+        return keys
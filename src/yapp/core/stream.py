@@ -0,0 +1,130 @@
+import logging
+import threading
+from collections import deque
+
+
+class ChunkStream:
+    """
+    Stream of chunks yielded by a generator job
+
+    Chunks are pulled from the generator by a background thread, saved through the pipeline output
+    adapters and handed over to the job consuming the stream through a bounded buffer, so that at
+    most a few chunks are in memory at the same time.
+    A stream can be iterated only once.
+    """
+
+    _END = object()
+    _CANCELLED = object()
+
+    def __init__(self, name, chunks, save=None, consumed=True, buffer=2):
+        """__init__.
+
+        Args:
+            name (str):
+                name of the stream
+            chunks (Iterator):
+                chunks to stream
+            save (Callable | None):
+                called with name, chunk and chunk index for every chunk
+            consumed (bool):
+                whether a job is going to iterate over the stream, if False chunks are only saved
+            buffer (int):
+                maximum number of chunks produced and not yet consumed
+        """
+        self.name = name
+        self.save = save
+        self.consumed = consumed
+        self.buffer = buffer
+        self.count = 0
+        self.error = None
+        # chunks not yet consumed, followed by _END (or _CANCELLED) once no more are produced
+        self._queue = deque()
+        self._iterated = False
+        # set when no job is going to read chunks anymore, remaining ones are only saved
+        self._detached = False
+        # set to stop producing chunks
+        self._cancelled = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, args=(chunks,), name=f"yapp-stream-{name}", daemon=True
+        )
+        self._thread.start()
+
+    def __repr__(self):
+        return f"<yapp chunk stream {self.name} {self.count} chunks>"
+
+    def _put(self, item, last=False):
+        with self._condition:
+            # the end of the stream is never held back
+            while (
+                not last
+                and len(self._queue) >= self.buffer
+                and not (self._detached or self._cancelled)
+            ):
+                self._condition.wait()
+            if self._detached or (self._cancelled and not last):
+                return
+            self._queue.append(item)
+            self._condition.notify_all()
+
+    def _run(self, chunks):
+        try:
+            for index, chunk in enumerate(chunks):
+                if self._cancelled:
+                    logging.debug('Stream "%s" cancelled', self.name)
+                    break
+                if self.save is not None:
+                    self.save(self.name, chunk, index)
+                self.count += 1
+                if self.consumed:
+                    self._put(chunk)
+        except Exception as error:  # pylint: disable=broad-except
+            logging.error('Stream "%s" failed: %s', self.name, error)
+            self.error = error
+        finally:
+            if self.consumed:
+                self._put(ChunkStream._CANCELLED if self._cancelled else ChunkStream._END, last=True)
+        logging.debug('Stream "%s" completed, %s chunks', self.name, self.count)
+
+    def __iter__(self):
+        if not self.consumed:
+            raise RuntimeError(f'Stream "{self.name}" has no consumer')
+        if self._iterated:
+            raise RuntimeError(f'Stream "{self.name}" can be consumed only once')
+        self._iterated = True
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                chunk = self._queue.popleft()
+                self._condition.notify_all()
+            if chunk is ChunkStream._CANCELLED:
+                raise RuntimeError(f'Stream "{self.name}" was cancelled')
+            if chunk is ChunkStream._END:
+                if self.error is not None:
+                    raise self.error
+                return
+            yield chunk
+
+    def wait(self):
+        """
+        Waits for all chunks to be produced and saved, raises the error occurred, if any
+
+        Chunks not read by the consumer are discarded.
+        """
+        with self._condition:
+            self._detached = True
+            self._queue.clear()
+            self._condition.notify_all()
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """
+        Stops producing chunks and waits for the background thread
+        """
+        with self._condition:
+            self._cancelled = True
+            self._condition.notify_all()
+        self._thread.join()
@@ -0,0 +1,168 @@
+import logging
+import threading
+from collections import deque
+from contextlib import nullcontext
+
+from .async_executor import run_sync
+from .sizes import approx_size, parse_size
+
+
+class OutputWriter:
+    """
+    Saves data to a single output adapter from a background thread
+
+    Writes are queued and run in order. Once the data waiting in queue grows over max_memory new
+    writes block until enough previous ones are completed.
+    """
+
+    def __init__(self, output, max_memory=None, metrics=None):
+        """__init__.
+
+        Args:
+            output (OutputAdapter):
+                adapter to write to
+            max_memory (int | str | None):
+                Maximum memory used by data waiting to be written, unbounded if None
+            metrics (Metrics | None):
+                records writes, if given
+        """
+        self.output = output
+        self.max_memory = parse_size(max_memory)
+        self.metrics = metrics
+        self.memory = 0
+        self.errors = []
+        self._queue = deque()
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name=f"yapp-writer-{output.name}", daemon=True
+        )
+        self._thread.start()
+
+    def __repr__(self):
+        return f"<yapp output writer {self.output.name} {len(self._queue)} pending>"
+
+    def submit(self, method, name, data, *args):
+        """
+        Queues a write, blocking while the queue is over its memory limit
+
+        Args:
+            method (str):
+                name of the adapter method to call
+            name (str):
+                output name
+            data (Any):
+                data to save
+            *args:
+                other arguments for the adapter method
+        """
+        size = approx_size(data, deep=False) if data is not None else 0
+        with self._condition:
+            # a single write bigger than the limit is accepted once the queue is empty
+            while (
+                self.max_memory is not None
+                and self.memory
+                and self.memory + size > self.max_memory
+            ):
+                logging.debug("Waiting for %s to write pending outputs", self.output.name)
+                self._condition.wait()
+            self._queue.append((method, name, data, args, size))
+            self.memory += size
+            self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._queue and not self._closed:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                method, name, data, args, size = self._queue.popleft()
+                self._writing = True
+            if self.metrics is not None:
+                measure = self.metrics.measure("output", f"{self.output.name}.{name}")
+            else:
+                measure = nullcontext()
+            try:
+                with measure:
+                    run_sync(getattr(self.output, method), name, data, *args)
+                logging.debug("saved %s output to %s", name, self.output)
+            except Exception as error:  # pylint: disable=broad-except
+                logging.error('Failed saving "%s" to %s: %s', name, self.output.name, error)
+                with self._condition:
+                    self.errors.append(error)
+            finally:
+                # do not keep data alive while waiting for the next write
+                del data
+                with self._condition:
+                    self.memory -= size
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def wait(self):
+        """
+        Waits for all queued writes to be completed
+        """
+        with self._condition:
+            while self._queue or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        """
+        Waits for queued writes and stops the writer thread
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._thread.join()
+
+
+class WriteBehind:
+    """
+    Write-behind queue for output adapters
+
+    Data is saved to every adapter by its own writer thread, so that jobs do not wait for outputs
+    to be written and different adapters are written in parallel.
+    """
+
+    def __init__(self, outputs, max_memory=None, metrics=None):
+        """__init__.
+
+        Args:
+            outputs (list[OutputAdapter]):
+                adapters to write to
+            max_memory (int | str | None):
+                Maximum memory used by data waiting to be written to each adapter,
+                unbounded if None
+            metrics (Metrics | None):
+                records writes, if given
+        """
+        self.writers = [OutputWriter(output, max_memory, metrics) for output in outputs]
+
+    def submit(self, method, name, data, *args):
+        """
+        Queues a write to every adapter
+        """
+        for writer in self.writers:
+            writer.submit(method, name, data, *args)
+
+    def flush(self):
+        """
+        Waits for all queued writes, raises the first error occurred since the previous flush
+        """
+        for writer in self.writers:
+            writer.wait()
+        errors = []
+        for writer in self.writers:
+            errors += writer.errors
+            writer.errors = []
+        if errors:
+            raise errors[0]
+
+    def close(self):
+        """
+        Waits for all queued writes and stops writer threads, errors are only logged
+        """
+        for writer in self.writers:
+            writer.close()
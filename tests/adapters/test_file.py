@@ -0,0 +1,138 @@
+import os
+
+import pandas as pd
+import pytest
+
+from yapp.adapters.file import (
+    CsvInput,
+    FeatherInput,
+    FeatherOutput,
+    ParquetInput,
+    ParquetOutput,
+)
+
+DATA = pd.DataFrame(
+    {
+        "id": range(10),
+        "country": ["it", "fr"] * 5,
+        "amount": [float(i * 10) for i in range(10)],
+    }
+)
+
+
+@pytest.mark.parametrize(
+    "output_class, input_class", [(ParquetOutput, ParquetInput), (FeatherOutput, FeatherInput)]
+)
+def test_roundtrip(tmp_path, output_class, input_class):
+    output_class(str(tmp_path)).save("orders", DATA)
+    adapter = input_class(str(tmp_path))
+    pd.testing.assert_frame_equal(adapter["orders"], DATA)
+
+    data = adapter.get("orders", columns=["id", "amount"], filter={"amount": {">=": 50}})
+    assert list(data.columns) == ["id", "amount"]
+    assert list(data["id"]) == [5, 6, 7, 8, 9]
+
+
+@pytest.mark.parametrize(
+    "output_class, input_class", [(ParquetOutput, ParquetInput), (FeatherOutput, FeatherInput)]
+)
+def test_index_roundtrip(tmp_path, output_class, input_class):
+    totals = DATA.groupby("country")[["amount"]].sum()
+    output_class(str(tmp_path)).save("totals", totals)
+    pd.testing.assert_frame_equal(input_class(str(tmp_path))["totals"], totals)
+
+
+def test_partitioned(tmp_path):
+    output = ParquetOutput(str(tmp_path), compression="zstd", partition_cols=["country"])
+    output.save("orders", DATA)
+    assert sorted(os.listdir(tmp_path / "orders")) == ["country=fr", "country=it"]
+    # saved again, replacing the previous output
+    output.save("orders", DATA)
+
+    data = ParquetInput(str(tmp_path)).get("orders", filter={"country": "it"})
+    assert sorted(data["id"]) == [0, 2, 4, 6, 8]
+    assert set(data["country"]) == {"it"}
+
+
+def test_chunks(tmp_path):
+    output = FeatherOutput(str(tmp_path), compression="uncompressed")
+    for index, start in enumerate(range(0, 10, 4)):
+        output.save_chunk("orders", DATA[start : start + 4], index)
+
+    chunks = list(FeatherInput(str(tmp_path), chunksize=3)["orders"])
+    assert all(len(chunk) <= 3 for chunk in chunks)
+    assert sorted(pd.concat(chunks)["id"]) == list(range(10))
+
+
+def test_invalid_filter(tmp_path):
+    ParquetOutput(str(tmp_path)).save("orders", DATA)
+    with pytest.raises(ValueError, match="Invalid filter operator"):
+        ParquetInput(str(tmp_path)).get("orders", filter={"id": {"~": 1}})
+
+
+@pytest.mark.parametrize("sidecar_format", ["feather", "parquet"])
+def test_csv_sidecar(tmp_path, sidecar_format):
+    DATA.to_csv(tmp_path / "orders.csv", index=False)
+    sidecars = str(tmp_path / "sidecars")
+    adapter = CsvInput(str(tmp_path), sidecar=sidecars, sidecar_format=sidecar_format)
+    pd.testing.assert_frame_equal(adapter["orders"], DATA)
+    assert len(adapter.sidecars) == 1
+
+    # served from the sidecar while the file is unchanged
+    os.utime(tmp_path / "orders.csv", ns=(0, os.stat(tmp_path / "orders.csv").st_mtime_ns))
+    adapter.sidecars.serializers[sidecar_format].load = lambda path: "from sidecar"
+    assert adapter["orders"] == "from sidecar"
+    # different read_csv arguments use another sidecar
+    assert CsvInput(str(tmp_path), sidecar=sidecars, usecols=["id"])["orders"].shape == (10, 1)
+    assert len(adapter.sidecars) == 2
+
+
+def test_csv_sidecar_stale(tmp_path):
+    path = tmp_path / "orders.csv"
+    DATA.to_csv(path, index=False)
+    adapter = CsvInput(str(tmp_path), sidecar=str(tmp_path / "sidecars"))
+    adapter.get("orders")
+    DATA.head(3).to_csv(path, index=False)
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 10**9))
+    assert len(adapter["orders"]) == 3
+    # the sidecar of the previous version was removed
+    assert len(adapter.sidecars) == 1
+
+
+def test_csv_files(tmp_path):
+    for day in range(1, 4):
+        DATA.assign(day=day).to_csv(tmp_path / f"2026-10-0{day}.csv.gz", index=False)
+    adapter = CsvInput(str(tmp_path), partitioning=["date"], workers=2)
+    data = adapter["2026-10-0*.csv.gz"]
+    assert len(data) == 30
+    assert list(data["date"].unique()) == ["2026-10-01", "2026-10-02", "2026-10-03"]
+    assert list(data.groupby("date")["day"].first()) == [1, 2, 3]
+
+    # a single compressed file
+    assert len(adapter["2026-10-01.csv.gz"]) == 10
+    chunks = list(CsvInput(str(tmp_path), chunksize=4, partitioning=["date"])["*.csv.gz"])
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2] * 3
+
+
+@pytest.mark.parametrize("engine", [None, "pyarrow"])
+def test_csv_dtypes(tmp_path, engine):
+    DATA.to_csv(tmp_path / "orders.csv", index=False)
+    kwargs = {"engine": engine} if engine else {}
+    adapter = CsvInput(str(tmp_path), **kwargs)
+    # same dtypes reading a file by name or by glob
+    pd.testing.assert_series_equal(adapter["orders"].dtypes, adapter["*.csv"].dtypes)
+
+
+def test_csv_directory(tmp_path):
+    for country in ("fr", "it"):
+        os.makedirs(tmp_path / "orders" / f"country={country}")
+        DATA[DATA["country"] == country].drop(columns="country").to_csv(
+            tmp_path / "orders" / f"country={country}" / "part.csv", index=False
+        )
+    for executor in ("thread", "process"):
+        data = CsvInput(str(tmp_path), partitioning="hive", executor=executor)["orders"]
+        pd.testing.assert_frame_equal(
+            data.sort_values("id", ignore_index=True), DATA[["id", "amount", "country"]]
+        )
+    with pytest.raises(FileNotFoundError):
+        CsvInput(str(tmp_path))["missing/*.csv"]
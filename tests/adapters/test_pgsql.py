@@ -0,0 +1,75 @@
+from types import SimpleNamespace
+
+from sqlalchemy.dialects import postgresql
+
+from yapp.adapters.pgsql import PgSqlInput, PgSqlOutput, copy_insert
+
+
+class FakeCursor:
+    def __init__(self):
+        self.copied = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+    def copy_expert(self, sql, buffer):
+        self.copied.append((sql, buffer.read()))
+
+
+def copy_rows(table, rows):
+    cursor = FakeCursor()
+    connection = SimpleNamespace(
+        dialect=postgresql.dialect(),
+        connection=SimpleNamespace(cursor=lambda: cursor),
+    )
+    copy_insert(table, connection, ["id", "name"], iter(rows))
+    return cursor.copied[0]
+
+
+def read_copy_text(data):
+    """Parses rows as PostgreSQL reads COPY text format"""
+    escapes = {"\\": "\\", "t": "\t", "n": "\n", "r": "\r"}
+    rows = []
+    for line in data.splitlines():
+        row = []
+        for field in line.split("\t"):
+            if field == "\\N":
+                row.append(None)
+                continue
+            value, chars = "", iter(field)
+            for char in chars:
+                value += escapes[next(chars)] if char == "\\" else char
+            row.append(value)
+        rows.append(tuple(row))
+    return rows
+
+
+def test_copy_insert():
+    table = SimpleNamespace(name="Results", schema="reports")
+    sql, data = copy_rows(table, [(1, "a,b"), (2, None)])
+    assert sql == 'COPY reports."Results" (id, name) FROM STDIN WITH (FORMAT text, NULL \'\\N\')'
+    assert data.splitlines() == ["1\ta,b", "2\t\\N"]
+
+
+def test_copy_empty_strings():
+    rows = [("1", ""), ("2", None), ("3", "\\N"), ("4", "tab\there\nnew line\\")]
+    _, data = copy_rows(SimpleNamespace(name="results", schema=None), rows)
+    assert read_copy_text(data) == rows
+
+
+def test_pgsql_arguments():
+    kwargs = dict(username="user", password="pass", host="db", port=5432, database="data")
+    adapter = PgSqlInput(**kwargs, schema="reports", max_connections=4)
+    assert adapter.schema == "reports"
+    assert adapter.engine_kwargs["pool_size"] == 4
+    adapter = PgSqlOutput(**kwargs, method="copy", staging=True)
+    assert adapter.method == "copy"
+    assert adapter.staging
+
+
+def test_copy_method():
+    assert PgSqlOutput.METHODS["copy"] is copy_insert
+    assert "multi" in PgSqlOutput.METHODS
@@ -0,0 +1,101 @@
+import pyarrow as pa
+import pytest
+
+from yapp import Inputs, Job, Pipeline
+from yapp.adapters.snowflake import SnowflakeInput
+
+BATCHES = [
+    pa.table({"ID": [1, 2], "AMOUNT": [10, 20]}),
+    pa.table({"ID": [3], "AMOUNT": [30]}),
+]
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.sfqid = None
+        self.description = [("ID",), ("AMOUNT",)]
+        self.batches = []
+
+    def execute(self, sql, params):
+        self.connection.executed.append((sql, params))
+        self.batches = self.connection.results(sql)
+
+    def execute_async(self, sql, params):
+        self.sfqid = f"query-{len(self.connection.submitted)}"
+        self.connection.submitted[self.sfqid] = (sql, params)
+
+    def get_results_from_sfqid(self, query_id):
+        sql, _ = self.connection.submitted[query_id]
+        self.connection.fetched.append(query_id)
+        self.batches = self.connection.results(sql)
+
+    def fetch_arrow_batches(self):
+        yield from self.batches
+
+
+class FakeConnection:
+    def __init__(self):
+        self.executed = []
+        self.submitted = {}
+        self.fetched = []
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    @staticmethod
+    def results(sql):
+        if "nulls" in sql:
+            return [*BATCHES, pa.table({"ID": [4], "AMOUNT": [None]})]
+        return [] if "empty" in sql else BATCHES
+
+
+def test_fetch():
+    connection = FakeConnection()
+    adapter = SnowflakeInput(connection=connection)
+    data = adapter.get("orders", columns=["ID", "AMOUNT"], filter={"ID": [1, 2, 3]})
+    assert list(data["AMOUNT"]) == [10, 20, 30]
+    sql, params = connection.executed[0]
+    assert "%(ID_1_1)s" in sql
+    assert params == {"ID_1_1": 1, "ID_1_2": 2, "ID_1_3": 3}
+
+    assert list(adapter["empty"].columns) == ["ID", "AMOUNT"]
+
+
+def test_fetch_different_schemas():
+    data = SnowflakeInput(connection=FakeConnection())["nulls"]
+    assert list(data["ID"]) == [1, 2, 3, 4]
+    assert data["AMOUNT"].isna().tolist() == [False, False, False, True]
+
+
+def test_partition_on():
+    adapter = SnowflakeInput(connection=FakeConnection(), submit_async=True)
+    partition_on = {"column": "ID", "partitions": 2}
+    with pytest.raises(ValueError):
+        adapter.get("orders", partition_on=partition_on)
+    with pytest.raises(ValueError):
+        adapter.submit("orders", partition_on=partition_on)
+
+
+def test_fetch_batches():
+    adapter = SnowflakeInput(connection=FakeConnection(), chunksize=1)
+    assert [len(batch) for batch in adapter["orders"]] == [2, 1]
+
+
+class Total(Job):
+    def execute(self, orders, payments):
+        return {"total": int(orders["AMOUNT"].sum() + payments["AMOUNT"].sum())}
+
+
+def test_submit_async():
+    connection = FakeConnection()
+    inputs = Inputs(sources=[SnowflakeInput(connection=connection, submit_async=True)])
+    inputs.expose("SnowflakeInput", "orders", "orders")
+    inputs.expose("SnowflakeInput", "payments", "payments")
+    pipeline = Pipeline([Total], inputs=inputs)
+    pipeline()
+    assert pipeline.inputs["total"] == 120
+    # both queries were submitted before running and only their results fetched
+    assert len(connection.submitted) == 2
+    assert sorted(connection.fetched) == ["query-0", "query-1"]
+    assert not connection.executed
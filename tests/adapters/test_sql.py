@@ -0,0 +1,172 @@
+import sqlite3
+
+import pandas as pd
+import pytest
+import sqlalchemy as sa
+
+from yapp import Inputs, Job, Pipeline
+from yapp.adapters.sql import SqlInput, SqlOutput, partition_conditions
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    pd.DataFrame(
+        {
+            "id": range(6),
+            "country": ["IT", "FR", "IT", "DE", "IT", "FR"],
+            "amount": [10, 20, 30, 40, 50, 60],
+            "notes": ["x"] * 6,
+        }
+    ).to_sql("orders", engine, index=False)
+    return engine
+
+
+def test_sql_input(engine):
+    adapter = SqlInput(engine)
+    assert list(adapter["orders"].columns) == ["id", "country", "amount", "notes"]
+
+    data = adapter.get("orders", columns=["id", "amount"], filter={"country": "IT"})
+    assert list(data.columns) == ["id", "amount"]
+    assert list(data["id"]) == [0, 2, 4]
+
+    data = adapter.get(
+        "orders", columns=["id"], filter={"country": ["FR", "DE"], "amount": {">": 20}}
+    )
+    assert list(data["id"]) == [3, 5]
+
+    adapter = SqlInput(engine, where_clause="amount < 30")
+    data = adapter.get("orders", filter={"country": {"!=": "IT"}})
+    assert list(data["id"]) == [1]
+
+
+def test_parameterized_query(engine):
+    query = SqlInput(engine).build_query("orders", ["id"], {"country": "IT' or 1=1 --"})
+    assert "IT'" not in str(query)
+    assert SqlInput(engine).get("orders", filter={"country": "IT' or 1=1 --"}).empty
+
+
+def test_table_names(engine, tmp_path):
+    adapter = SqlInput(engine)
+    # names are never quoted, as in plain SQL
+    assert 'FROM MyTable' in str(adapter.build_query("MyTable", ["id"]))
+    query = str(adapter.build_query("other_schema.orders", ["id"]))
+    assert "FROM other_schema.orders" in query
+
+    with engine.begin() as connection:
+        connection.exec_driver_sql(f"attach database '{tmp_path / 'other.db'}' as other_schema")
+        connection.exec_driver_sql("create table other_schema.orders as select * from orders")
+        assert len(SqlInput(connection)["Orders"]) == 6
+        assert len(SqlInput(connection)["other_schema.orders"]) == 6
+        data = SqlInput(connection).get("other_schema.Orders", columns=["ID"], filter={"id": 1})
+        assert list(data["ID"]) == [1]
+
+
+def test_dbapi_connection(tmp_path, engine):
+    connection = sqlite3.connect(tmp_path / "test.db")
+    adapter = SqlInput(connection, where_clause="amount < 50")
+    assert len(adapter["orders"]) == 4
+    data = adapter.get("orders", columns=["id"], filter={"country": ["FR", "DE"]})
+    assert list(data["id"]) == [1, 3]
+    connection.close()
+
+
+def test_sql_input_options(engine):
+    inputs = Inputs(sources=[SqlInput(engine)])
+    inputs.expose("SqlInput", "orders", "italian_orders", filter={"country": "IT"})
+    inputs.expose("SqlInput", "orders", "orders")
+    assert len(inputs["italian_orders"]) == 3
+    assert len(inputs["orders"]) == 6
+
+
+class Total(Job):
+    columns = {"orders": ["amount"]}
+
+    def execute(self, orders):
+        return {"total": int(orders["amount"].sum()), "total_columns": list(orders.columns)}
+
+
+class Count(Job):
+    columns = {"orders": ["id", "amount"]}
+
+    def execute(self, orders):
+        return {"count_columns": list(orders.columns)}
+
+
+def test_inferred_columns(engine):
+    inputs = Inputs(sources=[SqlInput(engine)])
+    inputs.expose("SqlInput", "orders", "orders")
+    pipeline = Pipeline([Total, Count], inputs=inputs)
+    pipeline()
+    assert pipeline.inputs["total"] == 210
+    assert pipeline.inputs["total_columns"] == ["amount", "id"]
+    assert pipeline.inputs["count_columns"] == ["amount", "id"]
+
+
+def test_partition_conditions():
+    conditions = partition_conditions("id", 0, 10, 4)
+    assert len(conditions) == 4
+    assert len(partition_conditions("id", 0, 2, 4)) == 2
+    assert len(partition_conditions("id", 0.0, 1.0, 4)) == 4
+    assert len(partition_conditions("id", 5, 5, 4)) == 1
+
+
+@pytest.fixture
+def big_engine(tmp_path):
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'big.db'}")
+    pd.DataFrame({"id": range(1000), "value": range(0, 2000, 2)}).to_sql(
+        "numbers", engine, index=False
+    )
+    # a NULL and values outside bounds must be read too
+    pd.DataFrame({"id": [None, -5, 5000], "value": [1, 1, 1]}).to_sql(
+        "numbers", engine, index=False, if_exists="append"
+    )
+    return engine
+
+
+def test_partitioned_read(big_engine):
+    partition_on = {"column": "id", "lower": 0, "upper": 1000, "num_partitions": 4}
+    adapter = SqlInput(big_engine, partition_on=partition_on, max_connections=2)
+    data = adapter["numbers"]
+    expected = SqlInput(big_engine)["numbers"]
+    assert len(data) == len(expected) == 1003
+    assert int(data["value"].sum()) == int(expected["value"].sum())
+
+    data = SqlInput(big_engine).get(
+        "numbers", filter={"value": {"<": 100}}, partition_on=partition_on
+    )
+    assert len(data) == 53
+
+
+def test_partitioned_chunks(big_engine):
+    partition_on = {"column": "id", "lower": 0, "upper": 1000, "num_partitions": 4}
+    adapter = SqlInput(big_engine, partition_on=partition_on, chunksize=100)
+    chunks = list(adapter["numbers"])
+    assert all(len(chunk) <= 100 for chunk in chunks)
+    assert sum(len(chunk) for chunk in chunks) == 1003
+
+
+def test_sql_output(engine):
+    data = pd.DataFrame({"id": [1, 2], "amount": [3, 4]})
+    output = SqlOutput(engine, extra_fields={"run": "first"}, method="multi", chunksize=1)
+    output.save("results", data)
+    output.save("results", data)
+    # caller's data is not modified
+    assert list(data.columns) == ["id", "amount"]
+    saved = SqlInput(engine)["results"]
+    assert len(saved) == 4
+    assert set(saved["run"]) == {"first"}
+
+    with pytest.raises(ValueError):
+        SqlOutput(engine, method="copy")
+
+
+def test_sql_output_staging(engine):
+    output = SqlOutput(engine, staging=True)
+    output.save("orders", pd.DataFrame({"id": [1, 2]}))
+    assert list(SqlInput(engine)["orders"]["id"]) == [1, 2]
+    assert sa.inspect(engine).get_table_names() == ["orders"]
+
+    output.save_chunk("orders", pd.DataFrame({"id": [3]}), 0)
+    output.save_chunk("orders", pd.DataFrame({"id": [4]}), 1)
+    assert list(SqlInput(engine)["orders"]["id"]) == [3, 4]
@@ -0,0 +1,26 @@
+import argparse
+import os
+
+from yapp.cli import add_run_arguments, pipeline_overrides
+from yapp.core.options import PipelineOptions
+
+
+def parse(*args):
+    parser = argparse.ArgumentParser()
+    add_run_arguments(parser)
+    return parser.parse_args(args)
+
+
+def test_pipeline_overrides():
+    assert pipeline_overrides(parse()) == {}
+
+    args = parse("-w", "4", "--no-cache", "--profile-memory", "--sampling", "0.01")
+    overrides = pipeline_overrides(args)
+    assert overrides == {"workers": 4, "cache": None, "profile": "memory", "sampling": 0.01}
+
+    options = PipelineOptions.from_dict({"workers": 2, "free_outputs": True})
+    options.update(pipeline_overrides(parse("--profile", "--profile-dir", "profiles")))
+    assert options.execution.workers == 2
+    assert options.caching.free_outputs
+    assert options.profiling.profile is True
+    assert options.profiling.profile_dir == os.path.abspath("profiles")
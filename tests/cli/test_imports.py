@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+# modules that must not be imported just by importing yapp.cli
+HEAVY_MODULES = ["pandas", "numpy", "sqlalchemy", "pyarrow", "cerberus", "yaml", "snowflake"]
+# cumulative import time of yapp.cli, in microseconds, kept generous for slow machines
+IMPORT_TIME_BUDGET = 500_000
+
+
+def import_times(statement):
+    """Returns the cumulative import time of every module imported by statement"""
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+
+def test_cli_import_time():
+    times = import_times("import yapp.cli")
+    assert not [module for module in times if module.split(".")[0] in HEAVY_MODULES]
+    assert times["yapp.cli"] < IMPORT_TIME_BUDGET
+
+
+def test_pandas_adapters_lazy():
+    times = import_times("import yapp.adapters.pandas")
+    assert "pandas" not in times
+
+    from yapp.adapters import pandas as pandas_adapters  # pylint: disable=import-outside-toplevel
+
+    assert pandas_adapters.read_csv.fn.__name__ == "read_csv"
+    assert pandas_adapters.read_csv is pandas_adapters.read_csv
+    assert "read_json" in dir(pandas_adapters)
@@ -2,6 +2,7 @@ import graphlib
 import os
 import pathlib
 
+import pandas as pd
 import pytest
 
 from yapp.cli.parsing import ConfigParser
@@ -226,3 +227,414 @@ def test_empty_pipelines_yml(tmp_path):
 def test_missing_pipelines_yml():
     with pytest.raises(MissingConfiguration):
         ConfigParser("parsing_test").parse()
+
+
+def test_parallel_pipeline(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1}
+
+def left(value):
+    return {'left': value + 1}
+
+def right(value):
+    return {'right': value + 2}
+
+def last(left, right):
+    return {'result': left + right}
+"""
+
+    pipelines_yml = """
+a_pipeline:
+    workers: 2
+    steps:
+        - run: just.first
+        - run: just.left
+          after: just.first
+        - run: just.right
+          after: just.first
+        - run: just.last
+          after: [just.left, just.right]
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+
+    assert pipeline.options.execution.workers == 2
+    jobs = {job.__name__: job for job in pipeline.job_list}
+    assert pipeline.dependencies[jobs['just.first']] == set()
+    assert pipeline.dependencies[jobs['just.last']] == {jobs['just.left'], jobs['just.right']}
+
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs['result'] == 5
+
+
+def test_async_pipeline(tmp_path):
+    python_file = """
+import asyncio
+
+async def first():
+    await asyncio.sleep(0)
+    return {'value': 1}
+
+def second(value):
+    return {'result': value + 1}
+"""
+
+    pipelines_yml = """
+a_pipeline:
+    executor: async
+    steps:
+        - run: just.first
+        - run: just.second
+          after: just.first
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.execution.executor == "async"
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs['result'] == 2
+
+
+def test_cached_pipeline(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1}
+
+def second(value, config):
+    return {'result': value + config.offset}
+"""
+
+    pipelines_yml = """
+a_pipeline:
+    cache: .yapp_cache
+    config:
+        offset: 10
+    steps:
+        - run: just.first
+        - run: just.second
+          after: just.first
+          cache: false
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    for _ in range(2):
+        pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+        pipeline()
+        assert pipeline.inputs['result'] == 11
+
+    jobs = {job.__name__: job for job in pipeline.job_list}
+    assert jobs['just.first'].source == os.path.join(tmp_path, 'just.py')
+    assert not jobs['just.second'].cache
+    # only just.first outputs (and their names) are cached
+    assert pipeline.options.caching.cache.path == os.path.join(tmp_path, '.yapp_cache')
+    assert len(pipeline.options.caching.cache.store) == 2
+
+    # functions not taking config as argument are not affected by its changes
+    assert jobs['just.first'].config_keys == []
+    assert jobs['just.second'].config_keys is None
+
+
+def test_global_without_config(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1}
+"""
+
+    pipelines_yml = """
++all:
+    workers: 2
+
+a_pipeline:
+    steps:
+        - run: just.first
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    # +all is used even without a config field
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.execution.workers == 2
+
+
+def test_free_outputs_pipeline(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1, 'other': 2}
+
+def second(value):
+    return {'result': value + 1}
+"""
+
+    pipelines_yml = """
++all:
+    keep:
+        - other
+
+a_pipeline:
+    free_outputs: true
+    steps:
+        - run: just.first
+        - run: just.second
+          after: just.first
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.caching.free_outputs
+    assert pipeline.options.caching.keep == ['other']
+    pipeline(save_results='result')
+    assert set(pipeline.inputs) == {'other', 'result'}
+
+
+def test_prefetch_pipeline(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1}
+"""
+
+    pipelines_yml = """
++all:
+    prefetch: 2
+
+a_pipeline:
+    steps:
+        - run: just.first
+
+other_pipeline:
+    prefetch:
+        jobs: 1
+        workers: 2
+    steps:
+        - run: just.first
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.execution.prefetch == 2
+    assert pipeline.options.execution.prefetch_workers == 4
+    pipeline = ConfigParser("other_pipeline", path=tmp_path).parse()
+    assert pipeline.options.execution.prefetch == 1
+    assert pipeline.options.execution.prefetch_workers == 2
+    pipeline()
+    assert pipeline.inputs['value'] == 1
+
+
+def test_write_behind_pipeline(tmp_path):
+    python_file = """
+def first():
+    return {'value': 1}
+"""
+
+    pipelines_yml = """
+a_pipeline:
+    write_behind: true
+    steps:
+        - run: just.first
+
+other_pipeline:
+    write_behind:
+        max_memory: 1GB
+    steps:
+        - run: just.first
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.output.write_behind
+    assert pipeline.options.output.write_behind_memory is None
+    pipeline = ConfigParser("other_pipeline", path=tmp_path).parse()
+    assert pipeline.options.output.write_behind
+    assert pipeline.options.output.write_behind_memory == '1GB'
+    pipeline()
+    assert pipeline.inputs['value'] == 1
+
+
+def test_streaming_pipeline(tmp_path):
+    python_file = """
+def numbers():
+    for i in range(3):
+        yield [i] * 2
+
+def total(numbers):
+    return {'total': sum(sum(chunk) for chunk in numbers)}
+"""
+
+    pipelines_yml = """
+a_pipeline:
+    chunksize: 1000
+    steps:
+        - run: just.numbers
+          stream: numbers
+        - run: just.total
+          after: just.numbers
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.options.execution.chunksize == 1000
+    pipeline()
+    assert pipeline.inputs['total'] == 6
+
+
+def test_projected_inputs_pipeline(tmp_path):
+    pd.DataFrame({'id': [1, 2, 3], 'country': ['IT', 'FR', 'IT'], 'amount': [1, 2, 3]}).to_sql(
+        'orders', f"sqlite:///{tmp_path / 'test.db'}", index=False
+    )
+
+    python_file = """
+def total(italian_orders):
+    return {'total': int(italian_orders['amount'].sum())}
+
+def columns(orders):
+    return {'columns': list(orders.columns)}
+"""
+
+    pipelines_yml = f"""
+a_pipeline:
+    inputs:
+        - from: sql.SqlInput
+          with:
+            conn: sqlite:///{tmp_path / 'test.db'}
+          expose:
+            - use: orders
+              as: italian_orders
+              columns: [amount]
+              filter:
+                country: IT
+            - use: orders
+              as: orders
+
+    steps:
+        - run: just.total
+        - run: just.columns
+          columns:
+            orders: [id, country]
+"""
+
+    make_tmp(tmp_path, "just.py", python_file, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.inputs.options['italian_orders'] == {
+        'columns': ['amount'], 'filter': {'country': 'IT'}
+    }
+    pipeline()
+    assert pipeline.inputs['total'] == 4
+    assert pipeline.inputs['columns'] == ['id', 'country']
+
+
+def test_plan_cache(tmp_path, monkeypatch):
+    pipelines_yml = """
+a_pipeline:
+    config:
+        password: !env YAPP_TEST_PASSWORD
+    steps:
+        - run: just.do_something
+        - run: just.do_nothing
+          after: just.do_something
+"""
+    python_file = """
+def do_nothing():
+    pass
+
+def do_something():
+    return {'value': 99.0}
+"""
+    make_tmp(tmp_path, "just.py", python_file)
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    plans = os.path.join(tmp_path, "plans")
+    monkeypatch.setenv("YAPP_TEST_PASSWORD", "secret")
+    pipeline = ConfigParser("a_pipeline", path=tmp_path, plan_cache=plans).parse()
+    assert pipeline.inputs.config.password == "secret"
+    (plan_file,) = os.listdir(plans)
+    with open(os.path.join(plans, plan_file), encoding="utf-8") as file:
+        assert "secret" not in file.read()
+
+    # the cached plan is used without reading YAML files or looking for modules
+    monkeypatch.setenv("YAPP_TEST_PASSWORD", "changed")
+    parser = ConfigParser("a_pipeline", path=tmp_path, plan_cache=plans)
+    monkeypatch.setattr(parser, "compile", None)
+    monkeypatch.setattr(parser, "resolve_module", None)
+    pipeline = parser.parse()
+    assert pipeline.inputs.config.password == "changed"
+    assert [job.__name__ for job in pipeline.job_list] == ["just.do_something", "just.do_nothing"]
+    pipeline()
+    assert pipeline.inputs["value"] == 99.0
+
+    # changes to modules or pipelines.yml invalidate it
+    os.utime(os.path.join(tmp_path, "just.py"), ns=(0, 0))
+    parser = ConfigParser("a_pipeline", path=tmp_path, plan_cache=plans)
+    assert parser.plans.load(parser.pipelines_file, "a_pipeline") is None
+    parser.parse()
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml.replace("99.0", "98.0") + "\n")
+    parser = ConfigParser("a_pipeline", path=tmp_path, plan_cache=plans)
+    assert parser.plans.load(parser.pipelines_file, "a_pipeline") is None
+    parser.parse()
+    assert parser.plans.load(parser.pipelines_file, "a_pipeline") is not None
+
+    # and so does a module added where it would be found first
+    os.makedirs(os.path.join(tmp_path, "a_pipeline"))
+    make_tmp(tmp_path, "a_pipeline/just.py", python_file)
+    assert parser.plans.load(parser.pipelines_file, "a_pipeline") is None
+
+
+def test_modules_loaded_once(tmp_path):
+    python_file = """
+with open(__file__ + ".loads", "a") as file:
+    file.write("loaded\\n")
+
+def do_nothing():
+    pass
+
+def do_something():
+    return {'value': 99.0}
+
+def a_hook(pipeline):
+    pass
+"""
+    pipelines_yml = """
++all:
+    hooks:
+        - run: just.a_hook
+          on: pipeline_start
+
+a_pipeline:
+    hooks:
+        - run: just.a_hook
+          on: pipeline_finish
+    steps:
+        - run: just.do_something
+        - run: just.do_nothing
+          after: just.do_something
+"""
+    make_tmp(tmp_path, "just.py", python_file)
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    parser = ConfigParser("a_pipeline", path=tmp_path)
+    parser.parse()
+    with open(os.path.join(tmp_path, "just.py.loads"), encoding="utf-8") as file:
+        assert file.read() == "loaded\n"
+    assert parser.module_stats["misses"] == 1
+    assert parser.module_stats["hits"] == 3
+
+
+def test_step_profile(tmp_path):
+    pipelines_yml = """
+a_pipeline:
+    steps:
+        - run: nop.do_nothing
+          profile: memory
+"""
+    make_tmp(tmp_path, "nop.py", nop_py, parent='a_pipeline')
+    make_tmp(tmp_path, "pipelines.yml", pipelines_yml)
+    pipeline = ConfigParser("a_pipeline", path=tmp_path).parse()
+    assert pipeline.job_list[0].profile == "memory"
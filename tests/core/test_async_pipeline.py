@@ -0,0 +1,115 @@
+import asyncio
+import threading
+
+import pytest
+
+from yapp import InputAdapter, Inputs, Job, OutputAdapter, Pipeline
+
+
+class AsyncInput(InputAdapter):
+    async def get(self, key):
+        await asyncio.sleep(0)
+        return f"async {key}"
+
+
+class AsyncOutput(OutputAdapter):
+    def __init__(self):
+        self.saved = {}
+
+    async def save(self, key, data):
+        await asyncio.sleep(0)
+        self.saved[key] = data
+
+
+class StartJob(Job):
+    async def execute(self, an_input):
+        return {"value": an_input}
+
+
+class WaitingJob(Job):
+    # both jobs must be running at the same time to complete
+    async def execute(self, value):
+        pipeline = self.pipeline
+        pipeline.arrived[self.name].set()
+        other = "WaitingJobB" if self.name == "WaitingJobA" else "WaitingJobA"
+        await asyncio.wait_for(pipeline.arrived[other].wait(), timeout=5)
+        return {self.name: f"{value} {self.name}"}
+
+
+WaitingJobA = type("WaitingJobA", (WaitingJob,), {})
+WaitingJobB = type("WaitingJobB", (WaitingJob,), {})
+
+
+class SyncJob(Job):
+    def execute(self, WaitingJobA, WaitingJobB):
+        return {"result": [WaitingJobA, WaitingJobB], "thread": threading.get_ident()}
+
+
+def test_async_pipeline():
+    inputs = Inputs(sources=[AsyncInput()])
+    inputs.expose("AsyncInput", "input", "an_input")
+    output = AsyncOutput()
+    seen_jobs = []
+
+    async def async_hook(pipeline):
+        await asyncio.sleep(0)
+        seen_jobs.append(pipeline.job_name)
+
+    def start_hook(pipeline):
+        pipeline.arrived = {"WaitingJobA": asyncio.Event(), "WaitingJobB": asyncio.Event()}
+
+    pipeline = Pipeline(
+        [StartJob, WaitingJobA, WaitingJobB, SyncJob],
+        name="test_pipeline",
+        inputs=inputs,
+        outputs=[output],
+        dependencies={
+            StartJob: set(),
+            WaitingJobA: {StartJob},
+            WaitingJobB: {StartJob},
+            SyncJob: {WaitingJobA, WaitingJobB},
+        },
+        options={"executor": "async"},
+        job_start=[async_hook],
+        pipeline_start=[start_hook],
+    )
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs["result"] == [
+        "async input WaitingJobA",
+        "async input WaitingJobB",
+    ]
+    # sync jobs are offloaded to a thread
+    assert pipeline.inputs["thread"] != threading.get_ident()
+    assert output.saved["value"] == "async input"
+    assert sorted(seen_jobs) == ["StartJob", "SyncJob", "WaitingJobA", "WaitingJobB"]
+
+
+def test_async_in_sync_pipeline():
+    inputs = Inputs(sources=[AsyncInput()])
+    inputs.expose("AsyncInput", "input", "an_input")
+    output = AsyncOutput()
+    pipeline = Pipeline([StartJob], name="test_pipeline", inputs=inputs, outputs=[output])
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs["value"] == "async input"
+    assert output.saved["value"] == "async input"
+
+
+class FailingAsyncJob(Job):
+    async def execute(self):
+        raise RuntimeError("failing on purpose")
+
+
+def test_async_pipeline_failure():
+    failed = []
+    pipeline = Pipeline(
+        [FailingAsyncJob],
+        name="test_pipeline",
+        options={"executor": "async"},
+        job_fail=[lambda pipeline: failed.append(pipeline.job_name)],
+    )
+    with pytest.raises(RuntimeError):
+        pipeline()
+    assert not pipeline.completed
+    assert failed == ["FailingAsyncJob"]
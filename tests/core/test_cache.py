@@ -0,0 +1,125 @@
+import numpy as np
+
+from yapp import Inputs, Job, Pipeline
+from yapp.core.cache import StepCache, fingerprint
+
+runs = []
+
+
+class Producer(Job):
+    def execute(self):
+        runs.append(self.name)
+        return {"array": np.arange(5)}
+
+
+class Consumer(Job):
+    def execute(self, array, offset):
+        runs.append(self.name)
+        return {"result": array + offset}
+
+
+class NotCached(Job):
+    cache = False
+
+    def execute(self, result):
+        runs.append(self.name)
+
+
+def run_pipeline(path, offset):
+    inputs = Inputs()
+    inputs["offset"] = offset
+    pipeline = Pipeline(
+        [Producer, Consumer, NotCached],
+        name="test_pipeline",
+        inputs=inputs,
+        options={"cache": StepCache(path)},
+    )
+    pipeline()
+    assert pipeline.completed
+    return pipeline
+
+
+def test_fingerprint():
+    assert fingerprint(np.arange(5)) == fingerprint(np.arange(5))
+    assert fingerprint(np.arange(5)) != fingerprint(np.arange(6))
+    assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+
+def test_step_cache(tmp_path):
+    runs.clear()
+    pipeline = run_pipeline(tmp_path, 1)
+    assert runs == ["Producer", "Consumer", "NotCached"]
+    assert pipeline.inputs["result"].tolist() == [1, 2, 3, 4, 5]
+
+    # nothing changed, cached jobs are skipped
+    runs.clear()
+    pipeline = run_pipeline(tmp_path, 1)
+    assert runs == ["NotCached"]
+    assert pipeline.inputs["result"].tolist() == [1, 2, 3, 4, 5]
+
+    # one input changed, only its consumer is run again
+    runs.clear()
+    pipeline = run_pipeline(tmp_path, 2)
+    assert runs == ["Consumer", "NotCached"]
+    assert pipeline.inputs["result"].tolist() == [2, 3, 4, 5, 6]
+
+
+class Scaled(Job):
+    def execute(self, scale=1):
+        runs.append(self.name)
+        return {"scaled": np.arange(5) * scale}
+
+
+def test_step_cache_params(tmp_path, monkeypatch):
+    runs.clear()
+    for scale in [1, 2, 2, 1]:
+        monkeypatch.setattr(Scaled, "params", {"scale": scale})
+        pipeline = Pipeline([Scaled], name="test_pipeline", options={"cache": StepCache(tmp_path)})
+        pipeline()
+        assert pipeline.inputs["scaled"].tolist() == [i * scale for i in range(5)]
+    # params are part of the key
+    assert runs == ["Scaled", "Scaled"]
+
+
+class Configured(Job):
+    config_keys = ["factor"]
+
+    def execute(self):
+        runs.append(self.name)
+        return {"configured": self.config.factor}
+
+
+class TakesConfig(Job):
+    config_keys = ["factor"]
+
+    def execute(self, config):
+        runs.append(self.name)
+        return {"taken": config.factor}
+
+
+class ReadsAnyConfig(Job):
+    def execute(self):
+        runs.append(self.name)
+
+
+def test_step_cache_config_keys(tmp_path):
+    runs.clear()
+    for factor, other in [(1, "a"), (1, "b"), (2, "b")]:
+        pipeline = Pipeline(
+            [Configured, TakesConfig, ReadsAnyConfig],
+            name="test_pipeline",
+            inputs=Inputs(config={"factor": factor, "other": other}),
+            options={"cache": StepCache(tmp_path)},
+        )
+        pipeline()
+        assert pipeline.inputs["configured"] == pipeline.inputs["taken"] == factor
+    # only changes of declared keys run jobs again, other jobs depend on the whole config
+    assert runs == [
+        "Configured",
+        "TakesConfig",
+        "ReadsAnyConfig",
+        "ReadsAnyConfig",
+        "Configured",
+        "TakesConfig",
+        "ReadsAnyConfig",
+    ]
@@ -0,0 +1,148 @@
+import asyncio
+import time
+
+import numpy as np
+
+from yapp import InputAdapter, Inputs, Job, Pipeline
+from yapp.core.input_cache import InputCache
+
+
+class CountingInput(InputAdapter):
+    def __init__(self):
+        self.loads = 0
+
+    def get(self, key):
+        self.loads += 1
+        return np.zeros(100, dtype=np.int64)
+
+
+def make_inputs(memoize, cache=None):
+    adapter = CountingInput()
+    adapter.memoize = memoize
+    inputs = Inputs(sources=[adapter], cache=cache)
+    inputs.expose("CountingInput", "data", "one")
+    inputs.expose("CountingInput", "data", "two")
+    inputs.expose("CountingInput", "other", "three")
+    return inputs, adapter
+
+
+def test_memoize_run():
+    inputs, adapter = make_inputs("run")
+    for _ in range(3):
+        inputs["one"]  # pylint: disable=pointless-statement
+        inputs["two"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 1
+    assert inputs.cache.stats["hits"] == 5
+    assert inputs.cache.stats["misses"] == 1
+
+    inputs.forget("one")
+    inputs["two"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 2
+
+
+def test_memoize_none():
+    inputs, adapter = make_inputs("none")
+    for _ in range(3):
+        inputs["one"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 3
+    assert inputs.cache.stats["entries"] == 0
+
+
+def test_memoize_ttl():
+    inputs, adapter = make_inputs(0.05)
+    inputs["one"]  # pylint: disable=pointless-statement
+    inputs["one"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 1
+    time.sleep(0.1)
+    inputs["one"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 2
+
+
+def test_memory_budget():
+    # room for a single array
+    inputs, adapter = make_inputs("run", cache=InputCache(max_memory=1000))
+    inputs["one"]  # pylint: disable=pointless-statement
+    inputs["three"]  # pylint: disable=pointless-statement
+    assert inputs.cache.stats["evictions"] == 1
+    assert inputs.cache.memory <= 1000
+    # least recently used one was evicted
+    inputs["three"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 2
+    inputs["one"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 3
+
+
+def test_iterators_not_cached():
+    cache = InputCache()
+
+    class ChunkedInput(InputAdapter):
+        def get(self, key):
+            return iter([1, 2, 3])
+
+    inputs = Inputs(sources=[ChunkedInput()], cache=cache)
+    inputs.expose("ChunkedInput", "data", "chunks")
+    assert list(inputs["chunks"]) == [1, 2, 3]
+    assert list(inputs["chunks"]) == [1, 2, 3]
+    assert cache.stats["entries"] == 0
+
+
+class AddTen(Job):
+    def execute(self, one):
+        one += 10
+        return {"first": float(one.max())}
+
+
+class Max(Job):
+    def execute(self, one):
+        return {"second": float(one.max())}
+
+
+def test_not_memoized_by_default():
+    adapter = CountingInput()
+    inputs = Inputs(sources=[adapter])
+    inputs.expose("CountingInput", "data", "one")
+    pipeline = Pipeline([AddTen, Max], inputs=inputs)
+    pipeline()
+    assert adapter.loads == 2
+    # changes made in place by a job are not seen by the next ones
+    assert pipeline.inputs["second"] == 0.0
+
+
+def test_free_outputs_forgets_exposed():
+    inputs, adapter = make_inputs("run")
+    pipeline = Pipeline([Max], inputs=inputs, options={"free_outputs": True})
+    pipeline()
+    # still exposed, but no longer memoized once its consumers completed
+    assert "one" in pipeline.inputs
+    assert inputs.cache.stats["entries"] == 0
+    pipeline.inputs["one"]  # pylint: disable=pointless-statement
+    assert adapter.loads == 2
+
+
+class AsyncInput(InputAdapter):
+    memoize = "run"
+
+    def __init__(self):
+        self.loads = 0
+
+    async def get(self, key):
+        self.loads += 1
+        await asyncio.sleep(0.05)
+        return key * 2
+
+
+def test_memoize_async():
+    adapter = AsyncInput()
+    inputs = Inputs(sources=[adapter])
+    inputs.expose("AsyncInput", "a", "a")
+
+    async def load():
+        # as the "async" executor does
+        return await (await asyncio.to_thread(inputs.__getitem__, "a"))
+
+    async def load_all():
+        return await asyncio.gather(load(), load(), load())
+
+    assert asyncio.run(load_all()) == ["aa"] * 3
+    assert adapter.loads == 1
+    assert inputs["a"] == "aa"
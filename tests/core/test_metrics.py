@@ -0,0 +1,152 @@
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yapp import InputAdapter, Job, Pipeline
+from yapp.core.inputs import Inputs
+from yapp.core.metrics import Metrics
+from yapp.core.output_adapter import OutputAdapter
+from yapp.core.sizes import approx_size
+
+
+class ArrayInput(InputAdapter):
+    def get(self, key):
+        return np.zeros(1000, dtype=np.int64)
+
+
+class NullOutput(OutputAdapter):
+    def save(self, key, data):
+        pass
+
+
+class Double(Job):
+    def execute(self, zeros):
+        return {"doubled": zeros * 2}
+
+
+class Total(Job):
+    def execute(self, doubled):
+        return int(doubled.sum())
+
+
+def a_hook(pipeline):
+    pass
+
+
+def make_pipeline(**options):
+    inputs = Inputs(sources=[ArrayInput()])
+    inputs.expose("ArrayInput", "zeros", "zeros")
+    return Pipeline(
+        [Double, Total],
+        inputs=inputs,
+        outputs=[NullOutput()],
+        options=options,
+        job_finish=[a_hook],
+    )
+
+
+def test_approx_size():
+    frame = pd.DataFrame({"text": ["some text"] * 1000}, dtype=object)
+    # strings are measured only if deep
+    assert approx_size(frame, deep=False) < 10000 < approx_size(frame)
+    assert approx_size(np.zeros(1000, dtype=np.int64), deep=False) == 8000
+
+
+def test_clock_adjusted(monkeypatch):
+    metrics = Metrics()
+    with metrics.measure("pipeline", "outer"):
+        # the system clock going back during the run does not affect start times
+        monkeypatch.setattr("time.time", lambda: 0.0)
+        with metrics.measure("job", "inner"):
+            pass
+    inner, outer = metrics.records
+    assert outer["started_at"] <= inner["started_at"]
+    assert inner["started_at"] + inner["wall_time"] <= outer["started_at"] + outer["wall_time"]
+
+
+@pytest.mark.parametrize("write_behind", [False, True])
+def test_pipeline_metrics(write_behind):
+    pipeline = make_pipeline(write_behind=write_behind)
+    pipeline()
+    metrics = pipeline.metrics
+    assert [record["name"] for record in metrics.filter("job")] == ["Double", "Total"]
+    assert [record["name"] for record in metrics.filter("input")] == ["ArrayInput.zeros"]
+    assert metrics.filter("input")[0]["output_size"] == 8000
+    assert metrics.filter("job", "Double")[0]["output_size"] >= 8000
+    assert len(metrics.filter("hook")) == 2
+    assert metrics.filter("hook")[0]["event"] == "job_finish"
+    assert {record["name"] for record in metrics.filter("output")} == {
+        "NullOutput.doubled",
+        "NullOutput.Total",
+    }
+    (record,) = metrics.filter("pipeline")
+    assert record["status"] == "ok"
+    assert record["wall_time"] >= record["gc_pause"] >= 0
+    assert pipeline.finished_at > pipeline.started_at
+
+    # records are reset on every run
+    pipeline()
+    assert len(metrics.filter("pipeline")) == 1
+
+
+def test_failed_call():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.measure("job", "failing"):
+            raise ValueError()
+    (record,) = metrics
+    assert record["status"] == "failed"
+
+
+def test_export():
+    pipeline = make_pipeline()
+    pipeline.name = "a_pipeline"
+    pipeline()
+
+    file = io.StringIO()
+    pipeline.metrics.to_jsonl(file)
+    records = [json.loads(line) for line in file.getvalue().splitlines()]
+    assert len(records) == len(pipeline.metrics)
+
+    file = io.StringIO()
+    pipeline.metrics.to_prometheus(file, pipeline="a_pipeline")
+    lines = file.getvalue().splitlines()
+    assert "# TYPE yapp_wall_seconds gauge" in lines
+    assert 'yapp_calls{pipeline="a_pipeline",kind="job",name="Double"} 1' in lines
+    prefix = 'yapp_output_bytes{pipeline="a_pipeline",kind="input"'
+    assert any(line.startswith(prefix) for line in lines)
+
+
+def test_prometheus_file(tmp_path):
+    pipeline = make_pipeline()
+    pipeline()
+    path = os.path.join(tmp_path, "yapp.prom")
+    pipeline.metrics.to_prometheus(path, pipeline="a_pipeline")
+    assert os.listdir(tmp_path) == ["yapp.prom"]
+    with open(path, encoding="utf-8") as file:
+        assert "# TYPE yapp_wall_seconds gauge" in file.read().splitlines()
+
+
+@pytest.mark.parametrize("executor", ["thread", "async"])
+def test_chrome_trace(executor):
+    pipeline = make_pipeline(executor=executor, workers=2)
+    pipeline()
+
+    file = io.StringIO()
+    pipeline.metrics.to_chrome_trace(file, pipeline="a_pipeline")
+    events = json.loads(file.getvalue())["traceEvents"]
+    spans = [event for event in events if event["ph"] == "X"]
+    assert len(spans) == len(pipeline.metrics)
+    tracks = {event["tid"] for event in events if event["name"] == "thread_name"}
+    assert {span["tid"] for span in spans} <= tracks
+
+    # jobs are nested in the pipeline span
+    (root,) = [span for span in spans if span["cat"] == "pipeline"]
+    for span in spans:
+        if span["cat"] == "job":
+            assert root["ts"] <= span["ts"] <= span["ts"] + span["dur"] <= root["ts"] + root["dur"]
+            assert span["args"]["status"] == "ok"
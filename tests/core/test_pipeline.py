@@ -1,8 +1,11 @@
+import threading
+
 import pytest
 
 from yapp import Job, Pipeline
 from yapp.adapters.utils import DummyInput, DummyOutput
 from yapp.core.inputs import Inputs
+from yapp.core.options import PipelineOptions
 from yapp.core.output_adapter import OutputAdapter
 
 
@@ -194,3 +197,185 @@ def test_save_results_default(capfd):
     outs = out.strip().split('\n')
     assert len(outs) == 2
     assert outs[0] == outs[1] == "a_value -15"
+
+
+barrier = threading.Barrier(3, timeout=5)
+
+
+class FanOutJob(Job):
+    def execute(self, a_value):
+        # blocks until all three jobs are running at the same time
+        barrier.wait()
+        return {self.name: a_value}
+
+
+FanOutJobA = type("FanOutJobA", (FanOutJob,), {})
+FanOutJobB = type("FanOutJobB", (FanOutJob,), {})
+FanOutJobC = type("FanOutJobC", (FanOutJob,), {})
+
+
+class FanInJob(Job):
+    def execute(self, FanOutJobA, FanOutJobB, FanOutJobC):
+        return {"total": FanOutJobA + FanOutJobB + FanOutJobC}
+
+
+def test_parallel_pipeline():
+    fan_out = {FanOutJobA, FanOutJobB, FanOutJobC}
+    dependencies = {
+        DummyJob: set(),
+        **{job: {DummyJob} for job in fan_out},
+        FanInJob: fan_out,
+    }
+    seen_jobs = []
+
+    def job_checker_hook(pipeline):
+        seen_jobs.append(pipeline.job_name)
+
+    pipeline = Pipeline(
+        [DummyJob, *fan_out, FanInJob],
+        name="test_pipeline",
+        dependencies=dependencies,
+        options={"workers": 3},
+        job_start=[job_checker_hook],
+    )
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs["total"] == -45
+    assert sorted(seen_jobs) == sorted(
+        ["DummyJob", "FanInJob", "FanOutJobA", "FanOutJobB", "FanOutJobC"]
+    )
+    assert seen_jobs[0] == "DummyJob"
+    assert seen_jobs[-1] == "FanInJob"
+
+
+class FailingJob(Job):
+    def execute(self):
+        raise RuntimeError("failing on purpose")
+
+
+def test_parallel_pipeline_failure():
+    pipeline = Pipeline(
+        [FailingJob, DummyJob2],
+        name="test_pipeline",
+        dependencies={FailingJob: set(), DummyJob2: {FailingJob}},
+        options={"workers": 2},
+    )
+    with pytest.raises(RuntimeError):
+        pipeline()
+    assert not pipeline.completed
+    assert "another_value" not in pipeline.inputs
+
+
+class ReadsConfig(Job):
+    def execute(self):
+        return {"from_config": self.config.value}
+
+
+def test_empty_inputs_with_config():
+    # an Inputs object without any input is still used, with its config
+    pipeline = Pipeline([ReadsConfig], name="test_pipeline", inputs=Inputs(config={"value": 3}))
+    pipeline()
+    assert pipeline.inputs["from_config"] == 3
+
+
+saving = threading.Event()
+hook_ran = threading.Event()
+
+
+class WaitingOutput(OutputAdapter):
+    def save(self, key, data):
+        if key == "slow_value":
+            saving.set()
+            # hooks of other jobs run while saving
+            assert hook_ran.wait(5)
+
+
+class SlowOutputJob(Job):
+    def execute(self):
+        return {"slow_value": 1}
+
+
+class WhileSavingJob(Job):
+    def execute(self):
+        assert saving.wait(5)
+        return {"other_value": 2}
+
+
+def test_save_outside_lock():
+    def finish_hook(pipeline):
+        if pipeline.job_name == "WhileSavingJob":
+            hook_ran.set()
+
+    pipeline = Pipeline(
+        [SlowOutputJob, WhileSavingJob],
+        name="test_pipeline",
+        dependencies={SlowOutputJob: set(), WhileSavingJob: set()},
+        outputs=[WaitingOutput],
+        options={"workers": 2},
+        job_finish=[finish_hook],
+    )
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs["other_value"] == 2
+
+
+class ConsumesAnother(Job):
+    def execute(self, another_value):
+        return {"last_value": another_value + 1, "unused_value": 0}
+
+
+def test_free_outputs():
+    freed = []
+
+    class Checker(Job):
+        def execute(self):
+            freed.extend(
+                name for name in ("a_value", "another_value") if name not in self.pipeline.inputs
+            )
+
+    pipeline = Pipeline(
+        [DummyJob, DummyJob2, ConsumesAnother, Checker],
+        name="test_pipeline",
+        options={"free_outputs": True, "keep": ["last_value"]},
+    )
+    pipeline()
+    assert pipeline.completed
+    # freed as soon as their last consumer completed
+    assert freed == ["a_value", "another_value"]
+    assert "last_value" in pipeline.inputs
+    assert "unused_value" not in pipeline.inputs
+    assert "Checker" not in pipeline.inputs
+
+
+def test_free_outputs_parallel():
+    fan_out = {FanOutJobA, FanOutJobB, FanOutJobC}
+    pipeline = Pipeline(
+        [DummyJob, *fan_out, FanInJob],
+        name="test_pipeline",
+        dependencies={
+            DummyJob: set(),
+            **{job: {DummyJob} for job in fan_out},
+            FanInJob: fan_out,
+        },
+        options={"workers": 3, "free_outputs": True},
+    )
+    pipeline(save_results="total")
+    assert pipeline.completed
+    assert set(pipeline.inputs) == {"total"}
+
+
+def test_options():
+    options = PipelineOptions.from_dict({"workers": 4, "keep": "a_value", "profile": "memory"})
+    assert options.execution.workers == 4
+    assert options.execution.executor == "thread"
+    assert options.caching.keep == ["a_value"]
+    assert options.profiling.profile == "memory"
+
+    pipeline = Pipeline([DummyJob], options=options)
+    assert pipeline.options is options
+    pipeline.options.update({"free_outputs": True})
+    assert pipeline.options.caching.free_outputs
+    assert pipeline.options.execution.workers == 4
+
+    with pytest.raises(ValueError):
+        Pipeline([DummyJob], options={"wokers": 2})
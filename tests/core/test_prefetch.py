@@ -0,0 +1,92 @@
+import threading
+import time
+
+from yapp import InputAdapter, Inputs, Job, Pipeline
+from yapp.core.prefetch import Prefetcher
+
+
+class SlowInput(InputAdapter):
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.loads = []
+        self.running = 0
+        self.max_running = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            self.loads.append((key, threading.current_thread().name))
+        return key * 2
+
+
+def make_inputs(names, **attributes):
+    adapter = SlowInput()
+    for name, value in attributes.items():
+        setattr(adapter, name, value)
+    inputs = Inputs(sources=[adapter])
+    for name in names:
+        inputs.expose("SlowInput", name, name)
+    return inputs, adapter
+
+
+def test_prefetch():
+    inputs, adapter = make_inputs(["a", "b", "c"], memoize="run")
+    prefetcher = Prefetcher(inputs, workers=3)
+    prefetcher.prefetch(["a", "b", "not_exposed"])
+    prefetcher.prefetch(["a"])
+    prefetcher.shutdown()
+    assert sorted(key for key, _ in adapter.loads) == ["a", "b"]
+    assert all(thread.startswith("yapp-prefetch") for _, thread in adapter.loads)
+    assert adapter.max_running == 2
+
+    # loaded from cache
+    assert inputs["a"] == "aa"
+    assert len(adapter.loads) == 2
+
+
+def test_prefetch_limit():
+    inputs, adapter = make_inputs(["a", "b", "c", "d"], prefetch_limit=1)
+    prefetcher = Prefetcher(inputs, workers=4)
+    prefetcher.prefetch(["a", "b", "c", "d"])
+    prefetcher.shutdown()
+    assert len(adapter.loads) == 4
+    assert adapter.max_running == 1
+
+
+def test_prefetch_not_memoized():
+    inputs, adapter = make_inputs(["a"])
+    prefetcher = Prefetcher(inputs)
+    prefetcher.prefetch(["a"])
+    # taken by the first load, loaded again by the next ones
+    assert inputs["a"] == "aa"
+    assert [thread for _, thread in adapter.loads] == ["yapp-prefetch_0"]
+    assert inputs["a"] == "aa"
+    assert len(adapter.loads) == 2
+    prefetcher.shutdown()
+    assert not inputs.prefetched
+
+
+class First(Job):
+    def execute(self, a):
+        time.sleep(0.1)
+        return {"first": a}
+
+
+class Second(Job):
+    def execute(self, first, b):
+        return {"second": first + b}
+
+
+def test_pipeline_prefetch():
+    inputs, adapter = make_inputs(["a", "b"])
+    pipeline = Pipeline([First, Second], inputs=inputs, options={"prefetch": 1})
+    pipeline()
+    assert pipeline.inputs["second"] == "aabb"
+    # the input for the second job was loaded while the first one was running
+    assert len(adapter.loads) == 2
+    assert all(thread.startswith("yapp-prefetch") for _, thread in adapter.loads)
@@ -0,0 +1,85 @@
+import mmap
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yapp import Job, Pipeline
+from yapp.core.process import SHM_DIR, SharedPayload, run_in_process
+
+
+def test_shared_payload():
+    data = {
+        "array": np.arange(1000),
+        "frame": pd.DataFrame({"a": np.arange(10), "b": np.ones(10)}),
+        "other": [1, "two", None],
+    }
+    payload = SharedPayload(data)
+    assert payload.shm_name is not None
+    path = os.path.join(SHM_DIR, payload.shm_name)
+    loaded = payload.load()
+    assert np.array_equal(loaded["array"], data["array"])
+    assert loaded["frame"].equals(data["frame"])
+    assert loaded["other"] == data["other"]
+    # loaded without copying buffers, the block is unlinked but still mapped
+    base = loaded["array"]
+    while not isinstance(base, memoryview):
+        base = base.base
+    assert isinstance(base.obj, mmap.mmap)
+    assert not os.path.exists(path)
+    assert payload.shm_name is None
+
+
+def test_shared_payload_release():
+    payload = SharedPayload(np.arange(1000))
+    path = os.path.join(SHM_DIR, payload.shm_name)
+    assert os.path.exists(path)
+    payload.release()
+    assert not os.path.exists(path)
+    payload.release()
+
+
+def test_shared_payload_no_buffers():
+    payload = SharedPayload("just a string")
+    assert payload.shm_name is None
+    assert payload.load() == "just a string"
+
+
+def raise_error():
+    raise ValueError("failing on purpose")
+
+
+def test_run_in_process():
+    assert run_in_process(os.getpid) != os.getpid()
+    assert run_in_process(np.multiply, np.arange(5), 2).tolist() == [0, 2, 4, 6, 8]
+    with pytest.raises(ValueError):
+        run_in_process(raise_error)
+
+
+class MakeArray(Job):
+    def execute(self):
+        return {"array": np.arange(10), "maker_pid": os.getpid()}
+
+
+class DoubleArray(Job):
+    executor = "process"
+
+    def execute(self, array):
+        return {"doubled": array * 2, "doubler_pid": os.getpid()}
+
+
+def test_process_executor():
+    pipeline = Pipeline([MakeArray, DoubleArray], name="test_pipeline")
+    pipeline()
+    assert pipeline.completed
+    assert pipeline.inputs["maker_pid"] == os.getpid()
+    assert pipeline.inputs["doubler_pid"] != os.getpid()
+    assert pipeline.inputs["doubled"].tolist() == list(range(0, 20, 2))
+
+    pipeline = Pipeline([MakeArray], name="test_pipeline", options={"executor": "process"})
+    pipeline()
+    assert pipeline.inputs["maker_pid"] != os.getpid()
+
+    with pytest.raises(ValueError):
+        Pipeline([MakeArray], name="test_pipeline", options={"executor": "invalid"})
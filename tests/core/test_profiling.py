@@ -0,0 +1,127 @@
+import os
+import pstats
+import time
+
+import numpy as np
+import pytest
+
+from yapp import Job, Pipeline
+from yapp.core.profiling import SamplingProfiler
+
+
+def make_squares(size):
+    return [i * i for i in range(size)]
+
+
+class Squares(Job):
+    def execute(self):
+        return {"squares": np.array(make_squares(10000))}
+
+
+class Total(Job):
+    def execute(self, squares):
+        return int(squares.sum())
+
+
+class ProcessTotal(Total):
+    executor = "process"
+    profile = True
+
+
+class AsyncTotal(Job):
+    async def execute(self, squares):
+        return int(squares.sum())
+
+
+def test_profile_pipeline(tmp_path):
+    pipeline = Pipeline(
+        [Squares, Total],
+        name="a_pipeline",
+        options={"profile": "memory", "profile_dir": str(tmp_path)},
+    )
+    pipeline()
+    assert pipeline.inputs["Total"] == sum(make_squares(10000))
+
+    directory = pipeline.profiler.directory
+    assert os.path.dirname(directory) == str(tmp_path)
+    assert os.path.basename(directory).startswith("a_pipeline-")
+    assert pipeline.profiler.jobs == ["Squares", "Total"]
+    for name in ("Squares", "Total"):
+        assert os.path.exists(os.path.join(directory, f"{name}.allocations.txt"))
+    stats = pstats.Stats(os.path.join(directory, "Squares.pstats"))
+    assert any(function == "make_squares" for _, _, function in stats.stats)
+
+    summary = pipeline.profiler.summary()
+    assert "Squares (" in summary and "test_profiling.py" in summary
+
+
+def test_profile_jobs(tmp_path):
+    pipeline = Pipeline([Squares, ProcessTotal], options={"profile_dir": str(tmp_path)})
+    pipeline()
+    assert pipeline.inputs["ProcessTotal"] == sum(make_squares(10000))
+    # only jobs with profile set, even in worker processes
+    assert pipeline.profiler.jobs == ["ProcessTotal"]
+    assert pipeline.profiler.stats("ProcessTotal") is not None
+    assert pipeline.profiler.stats("Squares") is None
+
+    pipeline = Pipeline([Squares], options={"profile_dir": str(tmp_path)})
+    pipeline()
+    assert pipeline.profiler is None
+
+
+def test_profile_async(tmp_path):
+    pipeline = Pipeline(
+        [Squares, AsyncTotal],
+        options={"executor": "async", "profile": True, "profile_dir": str(tmp_path)},
+    )
+    pipeline()
+    # coroutine jobs are not profiled
+    assert pipeline.profiler.jobs == ["Squares"]
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class Busy(Job):
+    def execute(self):
+        busy_wait(0.2)
+        return {"busy": True}
+
+
+class AsyncBusy(Job):
+    async def execute(self):
+        return {"busy": True}
+
+
+@pytest.mark.parametrize("executor", ["thread", "async"])
+def test_sampling(tmp_path, executor):
+    pipeline = Pipeline(
+        [Busy, AsyncBusy],
+        options={"executor": executor, "sampling": 0.005, "profile_dir": str(tmp_path)},
+    )
+    pipeline()
+    sampler = pipeline.sampler
+    assert sampler.samples > 0
+    assert 0 < sampler.overhead < sampler.elapsed
+    assert "Busy" in sampler.stacks
+    if executor == "async":
+        # coroutine jobs run on the event loop are not sampled
+        assert "AsyncBusy" not in sampler.stacks
+
+    with open(os.path.join(sampler.directory, "Busy.folded"), encoding="utf-8") as file:
+        lines = file.read().splitlines()
+    counts = [int(line.rsplit(" ", 1)[1]) for line in lines]
+    assert sum(counts) == sum(sampler.stacks["Busy"].values())
+    assert any("busy_wait" in line for line in lines)
+
+
+def test_sampling_overhead(tmp_path):
+    sampler = SamplingProfiler(str(tmp_path), interval=0.001, max_overhead=0.01)
+    sampler.start()
+    with sampler.tag("Busy"):
+        busy_wait(0.2)
+    sampler.stop()
+    assert sampler.overhead <= 0.01 * sampler.elapsed + 0.005
@@ -0,0 +1,99 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yapp import Job, Pipeline
+from yapp.adapters.store import StoreInput, StoreOutput
+from yapp.core import Inputs
+from yapp.core.sizes import parse_size
+from yapp.core.store import ArtifactStore
+
+
+def test_parse_size():
+    assert parse_size(None) is None
+    assert parse_size(1234) == 1234
+    assert parse_size("1234") == 1234
+    assert parse_size("2KB") == 2048
+    assert parse_size("1.5 GB") == int(1.5 * 1024**3)
+    with pytest.raises(ValueError):
+        parse_size("a lot")
+
+
+def test_serializers(tmp_path):
+    store = ArtifactStore(tmp_path)
+    frame = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    store["frame"] = frame
+    store["array"] = np.arange(10)
+    store["other"] = {"a": [1, 2]}
+
+    assert store["frame"].equals(frame)
+    assert store["array"].tolist() == list(range(10))
+    assert store["other"] == {"a": [1, 2]}
+
+    extensions = sorted(os.path.splitext(f)[1] for f in os.listdir(tmp_path))
+    assert extensions == [".npy", ".parquet", ".pkl", ".sqlite"]
+
+    # data is persisted
+    store = ArtifactStore(tmp_path)
+    assert len(store) == 3
+    assert "frame" in store
+    assert store["frame"].equals(frame)
+
+    del store["frame"]
+    assert "frame" not in store
+    assert store.get("frame") is None
+    with pytest.raises(KeyError):
+        store["frame"]  # pylint: disable=pointless-statement
+
+
+def test_lru_eviction(tmp_path):
+    store = ArtifactStore(tmp_path, max_size="2KB")
+    store["first"] = np.zeros(100, dtype=np.int64)
+    store["second"] = np.zeros(100, dtype=np.int64)
+    # access first, so that second is the least recently used one
+    time.sleep(0.01)
+    store["first"]  # pylint: disable=pointless-statement
+    store["third"] = np.zeros(100, dtype=np.int64)
+
+    assert "first" in store
+    assert "second" not in store
+    assert "third" in store
+    assert store.size <= 2048
+
+
+def test_age_eviction(tmp_path):
+    store = ArtifactStore(tmp_path, max_age=0.05)
+    store["old"] = 1
+    time.sleep(0.1)
+    store["new"] = 2
+    assert store.keys() == ["new"]
+
+
+def test_evict_without_keep(tmp_path):
+    store = ArtifactStore(tmp_path)
+    store["old"] = np.zeros(100, dtype=np.int64)
+    time.sleep(0.5)
+    for key in ["first", "second", "third"]:
+        store[key] = np.zeros(100, dtype=np.int64)
+        time.sleep(0.01)
+
+    store = ArtifactStore(tmp_path, max_size="2KB", max_age=0.4)
+    assert sorted(store.evict()) == ["first", "old"]
+    assert sorted(store.keys()) == ["second", "third"]
+
+
+class MakeFrame(Job):
+    def execute(self):
+        return {"frame": pd.DataFrame({"a": range(5)})}
+
+
+def test_store_adapters(tmp_path):
+    pipeline = Pipeline([MakeFrame], outputs=[StoreOutput(tmp_path)])
+    pipeline()
+
+    inputs = Inputs(sources=[StoreInput(tmp_path)])
+    inputs.expose("StoreInput", "frame", "stored_frame")
+    assert inputs["stored_frame"].equals(pd.DataFrame({"a": range(5)}))
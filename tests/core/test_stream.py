@@ -0,0 +1,128 @@
+import pandas as pd
+import pytest
+
+from yapp import Inputs, Job, Pipeline
+from yapp.adapters.file import CsvInput
+from yapp.core.output_adapter import OutputAdapter
+from yapp.core.stream import ChunkStream
+
+
+class ChunksOutput(OutputAdapter):
+    def __init__(self):
+        self.saved = []
+        self.chunks = []
+
+    def save(self, key, data):
+        self.saved.append(key)
+
+    def save_chunk(self, key, chunk, index):
+        self.chunks.append((key, index, len(chunk)))
+
+
+class Produce(Job):
+    produced = 0
+
+    def execute(self):
+        for i in range(5):
+            Produce.produced += 1
+            yield pd.DataFrame({"value": range(i * 10, (i + 1) * 10)})
+
+
+class Double(Job):
+    def execute(self, Produce):  # pylint: disable=invalid-name
+        for chunk in Produce:
+            yield chunk * 2
+
+
+class Total(Job):
+    def execute(self, Double):  # pylint: disable=invalid-name
+        return {"total": sum(int(chunk["value"].sum()) for chunk in Double)}
+
+
+class Failing(Job):
+    def execute(self):
+        yield pd.DataFrame({"value": [1]})
+        raise ValueError("broken stream")
+
+
+def test_chunk_stream():
+    produced = []
+
+    def chunks():
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    stream = ChunkStream("numbers", chunks(), buffer=2)
+    iterator = iter(stream)
+    assert next(iterator) == 0
+    stream._thread.join(0.2)  # pylint: disable=protected-access
+    # the producer is never too far ahead
+    assert len(produced) <= 4
+    assert list(iterator) == list(range(1, 10))
+    stream.wait()
+    with pytest.raises(RuntimeError):
+        list(stream)
+
+
+def test_cancelled_stream():
+    stream = ChunkStream("numbers", iter(range(100)), buffer=2)
+    iterator = iter(stream)
+    assert next(iterator) == 0
+    # the producer, waiting for room in the buffer, is woken up
+    stream.close()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        list(iterator)
+
+    # chunks are only saved once detached
+    saved = []
+    stream = ChunkStream("numbers", iter(range(10)), save=lambda *args: saved.append(args))
+    stream.wait()
+    assert len(saved) == 10
+
+
+def test_streaming_pipeline():
+    output = ChunksOutput()
+    pipeline = Pipeline([Produce, Double, Total], outputs=[output])
+    pipeline()
+    assert pipeline.inputs["total"] == sum(range(50)) * 2
+    assert [index for key, index, _ in output.chunks if key == "Produce"] == list(range(5))
+    assert [index for key, index, _ in output.chunks if key == "Double"] == list(range(5))
+    assert output.saved == ["total"]
+
+
+def test_async_streaming_pipeline():
+    output = ChunksOutput()
+    pipeline = Pipeline([Produce, Double, Total], outputs=[output], options={"executor": "async"})
+    pipeline()
+    assert pipeline.inputs["total"] == sum(range(50)) * 2
+    assert len(output.chunks) == 10
+
+
+def test_unconsumed_stream():
+    output = ChunksOutput()
+    pipeline = Pipeline([Produce], outputs=[output], options={"workers": 2})
+    pipeline()
+    assert len(output.chunks) == 5
+
+
+def test_failing_stream():
+    output = ChunksOutput()
+    pipeline = Pipeline([Failing], outputs=[output])
+    with pytest.raises(ValueError, match="broken stream"):
+        pipeline()
+    assert len(output.chunks) == 1
+
+
+def test_chunked_inputs(tmp_path):
+    pd.DataFrame({"value": range(5)}).to_csv(tmp_path / "numbers.csv", index=False)
+
+    class Count(Job):
+        def execute(self, numbers):
+            return {"sizes": [len(chunk) for chunk in numbers]}
+
+    inputs = Inputs(sources=[CsvInput(str(tmp_path))])
+    inputs.expose("CsvInput", "numbers", "numbers")
+    pipeline = Pipeline([Count], inputs=inputs, options={"chunksize": 2})
+    pipeline()
+    assert pipeline.inputs["sizes"] == [2, 2, 1]
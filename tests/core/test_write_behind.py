@@ -0,0 +1,89 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from yapp import Job, Pipeline
+from yapp.core.output_adapter import OutputAdapter
+from yapp.core.write_behind import OutputWriter, WriteBehind
+
+
+class SlowOutput(OutputAdapter):
+    def __init__(self, delay=0.1, fail=False):
+        self.delay = delay
+        self.fail = fail
+        self.saved = []
+
+    def save(self, key, data):
+        time.sleep(self.delay)
+        if self.fail:
+            raise ValueError(f"cannot save {key}")
+        self.saved.append((key, threading.current_thread().name))
+
+
+class First(Job):
+    def execute(self):
+        return {"first": 1}
+
+
+class Second(Job):
+    def execute(self, first):
+        return {"second": first + 1}
+
+
+def test_write_behind_pipeline():
+    output = SlowOutput()
+    finished = []
+
+    def finish_hook(pipeline):
+        finished.append(list(output.saved))
+
+    pipeline = Pipeline(
+        [First, Second],
+        outputs=[output],
+        options={"write_behind": True},
+        pipeline_finish=[finish_hook],
+    )
+    pipeline(save_results="second")
+    # all writes completed before pipeline_finish, in order
+    assert [key for key, _ in finished[0]] == ["first", "second"]
+    assert [key for key, _ in output.saved] == ["first", "second", "second"]
+    assert all(thread.startswith("yapp-writer") for _, thread in output.saved)
+
+
+def test_adapters_written_in_parallel():
+    outputs = [SlowOutput(0.2), SlowOutput(0.2)]
+    writers = WriteBehind(outputs)
+    start = time.perf_counter()
+    writers.submit("_save", "key", 1)
+    writers.flush()
+    assert time.perf_counter() - start < 0.35
+    writers.close()
+
+
+def test_backpressure():
+    output = SlowOutput(0.05)
+    writer = OutputWriter(output, max_memory=1000)
+    memory = []
+    for i in range(4):
+        writer.submit("_save", str(i), np.zeros(100, dtype=np.int64))
+        memory.append(writer.memory)
+    writer.close()
+    assert len(output.saved) == 4
+    # each array takes 800 bytes: only one can wait in queue
+    assert max(memory) <= 1000
+    assert writer.memory == 0
+
+
+def test_write_behind_failure():
+    finished = []
+    pipeline = Pipeline(
+        [First, Second],
+        outputs=[SlowOutput(0.01, fail=True)],
+        options={"write_behind": True},
+        pipeline_finish=[finished.append],
+    )
+    with pytest.raises(ValueError, match="cannot save first"):
+        pipeline()
+    assert not finished